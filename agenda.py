@@ -0,0 +1,118 @@
+import math
+
+"""
+Agenda de eventos por tick
+==========================
+Roda de tempo hierárquica: NIVEIS rodas de CASAS posições cada, a de baixo
+com uma casa por tick e cada uma acima com casas CASAS vezes mais largas.
+Um timer entra na roda mais baixa que alcança o seu prazo e desce de roda
+quando a de cima vira para a sua casa; avançar um tick custa os timers que
+vencem nele (mais as descidas, amortizadas), não o total agendado.
+
+As chaves são tuplas ordenáveis; os vencidos de um tick saem ordenados,
+então o resultado não depende da ordem em que foram agendados (nem de a
+agenda ter sido remontada por carrega).
+
+Eventos que hoje são sorteados a cada tick com chance 1/p viram um único
+sorteio do intervalo até o próximo (sorteia_intervalo): sem memória, a
+distribuição dos disparos é a mesma.
+"""
+
+BITS_CASA = 6
+CASAS = 1 << BITS_CASA
+NIVEIS = 4
+HORIZONTE = 1 << (BITS_CASA * NIVEIS)   # prazos mais distantes dão voltas na roda de cima
+
+
+def sorteia_intervalo(rng, p):
+    """Ticks até o primeiro sucesso de um sorteio com chance 1/p por tick (>= 1)."""
+    if p <= 1:
+        return 1
+    return int(math.log(1.0 - rng.random()) / math.log1p(-1 / p)) + 1
+
+
+class Agenda:
+    """Timers com chave e prazo em ticks, vencidos em ordem de chave."""
+
+    def __init__(self, agora=0):
+        self.rodas = [[[] for _ in range(CASAS)] for _ in range(NIVEIS)]
+        self.limpa(agora)
+
+    def limpa(self, agora=0):
+        for roda in self.rodas:
+            for casa in roda:
+                casa.clear()
+        self.agora = agora
+        self.prazos = {}   # chave -> tick; entradas nas casas sem prazo igual estão canceladas
+
+    def _insere(self, chave, prazo):
+        distancia = min(prazo - self.agora, HORIZONTE - 1)
+        nivel = max(distancia.bit_length() - 1, 0) // BITS_CASA
+        posicao = self.agora + distancia
+        self.rodas[nivel][(posicao >> (BITS_CASA * nivel)) & (CASAS - 1)].append((prazo, chave))
+
+    # ------------------------ TIMERS ------------------------
+    def agenda(self, chave, prazo):
+        """Vence `chave` no tick `prazo`, substituindo um prazo anterior da mesma chave."""
+        if prazo <= self.agora:
+            raise ValueError(f"prazo {prazo} não é posterior ao tick atual {self.agora}")
+        self.prazos[chave] = prazo
+        self._insere(chave, prazo)
+
+    def cancela(self, chave):
+        self.prazos.pop(chave, None)
+
+    def prazo(self, chave):
+        """Tick em que `chave` vence, ou None se não está agendada."""
+        return self.prazos.get(chave)
+
+    def restante(self, chave):
+        prazo = self.prazos.get(chave)
+        return 0 if prazo is None else prazo - self.agora
+
+    # ------------------------ AVANÇO ------------------------
+    def avanca(self, agora):
+        """Leva a agenda ao tick `agora` e devolve, em ordem, as chaves vencidas no caminho."""
+        vencidos = []
+        prazos = self.prazos
+        while self.agora < agora:
+            self.agora = tick = self.agora + 1
+            if not tick & (CASAS - 1):
+                # Rodas de cima primeiro, para um timer poder descer várias de uma vez
+                for nivel in range(NIVEIS - 1, 0, -1):
+                    if tick & ((1 << (BITS_CASA * nivel)) - 1):
+                        continue
+                    roda = self.rodas[nivel]
+                    i = (tick >> (BITS_CASA * nivel)) & (CASAS - 1)
+                    casa, roda[i] = roda[i], []
+                    for prazo, chave in casa:
+                        if prazos.get(chave) == prazo:
+                            self._insere(chave, prazo)
+            roda = self.rodas[0]
+            i = tick & (CASAS - 1)
+            casa = roda[i]
+            if not casa:
+                continue
+            roda[i] = []
+            for prazo, chave in casa:
+                if prazos.get(chave) != prazo:
+                    continue
+                if prazo > tick:
+                    self._insere(chave, prazo)   # além do horizonte: mais uma volta
+                else:
+                    del prazos[chave]
+                    vencidos.append(chave)
+        if len(vencidos) > 1:
+            vencidos.sort()
+        return vencidos
+
+    # ------------------------ ESTADO ------------------------
+    def timers(self):
+        """(chave, prazo) de todos os timers, em ordem de chave."""
+        return sorted(self.prazos.items())
+
+    def carrega(self, agora, timers):
+        """Remonta a agenda no tick `agora` com os (chave, prazo) dados."""
+        self.limpa(agora)
+        for chave, prazo in timers:
+            self.agenda(chave, prazo)
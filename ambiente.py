@@ -0,0 +1,284 @@
+import argparse
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from constantes import *
+from simulacao import Simulacao
+
+"""
+Ambiente de treino
+==================
+Interface no estilo Gym sobre a simulação, sem janela: `reset()` devolve
+(observação, info) e `step(acao)` devolve (observação, recompensa,
+terminado, truncado, info). A observação é um vetor float32 de tamanho
+fixo com a nave, a formação inteira, os projéteis, o UFO e os power-ups,
+em coordenadas normalizadas pela tela.
+
+AmbientesVetorizados roda N ambientes em processos, com observações,
+recompensas e fins de episódio em memória compartilhada: a cada passo só
+as ações e um comando curto atravessam os pipes.
+
+    python ambiente.py --ambientes 8 --processos 1 2 4
+"""
+
+# Ações: (tecla de movimento mantida, atira)
+ACOES = [
+    (None, False),
+    (TECLA_ESQUERDA, False),
+    (TECLA_DIREITA, False),
+    (None, True),
+    (TECLA_ESQUERDA, True),
+    (TECLA_DIREITA, True),
+]
+
+MAX_MISSEIS_OBS = 4       # mísseis do jogador observados
+MAX_INIMISSEIS_OBS = 16   # mísseis inimigos mais baixos observados
+MAX_POWERUPS_OBS = 2
+
+TAM_NAVE = 4                                     # x, velocidade extra, vidas, invulnerável
+TAM_FORMACAO = 3 * LINS_INIMIGOS * COLS_INIMIGOS   # vivo, x, y de cada posição da grade
+TAM_MISSEIS = 3 * MAX_MISSEIS_OBS                # presente, x, y
+TAM_INIMISSEIS = 3 * MAX_INIMISSEIS_OBS          # presente, x, y
+TAM_UFO = 3                                      # presente, x, direção
+TAM_POWERUPS = 4 * MAX_POWERUPS_OBS              # presente, x, y, é vida
+TAM_OBS = TAM_NAVE + TAM_FORMACAO + TAM_MISSEIS + TAM_INIMISSEIS + TAM_UFO + TAM_POWERUPS
+
+PENALIDADE_VIDA = 5.0
+MAX_PASSOS_EPISODIO = 20_000
+
+
+class AmbienteInvaxians:
+    """Uma partida controlada por ações discretas (índices de ACOES)."""
+
+    n_acoes = len(ACOES)
+    tam_obs = TAM_OBS
+
+    def __init__(self, semente=None, max_passos=MAX_PASSOS_EPISODIO):
+        self.semente = semente
+        self.max_passos = max_passos
+        self.sim = None
+        self.passos = 0
+        self.direcao = None
+
+    def reset(self, semente=None, saida=None):
+        """Começa uma partida nova; a observação é escrita em `saida`, se dada."""
+        if semente is None:
+            semente = self.semente
+            # Sementes seguintes derivadas da primeira: episódios diferentes, reproduzíveis
+            if self.semente is not None:
+                self.semente += 1
+        self.sim = Simulacao(semente)
+        self.sim.inicia_partida()
+        self.passos = 0
+        self.direcao = None
+        return self.observa(saida), self.info()
+
+    def step(self, acao, saida=None):
+        sim = self.sim
+        direcao, atira = ACOES[acao]
+        if direcao != self.direcao:
+            if self.direcao is not None:
+                sim.solta(self.direcao)
+            if direcao is not None:
+                sim.pressiona(direcao)
+            self.direcao = direcao
+        if atira:
+            sim.pressiona(TECLA_ESPACO)
+
+        fase, vidas, restantes = sim.fase, sim.vidas, sim.formacao.quantidade
+        sim.passo()
+        sim.eventos.clear()
+        self.passos += 1
+
+        # Placar e vidas recomeçam a cada fase: a recompensa vem das diferenças
+        if sim.fase != fase:
+            recompensa = float(restantes)
+        else:
+            recompensa = float(restantes - sim.formacao.quantidade)
+            if sim.vidas < vidas:
+                recompensa -= PENALIDADE_VIDA * (vidas - sim.vidas)
+        terminado = sim.game_state == GAME_STATE_GAME_OVER
+        if terminado:
+            recompensa -= PENALIDADE_VIDA
+        truncado = not terminado and self.passos >= self.max_passos
+        return self.observa(saida), recompensa, terminado, truncado, self.info()
+
+    def info(self):
+        return {"placar": self.sim.placar, "fase": self.sim.fase, "vidas": self.sim.vidas}
+
+    def observa(self, saida=None):
+        """Vetor de observação (TAM_OBS float32), escrito em `saida` se dada."""
+        obs = saida if saida is not None else np.empty(TAM_OBS, dtype=np.float32)
+        obs.fill(0.0)
+        sim = self.sim
+        i = 0
+
+        nave = sim.nave
+        obs[i:i + TAM_NAVE] = (nave.center_x / LARG_TELA, sim.speed_timer > 0,
+                               sim.vidas / MAX_VIDAS, sim.revive > 0)
+        i += TAM_NAVE
+
+        formacao = sim.formacao
+        n = min(len(formacao.vivo), LINS_INIMIGOS * COLS_INIMIGOS)
+        grade = obs[i:i + TAM_FORMACAO].reshape(-1, 3)
+        grade[:n, 0] = formacao.vivo[:n]
+        grade[:n, 1] = formacao.x[:n] / LARG_TELA
+        grade[:n, 2] = formacao.y[:n] / ALT_TELA
+        i += TAM_FORMACAO
+
+        i = self._projeteis(obs, i, sim.missil_list, MAX_MISSEIS_OBS)
+        # Os mísseis inimigos mais baixos são os mais perigosos
+        inimisseis = sorted(sim.inimissil_list, key=lambda m: m.center_y)
+        i = self._projeteis(obs, i, inimisseis, MAX_INIMISSEIS_OBS)
+
+        if sim.ufo_list:
+            ufo = sim.ufo_list[0]
+            obs[i:i + TAM_UFO] = (1.0, ufo.center_x / LARG_TELA, np.sign(ufo.change_x))
+        i += TAM_UFO
+
+        for power in sim.powerup_list[:MAX_POWERUPS_OBS]:
+            obs[i:i + 4] = (1.0, power.center_x / LARG_TELA, power.center_y / ALT_TELA,
+                            power.tipo == "life")
+            i += 4
+        return obs
+
+    @staticmethod
+    def _projeteis(obs, i, lista, maximo):
+        for j, ent in enumerate(lista[:maximo]):
+            k = i + 3 * j
+            obs[k:k + 3] = (1.0, ent.center_x / LARG_TELA, ent.center_y / ALT_TELA)
+        return i + 3 * maximo
+
+
+# ------------------------ VETORIZAÇÃO ------------------------
+def _trabalhador(conexao, nomes, n, inicio, fim, semente):
+    """Roda os ambientes [inicio, fim) escrevendo direto na memória compartilhada."""
+    memorias = [shared_memory.SharedMemory(name=nome) for nome in nomes]
+    obs, recompensas, terminados, truncados, acoes = _vistas(memorias, n)
+    ambientes = [AmbienteInvaxians(semente + k * 1_000_003 if semente is not None else None)
+                 for k in range(inicio, fim)]
+    try:
+        while True:
+            comando = conexao.recv()
+            if comando == "reset":
+                for k, amb in enumerate(ambientes, inicio):
+                    amb.reset(saida=obs[k])
+            elif comando == "step":
+                for k, amb in enumerate(ambientes, inicio):
+                    _, r, term, trunc, _ = amb.step(acoes[k], saida=obs[k])
+                    recompensas[k], terminados[k], truncados[k] = r, term, trunc
+                    if term or trunc:
+                        # Reinício automático; a observação já é a do novo episódio
+                        amb.reset(saida=obs[k])
+            else:
+                break
+            conexao.send(True)
+    finally:
+        del obs, recompensas, terminados, truncados, acoes
+        for memoria in memorias:
+            memoria.close()
+
+
+def _vistas(memorias, n):
+    """Arrays NumPy sobre os blocos de memória compartilhada."""
+    return (np.ndarray((n, TAM_OBS), np.float32, memorias[0].buf),
+            np.ndarray(n, np.float32, memorias[1].buf),
+            np.ndarray(n, np.bool_, memorias[2].buf),
+            np.ndarray(n, np.bool_, memorias[3].buf),
+            np.ndarray(n, np.int64, memorias[4].buf))
+
+
+class AmbientesVetorizados:
+    """N ambientes divididos entre `processos` trabalhadores, com reinício automático."""
+
+    def __init__(self, n, processos=None, semente=None):
+        self.n = n
+        processos = max(1, min(processos or mp.cpu_count(), n))
+        tamanhos = (n * TAM_OBS * 4, n * 4, n, n, n * 8)
+        self.memorias = [shared_memory.SharedMemory(create=True, size=t) for t in tamanhos]
+        self.obs, self.recompensas, self.terminados, self.truncados, self.acoes = \
+            _vistas(self.memorias, n)
+        nomes = [m.name for m in self.memorias]
+
+        self.conexoes = []
+        self.processos = []
+        limites = np.linspace(0, n, processos + 1).astype(int)
+        for inicio, fim in zip(limites[:-1], limites[1:]):
+            nossa, deles = mp.Pipe()
+            proc = mp.Process(target=_trabalhador, args=(deles, nomes, n, int(inicio), int(fim), semente),
+                              daemon=True)
+            proc.start()
+            self.conexoes.append(nossa)
+            self.processos.append(proc)
+
+    def _comanda(self, comando):
+        for conexao in self.conexoes:
+            conexao.send(comando)
+        for conexao in self.conexoes:
+            conexao.recv()
+
+    def reset(self):
+        self._comanda("reset")
+        return self.obs.copy()
+
+    def step(self, acoes):
+        """Aplica uma ação por ambiente; devolve cópias de obs, recompensas, terminados e truncados."""
+        self.acoes[:] = acoes
+        self._comanda("step")
+        return self.obs.copy(), self.recompensas.copy(), self.terminados.copy(), self.truncados.copy()
+
+    def close(self):
+        for conexao in self.conexoes:
+            conexao.send("fim")
+        for proc in self.processos:
+            proc.join()
+        del self.obs, self.recompensas, self.terminados, self.truncados, self.acoes
+        for memoria in self.memorias:
+            memoria.close()
+            memoria.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+# ------------------------ VAZÃO ------------------------
+def mede_vazao(n, processos, passos, semente=0):
+    """Passos de ambiente por segundo com ações aleatórias."""
+    rng = np.random.default_rng(semente)
+    with AmbientesVetorizados(n, processos, semente) as vetor:
+        vetor.reset()
+        inicio = time.perf_counter()
+        for _ in range(passos):
+            vetor.step(rng.integers(0, len(ACOES), n))
+        duracao = time.perf_counter() - inicio
+    return n * passos / duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão dos ambientes de treino do Invaxians")
+    parser.add_argument("--ambientes", type=int, default=8, help="ambientes por vetor")
+    parser.add_argument("--processos", type=int, nargs="+", default=[1],
+                        help="quantidades de processos trabalhadores a medir")
+    parser.add_argument("--passos", type=int, default=2000, help="passos do vetor por medição")
+    args = parser.parse_args()
+
+    nucleos = mp.cpu_count()
+    print(f"{nucleos} núcleos disponíveis")
+    base = None
+    for processos in args.processos:
+        vazao = mede_vazao(args.ambientes, processos, args.passos)
+        # Mais processos que núcleos não somam núcleos: dividem os mesmos
+        por_nucleo = vazao / min(processos, nucleos)
+        base = base or por_nucleo
+        print(f"{processos:>3} processos: {vazao:9.0f} passos/s  {por_nucleo:8.0f} por núcleo  "
+              f"(eficiência {por_nucleo / base:.0%})")
+
+
+if __name__ == "__main__":
+    main()
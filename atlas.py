@@ -0,0 +1,185 @@
+import argparse
+import io
+import json
+import mmap
+import os
+import struct
+
+from PIL import Image
+
+from constantes import *
+import hitboxes
+
+"""
+Atlas de texturas pré-montado
+=============================
+Etapa de build que junta todos os PNGs de TEXTURAS numa única folha RGBA
+sem compressão, com um índice JSON das regiões, das hit boxes (do cache
+de hitboxes.py, que precisa estar em dia) e do SHA-1 de cada PNG. Na
+inicialização o arquivo é mapeado em memória e cada textura é recortada
+da folha, sem decodificar PNG nem varrer pixels; se algum PNG não bate
+mais com o seu hash, o jogo refaz o atlas antes de abri-lo.
+
+    python hitboxes.py && python atlas.py   # refazer sempre que um PNG mudar
+
+Formato (little-endian):
+    cabeçalho  "IVXA", versão (u8), tamanho do índice (u32)
+    índice     JSON: largura e altura da folha, id -> região, hit box e SHA-1 do PNG
+    folha      largura x altura pixels RGBA, começando num múltiplo de 16
+"""
+
+MARCA = b"IVXA"
+VERSAO = 2
+CABECALHO = struct.Struct("<4sBI")
+
+LARG_FOLHA = 2048
+MARGEM = 1   # pixels vazios entre regiões, para o filtro linear não misturar vizinhas
+
+
+class AtlasInvalido(ValueError):
+    """Arquivo que não é um atlas do Invaxians nesta versão."""
+
+
+def _inicio_folha(tam_indice):
+    fim = CABECALHO.size + tam_indice
+    return (fim + 15) // 16 * 16
+
+
+# ------------------------ BUILD ------------------------
+def empacota(imagens, largura=LARG_FOLHA):
+    """Posições (x, y) de cada imagem em prateleiras, das mais altas às mais baixas."""
+    posicoes = {}
+    x = y = altura_prateleira = 0
+    for nome in sorted(imagens, key=lambda n: -imagens[n].height):
+        img = imagens[nome]
+        if x + img.width > largura:
+            x = 0
+            y += altura_prateleira + MARGEM
+            altura_prateleira = 0
+        posicoes[nome] = (x, y)
+        x += img.width + MARGEM
+        altura_prateleira = max(altura_prateleira, img.height)
+    return posicoes, y + altura_prateleira
+
+
+def monta(base_path=".", caminho=None):
+    """Decodifica os PNGs de TEXTURAS e grava o atlas; devolve o caminho gravado.
+
+    Só lê o cache de hit boxes: se algum PNG mudou desde o último
+    'python hitboxes.py', levanta ValueError em vez de gravar polígonos velhos.
+    """
+    caminho = caminho or os.path.join(base_path, PATH_ATLAS)
+    mudaram = hitboxes.desatualizadas(base_path)
+    if mudaram:
+        raise ValueError(f"hit boxes desatualizadas: {', '.join(mudaram)}; refaça com 'python hitboxes.py'")
+    poligonos = hitboxes.le_poligonos(os.path.join(base_path, PATH_HITBOXES))
+    imagens, hashes = {}, {}
+    for textura, (arquivo, largura, altura) in TEXTURAS.items():
+        try:
+            with open(os.path.join(base_path, PATH_PNG, arquivo), "rb") as arq:
+                dados = arq.read()
+        except FileNotFoundError:
+            print(f"AVISO: textura '{arquivo}' não encontrada; fica fora do atlas.")
+            continue
+        img = Image.open(io.BytesIO(dados)).convert("RGBA")
+        if img.size != (largura, altura):
+            print(f"AVISO: '{arquivo}' tem {img.size}, constantes.TEXTURAS diz {(largura, altura)}.")
+        imagens[textura] = img
+        hashes[textura] = hitboxes.hash_arquivo(dados)
+
+    posicoes, altura = empacota(imagens)
+    folha = Image.new("RGBA", (LARG_FOLHA, altura))
+    regioes = {}
+    for textura, img in imagens.items():
+        x, y = posicoes[textura]
+        folha.paste(img, (x, y))
+        regioes[textura] = {
+            "x": x, "y": y, "w": img.width, "h": img.height,
+            "hit_box": poligonos[textura],
+            "sha1": hashes[textura],
+        }
+
+    indice = json.dumps({"largura": LARG_FOLHA, "altura": altura, "texturas": regioes}).encode()
+    with open(caminho, "wb") as arq:
+        arq.write(CABECALHO.pack(MARCA, VERSAO, len(indice)))
+        arq.write(indice)
+        arq.write(bytes(_inicio_folha(len(indice)) - CABECALHO.size - len(indice)))
+        arq.write(folha.tobytes())
+    return caminho
+
+
+# ------------------------ LEITURA ------------------------
+def desatualizadas(caminho, base_path="."):
+    """Ids cujo PNG não bate com o hash guardado no atlas (ou que não estão nele).
+
+    Lê só o cabeçalho e o índice, sem mapear a folha; PNGs ausentes não contam.
+    """
+    with open(caminho, "rb") as arq:
+        cabecalho = arq.read(CABECALHO.size)
+        if len(cabecalho) < CABECALHO.size:
+            raise AtlasInvalido(f"{caminho}: arquivo curto demais")
+        marca, versao, tam_indice = CABECALHO.unpack(cabecalho)
+        if marca != MARCA or versao != VERSAO:
+            raise AtlasInvalido(f"{caminho}: não é um atlas versão {VERSAO}")
+        regioes = json.loads(arq.read(tam_indice))["texturas"]
+    resultado = []
+    for textura, (arquivo, _, _) in TEXTURAS.items():
+        try:
+            with open(os.path.join(base_path, PATH_PNG, arquivo), "rb") as arq:
+                sha1 = hitboxes.hash_arquivo(arq.read())
+        except FileNotFoundError:
+            continue
+        if textura not in regioes or regioes[textura]["sha1"] != sha1:
+            resultado.append(textura)
+    return resultado
+
+
+class Atlas:
+    """Atlas mapeado em memória; `recorta` devolve a imagem de uma textura."""
+
+    def __init__(self, caminho):
+        with open(caminho, "rb") as arq:
+            self._mapa = mmap.mmap(arq.fileno(), 0, access=mmap.ACCESS_READ)
+        mapa = self._mapa
+        if len(mapa) < CABECALHO.size:
+            raise AtlasInvalido(f"{caminho}: arquivo curto demais")
+        marca, versao, tam_indice = CABECALHO.unpack_from(mapa)
+        if marca != MARCA or versao != VERSAO:
+            raise AtlasInvalido(f"{caminho}: não é um atlas versão {VERSAO}")
+        indice = json.loads(mapa[CABECALHO.size:CABECALHO.size + tam_indice])
+        self.largura, self.altura = indice["largura"], indice["altura"]
+        self.regioes = indice["texturas"]
+        inicio = _inicio_folha(tam_indice)
+        if len(mapa) != inicio + self.largura * self.altura * 4:
+            raise AtlasInvalido(f"{caminho}: tamanho não confere com o índice")
+        # Imagem sobre o próprio mapa: nenhum pixel é copiado até o recorte
+        self.folha = Image.frombuffer("RGBA", (self.largura, self.altura), memoryview(mapa)[inicio:],
+                                     "raw", "RGBA", 0, 1)
+
+    def __contains__(self, textura):
+        return textura in self.regioes
+
+    def recorta(self, textura):
+        """(imagem, hit box) da textura, com a imagem copiada para fora do mapa."""
+        r = self.regioes[textura]
+        imagem = self.folha.crop((r["x"], r["y"], r["x"] + r["w"], r["y"] + r["h"]))
+        return imagem, [tuple(p) for p in r["hit_box"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monta o atlas de texturas do Invaxians")
+    parser.add_argument("--saida", metavar="ARQUIVO", default=None,
+                        help=f"arquivo gerado (padrão: {PATH_ATLAS})")
+    args = parser.parse_args()
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    try:
+        caminho = monta(base_path, args.saida)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    atlas = Atlas(caminho)
+    print(f"{len(atlas.regioes)} texturas em {atlas.largura}x{atlas.altura} -> {caminho} "
+          f"({os.path.getsize(caminho) / 2 ** 20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from pyglet import media
+
+"""
+Mixer com vozes fixas
+=====================
+Cada som tem um número fixo de vozes (players do pyglet) criadas uma única
+vez. Tocar um som reaproveita uma voz livre; sem voz livre, a de menor
+prioridade (e, no empate, a mais antiga) é interrompida, ou o pedido é
+recusado se todas forem mais importantes. Pedidos do mesmo som no mesmo
+tick viram um só.
+"""
+
+
+class Voz(media.Player):
+    """Player que, ao terminar, volta ao início em vez de descartar a fonte."""
+
+    def __init__(self, fonte, volume):
+        super().__init__()
+        self.volume = volume
+        self.prioridade = 0
+        self.inicio = 0
+        self.queue(fonte)
+
+    def on_eos(self):
+        # O padrão avançaria para a próxima fonte e apagaria o player do driver
+        self.pause()
+        self.seek(0.0)
+
+    def toca(self, prioridade, tick):
+        self.prioridade = prioridade
+        self.inicio = tick
+        self.seek(0.0)
+        self.play()
+
+
+class Mixer:
+    """Vozes por som, com roubo por prioridade e fusão de pedidos no mesmo tick."""
+
+    def __init__(self):
+        self.canais = {}
+        self.ultimo = {}   # som -> (tick, voz) da última vez que tocou
+        self.tocados = 0
+        self.fundidos = 0
+        self.roubados = 0
+        self.recusados = 0
+
+    def registra(self, nome, som, vozes, volume=1.0):
+        """Cria as vozes de um arcade.Sound carregado sem streaming."""
+        self.canais[nome] = [Voz(som.source, volume) for _ in range(vozes)]
+
+    def toca(self, nome, tick, prioridade=0):
+        """Toca o som `nome`; devolve False se o pedido foi fundido ou recusado."""
+        vozes = self.canais.get(nome)
+        if not vozes:
+            return False
+        ultimo = self.ultimo.get(nome)
+        if ultimo and ultimo[0] == tick:
+            # Já tocou neste tick: só herda a prioridade, para não ser roubada
+            ultimo[1].prioridade = max(ultimo[1].prioridade, prioridade)
+            self.fundidos += 1
+            return False
+
+        voz = next((v for v in vozes if not v.playing), None)
+        if voz is None:
+            voz = min(vozes, key=lambda v: (v.prioridade, v.inicio))
+            if voz.prioridade > prioridade:
+                self.recusados += 1
+                return False
+            self.roubados += 1
+        voz.toca(prioridade, tick)
+        self.ultimo[nome] = (tick, voz)
+        self.tocados += 1
+        return True
+
+    def ativas(self):
+        return sum(v.playing for vozes in self.canais.values() for v in vozes)
+
+    def estatisticas(self):
+        return {"tocados": self.tocados, "fundidos": self.fundidos,
+                "roubados": self.roubados, "recusados": self.recusados}
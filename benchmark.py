@@ -0,0 +1,692 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from constantes import *
+from simulacao import Simulacao, Entidade
+from bot import BotSimples
+from colisao import tocam
+import estado
+import hitboxes
+import telemetria
+
+"""
+Benchmarks do laço de jogo
+==========================
+Roda cenários fixos (mesma semente, mesmo piloto) e mede o custo de cada
+quadro: percentis p50/p95/p99, memória alocada e liberada dentro do quadro
+(tracemalloc), variação líquida de blocos por quadro e pico de memória. Os
+resultados vão para JSON e podem ser comparados com uma linha de base
+salva, acusando regressões acima de um limite.
+
+Cada modo é um subcomando; todos aceitam --saida ARQUIVO.json.
+
+    python benchmark.py cenarios --saida base.json
+    python benchmark.py cenarios --compara base.json --limite 0.10
+    python benchmark.py render            # os cenários com on_draw (precisa de GL)
+    python benchmark.py inicio 5          # tempo até o primeiro quadro, a frio
+    python benchmark.py importacao 5      # importação e início do modo sem janela, a frio
+    python benchmark.py latencia 600 --carga 40   # tecla -> movimento com quadros pesados (GL)
+    python benchmark.py colisoes 10 100 1000      # custo das colisões por quantidade de projéteis
+    python benchmark.py estados           # tamanho e tempos de salvar/restaurar o estado
+    python benchmark.py telemetria 20000  # custo da telemetria por quadro, disco normal e travado
+    python benchmark.py hitboxes 2000 --tolerancia 1   # colisões contra os polígonos do arcade
+"""
+
+SEMENTE = 1234
+JOGO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "invaxians.py")
+
+
+# ------------------------ CENÁRIOS ------------------------
+class Cenario:
+    """Monta um estado de jogo e o mantém durante a medição."""
+
+    nome = ""
+    descricao = ""
+
+    def prepara(self, sim):
+        sim.inicia_partida()
+
+    def a_cada_quadro(self, sim, quadro):
+        pass
+
+
+class FormacaoCompleta(Cenario):
+    nome = "fase1_formacao_completa"
+    descricao = "fase 1, formação 5x7 inteira, piloto automático"
+
+
+class Fase30(Cenario):
+    nome = "fase30_tiro_maximo"
+    descricao = "fase 30, p_inimissil no piso de 50, nave invulnerável"
+
+    def prepara(self, sim):
+        sim.inicia_partida()
+        sim.fase = 30
+        sim.inicia_jogo()
+
+    def a_cada_quadro(self, sim, quadro):
+        sim.revive = DT_REVIVE   # invulnerável: o cenário mede os tiros, não o fim de jogo
+
+
+class RajadaUfo(Cenario):
+    nome = "bonus_ufo_rajada"
+    descricao = "bônus do UFO ativo o tempo todo, um tiro por quadro"
+
+    def a_cada_quadro(self, sim, quadro):
+        sim.bonus_ufo = DT_UFO
+        sim.revive = DT_REVIVE
+
+
+class ExplosoesEmMassa(Cenario):
+    nome = "explosoes_em_massa"
+    descricao = "200 explosões simultâneas a cada 40 quadros"
+
+    def a_cada_quadro(self, sim, quadro):
+        sim.revive = DT_REVIVE
+        if quadro % 40 == 0:
+            for i in range(200):
+                sim.cria_explosao(40 + (i * 37) % (LARG_TELA - 80), 100 + (i * 53) % (ALT_TELA - 200))
+
+
+class TrocaDeFase(Cenario):
+    nome = "troca_de_fase"
+    descricao = "formação eliminada a cada 30 quadros, forçando a troca de fase"
+
+    def a_cada_quadro(self, sim, quadro):
+        sim.revive = DT_REVIVE
+        if quadro % 30 == 29:
+            sim.formacao.vivo[:] = False
+            sim.formacao.quantidade = 0
+
+
+CENARIOS = [FormacaoCompleta(), Fase30(), RajadaUfo(), ExplosoesEmMassa(), TrocaDeFase()]
+
+
+# ------------------------ MEDIÇÃO ------------------------
+class AlvoSimulacao:
+    """Executa os quadros só com a simulação (equivalente ao on_update)."""
+
+    def __init__(self):
+        self.sim = Simulacao(SEMENTE)
+
+    def quadro(self):
+        self.sim.passo()
+
+
+class AlvoJanela:
+    """Executa on_update e on_draw de uma MeuJogo de verdade."""
+
+    def __init__(self):
+        import janela   # só importa arcade quando o desenho é medido
+        self.janela = janela.MeuJogo(semente=SEMENTE)
+        self.janela.inicia_bg()
+        self.janela.termina_carregamento()
+        self.sim = self.janela.sim
+
+    def quadro(self):
+        self.janela.on_update(self.janela.dt_tick)
+        self.janela.on_draw()
+        self.janela.ctx.finish()
+
+
+def percentis(amostras):
+    q = statistics.quantiles(amostras, n=100)
+    return {"p50": q[49], "p95": q[94], "p99": q[98]}
+
+
+def _roda(alvo, cenario, bot, quadros, medir):
+    """Roda os quadros; devolve os índices dos quadros em que a fase mudou."""
+    sim = alvo.sim
+    trocas = []
+    for quadro in range(quadros):
+        if sim.game_state != GAME_STATE_PLAYING:
+            cenario.prepara(sim)
+        cenario.a_cada_quadro(sim, quadro)
+        bot.joga(sim)
+        fase = sim.fase
+        medir(alvo.quadro)
+        if sim.fase != fase:
+            trocas.append(quadro)
+    return trocas
+
+
+def mede(cenario, quadros, render=False):
+    """Mede um cenário: tempos numa passada e memória numa segunda passada."""
+    tempos = []
+    blocos = []
+
+    def cronometra(fn):
+        # Os blocos são lidos por dentro do cronômetro, para não contarem os próprios números
+        t0 = time.perf_counter_ns()
+        b0 = sys.getallocatedblocks()
+        fn()
+        b1 = sys.getallocatedblocks()
+        t1 = time.perf_counter_ns()
+        tempos.append((t1 - t0) / 1e6)
+        blocos.append(b1 - b0)
+
+    nova = AlvoJanela if render else AlvoSimulacao
+    alvo = nova()
+    cenario.prepara(alvo.sim)
+    trocas = _roda(alvo, cenario, BotSimples(), quadros, cronometra)
+
+    # Memória numa passada separada: o tracemalloc distorce os tempos. O pico de
+    # cada quadro acima do que já estava alocado conta o que foi alocado e
+    # liberado dentro dele, que a variação líquida de blocos não vê.
+    alvo = nova()
+    cenario.prepara(alvo.sim)
+    transitorios = []
+    pico = 0
+
+    def rastreia(fn):
+        nonlocal pico
+        tracemalloc.reset_peak()
+        antes, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, pico_quadro = tracemalloc.get_traced_memory()
+        transitorios.append(pico_quadro - antes)
+        pico = max(pico, pico_quadro)
+
+    tracemalloc.start()
+    _roda(alvo, cenario, BotSimples(), quadros, rastreia)
+    tracemalloc.stop()
+
+    resultado = {"descricao": cenario.descricao, "quadros": quadros}
+    resultado.update({f"{k}_ms": v for k, v in percentis(tempos).items()})
+    resultado["media_ms"] = statistics.fmean(tempos)
+    resultado["pior_ms"] = max(tempos)
+    if trocas:
+        # Quadros de troca de fase: o pior deles é o engasgo visível entre fases
+        resultado["trocas_de_fase"] = len(trocas)
+        resultado["pior_troca_ms"] = max(tempos[q] for q in trocas)
+    resultado["blocos_liquidos_por_quadro"] = statistics.fmean(blocos)
+    resultado["transitorio_p50_kib"] = statistics.median(transitorios) / 1024
+    resultado["transitorio_medio_kib"] = statistics.fmean(transitorios) / 1024
+    resultado["pico_memoria_kib"] = pico / 1024
+    return resultado
+
+
+def mede_inicio(vezes):
+    """Tempo até o primeiro quadro e até o fim do carregamento, em processos novos.
+
+    O relógio de perf_counter é monotônico e do sistema, então o instante
+    impresso pelo jogo pode ser comparado com o de antes do lançamento.
+    """
+    primeiro, pronto = [], []
+    for _ in range(vezes):
+        t0 = time.perf_counter()
+        saida = subprocess.run([sys.executable, JOGO, "--mede-inicio"],
+                               capture_output=True, text=True, check=True).stdout
+        marcas = dict(linha.split() for linha in saida.splitlines()
+                      if linha.startswith(("primeiro_quadro", "pronto")))
+        primeiro.append((float(marcas["primeiro_quadro"]) - t0) * 1000)
+        pronto.append((float(marcas["pronto"]) - t0) * 1000)
+    return {"vezes": vezes,
+            "primeiro_quadro_ms": statistics.median(primeiro),
+            "pronto_ms": statistics.median(pronto)}
+
+
+def mede_latencia(quadros, carga_ms):
+    """Latência da tecla de direção ao primeiro movimento, numa janela com quadros pesados.
+
+    Em cerca de um quadro a cada quatro chega um evento de direção (aperta
+    ou solta) no meio de um quadro que gasta `carga_ms` a mais, como um
+    desenho pesado; o laço de passo fixo recupera vários passos por quadro.
+    """
+    import arcade
+    import janela   # só importa arcade quando a janela é medida
+    jogo = janela.MeuJogo(semente=SEMENTE)
+    jogo.inicia_bg()
+    jogo.termina_carregamento()
+    rng = random.Random(SEMENTE)
+    seguradas = set()
+    anterior = time.perf_counter()
+    for _ in range(quadros):
+        if jogo.sim.game_state != GAME_STATE_PLAYING:
+            jogo.on_key_press(arcade.key.SPACE, 0)
+        jogo.sim.revive = DT_REVIVE   # a partida não acaba no meio da medição
+        antes = rng.uniform(0, carga_ms)
+        time.sleep(antes / 1000)
+        if rng.random() < 0.25:
+            tecla = rng.choice((arcade.key.LEFT, arcade.key.RIGHT))
+            if tecla in seguradas:
+                seguradas.discard(tecla)
+                jogo.on_key_release(tecla, 0)
+            else:
+                seguradas.add(tecla)
+                jogo.on_key_press(tecla, 0)
+        time.sleep((carga_ms - antes) / 1000)
+        agora = time.perf_counter()
+        jogo.on_update(agora - anterior)
+        anterior = agora
+        jogo.on_draw()
+    resultado = jogo.latencia.resumo() or {"amostras": 0}
+    resultado.update({"carga_ms": carga_ms, "ms_por_tick": 1000 / TAXA_TICKS})
+    return resultado
+
+
+# Pilhas que o modo sem janela não pode carregar
+MODULOS_JANELA = ("arcade", "pyglet", "PIL", "janela", "texturas", "audio")
+
+# Importa o módulo num processo novo e diz quanto levou e o que veio junto
+SONDA_IMPORTACAO = """
+import json, sys, time
+t0 = time.perf_counter()
+import {modulo}
+t1 = time.perf_counter()
+pilhas = sorted({{nome.split(".")[0] for nome in sys.modules}} & set({pilhas!r}))
+print(json.dumps({{"ms": (t1 - t0) * 1000, "pilhas": pilhas}}))
+"""
+
+
+def mede_importacao(vezes):
+    """Importação do jogo e da janela e início do --headless, em processos novos.
+
+    O jogo (invaxians) tem de importar sem nenhuma das MODULOS_JANELA; a
+    janela mostra o que o modo sem janela deixa de pagar.
+    """
+    resultados = {"vezes": vezes}
+    for modulo in ("invaxians", "janela"):
+        tempos, pilhas = [], set()
+        for _ in range(vezes):
+            saida = subprocess.run([sys.executable, "-c", SONDA_IMPORTACAO.format(modulo=modulo,
+                                                                                   pilhas=MODULOS_JANELA)],
+                                   capture_output=True, text=True, check=True, cwd=os.path.dirname(JOGO))
+            medida = json.loads(saida.stdout.splitlines()[-1])
+            tempos.append(medida["ms"])
+            pilhas.update(medida["pilhas"])
+        resultados[f"importa_{modulo}_ms"] = statistics.median(tempos)
+        resultados[f"pilhas_{modulo}"] = sorted(pilhas)
+
+    # Processo inteiro: do lançamento ao fim de um quadro sem janela
+    processo = []
+    for _ in range(vezes):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, JOGO, "--headless", "--quadros", "1"],
+                       capture_output=True, check=True)
+        processo.append((time.perf_counter() - t0) * 1000)
+    resultados["processo_headless_ms"] = statistics.median(processo)
+    return resultados
+
+
+def mede_colisoes(quantidades, repeticoes=200):
+    """Custo de detectar_colisoes com n mísseis e n mísseis inimigos espalhados pela tela."""
+    resultados = {}
+    for n in quantidades:
+        sim = Simulacao(SEMENTE)
+        sim.inicia_partida()
+        rng = random.Random(SEMENTE)
+        for _ in range(n):
+            sim.missil_list.append(sim.nova("missil", "missil", ESCALA_NAVE,
+                                            rng.uniform(0, LARG_TELA), rng.uniform(0, ALT_TELA)))
+            sim.inimissil_list.append(sim.nova("inimissil", "inimissil", ESCALA_INIMIGO,
+                                               rng.uniform(0, LARG_TELA), rng.uniform(0, ALT_TELA)))
+        amostras = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            sim.detecta_colisoes()
+            amostras.append((time.perf_counter() - inicio) * 1000)
+        mediana = statistics.median(amostras)
+        entidades = 2 * n + 2   # projéteis, nave e a formação
+        resultados[n] = {"entidades": entidades, "mediana_ms": mediana,
+                         "us_por_entidade": mediana * 1000 / entidades}
+    return resultados
+
+
+def mede_estados(quadros):
+    """Tamanho do estado salvo e tempos de salvar e restaurar, a cada quadro de cada cenário."""
+    resultados = {}
+    for cenario in CENARIOS:
+        alvo = AlvoSimulacao()
+        cenario.prepara(alvo.sim)
+        tamanhos, salvar, restaurar = [], [], []
+
+        def medir(fn):
+            fn()
+            t0 = time.perf_counter_ns()
+            dados = estado.salva(alvo.sim)
+            t1 = time.perf_counter_ns()
+            estado.restaura(alvo.sim, dados)
+            restaurar.append((time.perf_counter_ns() - t1) / 1000)
+            salvar.append((t1 - t0) / 1000)
+            tamanhos.append(len(dados))
+
+        _roda(alvo, cenario, BotSimples(), quadros, medir)
+        media = statistics.fmean(tamanhos)
+        resultados[cenario.nome] = {
+            "bytes_medio": media, "bytes_max": max(tamanhos),
+            "salva_p50_us": statistics.median(salvar), "salva_p99_us": percentis(salvar)["p99"],
+            "restaura_p50_us": statistics.median(restaurar), "restaura_p99_us": percentis(restaurar)["p99"],
+            "segundos_rebobinaveis": MEMORIA_REBOBINAR / media / TAXA_TICKS,
+        }
+    return resultados
+
+
+class ArquivoTravado(telemetria.ArquivoRolante):
+    """Disco que leva meio segundo por lote: a fila enche e os lotes passam a ser descartados."""
+
+    def grava(self, dados):
+        time.sleep(0.5)
+        super().grava(dados)
+
+
+def mede_telemetria(quadros):
+    """Custo da telemetria no laço do jogo (histograma e eventos de cada quadro).
+
+    Partidas do piloto automático em sequência, cada uma uma sessão. O
+    disco travado usa lotes e fila pequenos, para que a fila encha: o custo
+    por quadro tem de continuar o mesmo, com os lotes descartados.
+    """
+    resultados = {}
+    for nome, arquivo, lote, fila in (("disco", telemetria.ArquivoRolante, LOTE_TELEMETRIA, FILA_TELEMETRIA),
+                                      ("disco_travado", ArquivoTravado, 4, 2)):
+        with tempfile.TemporaryDirectory() as pasta:
+            tel = telemetria.Telemetria(arquivo(pasta), lote, fila)
+            alvo = AlvoSimulacao()
+            cenario = FormacaoCompleta()
+            cenario.prepara(alvo.sim)
+            custos, passos = [], []
+
+            def medir(fn):
+                # O que a janela faz a cada quadro e a cada passo; os eventos de
+                # antes do passo são os do início da partida, como na tecla da janela
+                t0 = time.perf_counter_ns()
+                if alvo.sim.eventos:
+                    tel.observa(alvo.sim)
+                tel.quadro(1 / TAXA_TICKS)
+                t1 = time.perf_counter_ns()
+                fn()
+                t2 = time.perf_counter_ns()
+                if alvo.sim.eventos:
+                    tel.observa(alvo.sim)
+                custos.append((time.perf_counter_ns() - t2 + t1 - t0) / 1000)
+                passos.append((t2 - t1) / 1000)
+
+            _roda(alvo, cenario, BotSimples(), quadros, medir)
+            inicio = time.perf_counter()
+            tel.fecha(alvo.sim, espera=10.0)
+            lidos = list(telemetria.le(pasta))
+            resultados[nome] = {
+                "quadros": quadros, "custo_p50_us": statistics.median(custos),
+                "custo_p99_us": percentis(custos)["p99"], "custo_pior_us": max(custos),
+                "custo_medio_us": statistics.fmean(custos), "passo_medio_us": statistics.fmean(passos),
+                "sessoes": len({r["sessao"] for r in lidos if r["evento"] == "fim"}), "registros": tel.registros,
+                "descartados": tel.descartados, "lidos": len(lidos), "bytes": tel.bytes,
+                "fecha_ms": (time.perf_counter() - inicio) * 1000,
+            }
+    return resultados
+
+
+# Pares que as regras de colisão testam: (textura, escala, ângulo) de cada lado;
+# os mísseis dos inimigos descem girados de 180°
+PARES_COLISAO = (
+    [(("missil", ESCALA_NAVE, 0), (t, ESCALA_INIMIGO, 0)) for t in TIPOS_INIMIGO]
+    + [(("missil", ESCALA_NAVE, 0), ("inimissil", ESCALA_INIMIGO, 180)),
+       (("missil", ESCALA_NAVE, 0), ("ufo", ESCALA_UFO, 0)),
+       (("inimissil", ESCALA_INIMIGO, 180), ("nave", ESCALA_NAVE, 0)),
+       (("nave", ESCALA_NAVE, 0), ("powerup_speed", ESCALA_POWERUP, 0)),
+       (("nave", ESCALA_NAVE, 0), ("powerup_life", ESCALA_POWERUP, 0))]
+    + [(("nave", ESCALA_NAVE, 0), (t, ESCALA_INIMIGO, 0)) for t in TIPOS_INIMIGO]
+)
+ERROS_HITBOXES = ("inteira", "caixa", "simulacao")
+
+
+def mede_hitboxes(amostras):
+    """Teste de colisão da simulação contra os polígonos que o arcade usava nos sprites.
+
+    Para cada par de PARES_COLISAO, sorteia posições relativas em volta da
+    área em que as imagens inteiras se tocam e conta os erros de cada teste
+    em relação aos polígonos ajustados pelo arcade, em % dos contatos de
+    verdade: a imagem inteira (como antes), só a caixa do cache (a fase
+    ampla) e o teste da simulação (caixa e depois colisao.tocam). Mede
+    também o custo de cada teste e a carga das hit boxes: pixels contra cache.
+    """
+    from arcade import hitbox
+    from arcade.geometry import are_polygons_intersecting
+    from PIL import Image
+
+    base_path = os.path.dirname(JOGO)
+    resultados = {"pares": {}}
+
+    # Carga: varrer os pixels de cada PNG (o que o arcade faz ao carregar) contra ler o cache
+    entradas = hitboxes.le()
+    imagens = {t: Image.open(os.path.join(base_path, PATH_PNG, arquivo)).convert("RGBA")
+               for t, (arquivo, _, _) in TEXTURAS.items() if t in entradas}
+    t0 = time.perf_counter()
+    for imagem in imagens.values():
+        hitbox.algo_default.calculate(imagem)
+    t1 = time.perf_counter()
+    poligonos = hitboxes.le_poligonos()
+    t2 = time.perf_counter()
+    resultados.update({"texturas": len(imagens), "pixels_ms": (t1 - t0) * 1000, "cache_ms": (t2 - t1) * 1000})
+
+    caixas = hitboxes.caixas()
+    rng = random.Random(SEMENTE)
+    testes = {"poligono": [], "caixa": [], "simulacao": []}
+    for (ta, ea, ang_a), (tb, eb, ang_b) in PARES_COLISAO:
+        a, b = Entidade(ta, ea), Entidade(tb, eb)
+        a.angle, b.angle = ang_a, ang_b
+        caixa_a = hitbox.RotatableHitBox(poligonos[ta], angle=ang_a, scale=(ea, ea))
+        poligono_b = hitbox.RotatableHitBox(poligonos[tb], angle=ang_b, scale=(eb, eb)).get_adjusted_points()
+        inteira = [(TEXTURAS[t][1] * e, TEXTURAS[t][2] * e) for t, e in ((ta, ea), (tb, eb))]
+        cache = [(caixas[t][0] * e, caixas[t][1] * e) for t, e in ((ta, ea), (tb, eb))]
+        alcance_x = (inteira[0][0] + inteira[1][0]) / 2 * 1.1
+        alcance_y = (inteira[0][1] + inteira[1][1]) / 2 * 1.1
+        contatos = 0
+        erros = {nome: [0, 0] for nome in ERROS_HITBOXES}   # falsos positivos, falsos negativos
+        for _ in range(amostras):
+            dx, dy = rng.uniform(-alcance_x, alcance_x), rng.uniform(-alcance_y, alcance_y)
+            caixa_a.position = a.center_x, a.center_y = dx, dy
+            t0 = time.perf_counter_ns()
+            real = are_polygons_intersecting(caixa_a.get_adjusted_points(), poligono_b)
+            t1 = time.perf_counter_ns()
+            testes["poligono"].append(t1 - t0)
+            contatos += real
+            toca = {}
+            for nome, ((wa, ha), (wb, hb)) in (("inteira", inteira), ("caixa", cache)):
+                t0 = time.perf_counter_ns()
+                toca[nome] = abs(dx) < (wa + wb) / 2 and abs(dy) < (ha + hb) / 2
+                testes["caixa"].append(time.perf_counter_ns() - t0)
+            t0 = time.perf_counter_ns()
+            toca["simulacao"] = toca["caixa"] and tocam(a, b)
+            testes["simulacao"].append(time.perf_counter_ns() - t0)
+            for nome in ERROS_HITBOXES:
+                if toca[nome] != real:
+                    erros[nome][real] += 1
+        resultados["pares"][f"{ta} x {tb}"] = {
+            "contatos": contatos,
+            **{f"{nome}_{tipo}_pct": 100 * erros[nome][i] / max(contatos, 1)
+               for nome in erros for i, tipo in enumerate(("falsos_positivos", "falsos_negativos"))},
+        }
+    resultados.update({f"{nome}_ns": statistics.median(tempos) for nome, tempos in testes.items()})
+    return resultados
+
+
+# ------------------------ COMPARAÇÃO ------------------------
+METRICAS_COMPARADAS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def compara(atual, base, limite):
+    """Lista (cenário, métrica, base, atual, variação) das regressões acima do limite."""
+    regressoes = []
+    for nome, medidas in atual["cenarios"].items():
+        anteriores = base["cenarios"].get(nome)
+        if not anteriores:
+            continue
+        for metrica in METRICAS_COMPARADAS:
+            antes, agora = anteriores[metrica], medidas[metrica]
+            if antes > 0 and agora / antes - 1 > limite:
+                regressoes.append((nome, metrica, antes, agora, agora / antes - 1))
+    return regressoes
+
+
+# ------------------------ MODOS ------------------------
+def roda_cenarios(args, resultados, render=False):
+    resultados.update(render=render, cenarios={})
+    for cenario in CENARIOS:
+        if args.cenario and cenario.nome not in args.cenario:
+            continue
+        r = mede(cenario, args.quadros, render)
+        resultados["cenarios"][cenario.nome] = r
+        print(f"{cenario.nome:<26} p50 {r['p50_ms']:.3f}  p95 {r['p95_ms']:.3f}  "
+              f"p99 {r['p99_ms']:.3f} ms  transitório/quadro p50 {r['transitorio_p50_kib']:.1f} KiB  "
+              f"líquido {r['blocos_liquidos_por_quadro']:+.2f} blocos/quadro  pico {r['pico_memoria_kib']:.0f} KiB")
+        if "pior_troca_ms" in r:
+            print(f"{'':<26} {r['trocas_de_fase']} trocas de fase, pior {r['pior_troca_ms']:.3f} ms")
+
+    if args.compara:
+        with open(args.compara) as arq:
+            base = json.load(arq)
+        regressoes = compara(resultados, base, args.limite)
+        for nome, metrica, antes, agora, variacao in regressoes:
+            print(f"REGRESSÃO {nome} {metrica}: {antes:.3f} -> {agora:.3f} ms (+{variacao:.0%})")
+        if regressoes:
+            raise SystemExit(1)
+        print(f"Sem regressões acima de {args.limite:.0%}.")
+
+
+def roda_render(args, resultados):
+    roda_cenarios(args, resultados, render=True)
+
+
+def roda_inicio(args, resultados):
+    r = resultados["inicio"] = mede_inicio(args.vezes)
+    print(f"{'inicio':<26} primeiro quadro {r['primeiro_quadro_ms']:.0f} ms  "
+          f"pronto {r['pronto_ms']:.0f} ms  (mediana de {r['vezes']})")
+
+
+def roda_importacao(args, resultados):
+    r = resultados["importacao"] = mede_importacao(args.vezes)
+    print(f"{'importacao':<26} invaxians {r['importa_invaxians_ms']:.0f} ms "
+          f"(carregou: {', '.join(r['pilhas_invaxians']) or 'nada da janela'})  "
+          f"janela {r['importa_janela_ms']:.0f} ms  processo --headless {r['processo_headless_ms']:.0f} ms  "
+          f"(mediana de {r['vezes']})")
+    if r["pilhas_invaxians"]:
+        raise SystemExit(1)
+
+
+def roda_latencia(args, resultados):
+    r = resultados["latencia"] = mede_latencia(args.quadros, args.carga)
+    if r["amostras"]:
+        print(f"{'latencia':<26} p50 {r['p50_ms']:.1f} ms  pior {r['pior_ms']:.1f} ms  "
+              f"p50 {r['p50_ticks']} tick  pior {r['pior_ticks']} ticks  "
+              f"(quadros de +{r['carga_ms']:.0f} ms, {r['amostras']} eventos)")
+    if not r["amostras"] or r["pior_ticks"] > 1:
+        raise SystemExit(1)
+
+
+def roda_colisoes(args, resultados):
+    r = resultados["colisoes"] = mede_colisoes(args.quantidades)
+    for n, medida in r.items():
+        print(f"{'colisoes':<16} {medida['entidades']:>6} entidades  "
+              f"{medida['mediana_ms']:8.3f} ms  {medida['us_por_entidade']:.2f} µs/entidade")
+
+
+def roda_estados(args, resultados):
+    r = resultados["estados"] = mede_estados(args.quadros)
+    for nome, medida in r.items():
+        print(f"{nome:<26} {medida['bytes_medio']:6.0f} bytes (máx {medida['bytes_max']})  "
+              f"salva p50 {medida['salva_p50_us']:5.1f} µs  restaura p50 {medida['restaura_p50_us']:5.1f} µs  "
+              f"anel {medida['segundos_rebobinaveis']:.1f} s")
+
+
+def roda_telemetria(args, resultados):
+    r = resultados["telemetria"] = mede_telemetria(args.quadros)
+    for nome, medida in r.items():
+        print(f"{'telemetria_' + nome:<26} p50 {medida['custo_p50_us']:.2f} µs  p99 {medida['custo_p99_us']:.2f} µs  "
+              f"pior {medida['custo_pior_us']:.0f} µs  média {medida['custo_medio_us']:.2f} µs "
+              f"({medida['custo_medio_us'] / (1e6 / TAXA_TICKS):.3%} do quadro de {1000 / TAXA_TICKS:.1f} ms)  "
+              f"{medida['sessoes']} sessões, {medida['registros']} registros, "
+              f"{medida['descartados']} descartados, {medida['bytes']} bytes")
+        if medida["lidos"] + medida["descartados"] != medida["registros"]:
+            raise SystemExit(1)
+
+
+def roda_hitboxes(args, resultados):
+    r = resultados["hitboxes"] = mede_hitboxes(args.amostras)
+    acima = []
+    for par, medida in r["pares"].items():
+        print(f"{par:<26} {medida['contatos']:>5} contatos  "
+              + "  ".join(f"{nome}: +{medida[nome + '_falsos_positivos_pct']:.1f}% "
+                          f"-{medida[nome + '_falsos_negativos_pct']:.1f}%" for nome in ERROS_HITBOXES))
+        if medida["simulacao_falsos_positivos_pct"] + medida["simulacao_falsos_negativos_pct"] > args.tolerancia:
+            acima.append(par)
+    print(f"{'hitboxes':<26} teste: polígonos do arcade {r['poligono_ns'] / 1000:.1f} µs, "
+          f"caixa {r['caixa_ns'] / 1000:.2f} µs, simulação {r['simulacao_ns'] / 1000:.1f} µs  "
+          f"carga de {r['texturas']} texturas: pixels {r['pixels_ms']:.1f} ms, cache {r['cache_ms']:.2f} ms")
+    if acima:
+        print(f"ERRO acima de {args.tolerancia:.1f}% no teste da simulação: {', '.join(acima)}")
+        raise SystemExit(1)
+
+
+def main():
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument("--saida", metavar="ARQUIVO", help="salva os resultados em JSON")
+    cenarios = argparse.ArgumentParser(add_help=False)
+    cenarios.add_argument("--quadros", type=int, default=2000, help="quadros medidos por cenário")
+    cenarios.add_argument("--cenario", action="append", help="roda só os cenários com esse nome")
+    cenarios.add_argument("--compara", metavar="ARQUIVO", help="linha de base JSON para comparar")
+    cenarios.add_argument("--limite", type=float, default=0.10,
+                          help="variação relativa acima da qual um percentil é regressão")
+
+    parser = argparse.ArgumentParser(description="Benchmarks do laço de jogo do Invaxians")
+    modos = parser.add_subparsers(dest="modo", required=True, metavar="MODO")
+
+    modo = modos.add_parser("cenarios", parents=[comum, cenarios], help="custo por quadro dos cenários fixos")
+    modo.set_defaults(roda=roda_cenarios)
+    modo = modos.add_parser("render", parents=[comum, cenarios], help="os cenários com on_draw numa janela (GL)")
+    modo.set_defaults(roda=roda_render)
+
+    modo = modos.add_parser("inicio", parents=[comum], help="tempo até o primeiro quadro, a frio")
+    modo.add_argument("vezes", type=int, nargs="?", default=5, help="inicializações medidas")
+    modo.set_defaults(roda=roda_inicio)
+
+    modo = modos.add_parser("importacao", parents=[comum], help="importação e início sem janela, a frio")
+    modo.add_argument("vezes", type=int, nargs="?", default=5, help="processos novos medidos")
+    modo.set_defaults(roda=roda_importacao)
+
+    modo = modos.add_parser("latencia", parents=[comum], help="tecla -> movimento com quadros pesados (GL)")
+    modo.add_argument("quadros", type=int, nargs="?", default=600, help="quadros medidos")
+    modo.add_argument("--carga", type=float, default=40.0, metavar="MS", help="tempo extra de cada quadro")
+    modo.set_defaults(roda=roda_latencia)
+
+    modo = modos.add_parser("colisoes", parents=[comum], help="custo das colisões por quantidade de projéteis")
+    modo.add_argument("quantidades", type=int, nargs="*", default=[10, 100, 1000], metavar="N",
+                      help="mísseis de cada lado")
+    modo.set_defaults(roda=roda_colisoes)
+
+    modo = modos.add_parser("estados", parents=[comum], help="tamanho e tempos de salvar/restaurar o estado")
+    modo.add_argument("--quadros", type=int, default=2000, help="quadros medidos por cenário")
+    modo.set_defaults(roda=roda_estados)
+
+    modo = modos.add_parser("telemetria", parents=[comum], help="custo da telemetria por quadro")
+    modo.add_argument("quadros", type=int, nargs="?", default=20000, help="quadros do piloto automático")
+    modo.set_defaults(roda=roda_telemetria)
+
+    modo = modos.add_parser("hitboxes", parents=[comum], help="colisões da simulação contra os polígonos do arcade")
+    modo.add_argument("amostras", type=int, nargs="?", default=2000, help="posições sorteadas por par")
+    modo.add_argument("--tolerancia", type=float, default=1.0, metavar="PCT",
+                      help="erro máximo do teste da simulação, em %% dos contatos")
+    modo.set_defaults(roda=roda_hitboxes)
+
+    args = parser.parse_args()
+    resultados = {"semente": SEMENTE}
+    try:
+        args.roda(args, resultados)
+    finally:
+        # Grava também quando o modo falha (regressão, tolerância), para ver o que falhou
+        if args.saida:
+            with open(args.saida, "w") as arq:
+                json.dump(resultados, arq, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from constantes import *
+
+"""
+Piloto automático simples para rodar partidas sem jogador humano.
+Segue o inimigo mais baixo e atira sempre que pode.
+"""
+
+
+class BotSimples:
+    """Decide as teclas de cada quadro olhando o estado da simulação."""
+
+    def __init__(self, folga=6):
+        self.folga = folga
+        self.direcao = None
+
+    def joga(self, sim):
+        if sim.game_state != GAME_STATE_PLAYING:
+            sim.pressiona(TECLA_ESPACO)
+            return
+        if not sim.nave:
+            return
+
+        direcao = None
+        formacao = sim.formacao
+        if formacao.quantidade:
+            vivos = formacao.vivo.nonzero()[0]
+            alvo = vivos[formacao.y[vivos].argmin()]
+            dx = formacao.x[alvo] - sim.nave.center_x
+            if dx < -self.folga:
+                direcao = TECLA_ESQUERDA
+            elif dx > self.folga:
+                direcao = TECLA_DIREITA
+
+        if direcao != self.direcao:
+            if self.direcao is not None:
+                sim.solta(self.direcao)
+            if direcao is not None:
+                sim.pressiona(direcao)
+            self.direcao = direcao
+
+        sim.pressiona(TECLA_ESPACO)
@@ -0,0 +1,164 @@
+import math
+from operator import itemgetter
+
+from hitboxes import poligonos
+
+"""
+Mundo de colisões
+=================
+Todas as caixas do passo (mísseis, UFO, power-ups, nave e a formação)
+entram numa única lista, cada uma com a sua camada. Uma só passada de
+sweep-and-prune no eixo x gera os pares candidatos; a matriz de máscara
+diz quais camadas se testam, e cada caixa só é comparada com as caixas
+ativas das camadas vizinhas. A formação entra como um corpo composto: uma
+caixa na fase ampla e a grade dela na fase estreita.
+
+Os pares cujas caixas se sobrepõem ainda passam pelo teste dos polígonos
+convexos de hitboxes.py (eixos separadores, como o arcade fazia com os
+sprites): as caixas são rápidas mas contam como toque os cantos vazios das
+naves e dos mísseis.
+
+Os contatos saem numa ordem fixa, definida pelas regras, para que a
+resolução seja determinística e independente da ordem da varredura.
+"""
+
+CAMADA_MISSIL = 0
+CAMADA_INIMISSIL = 1
+CAMADA_INIMIGO = 2
+CAMADA_UFO = 3
+CAMADA_POWERUP = 4
+CAMADA_NAVE = 5
+QTD_CAMADAS = 6
+
+# (camada primária, camada secundária) -> (grupo, ordem no grupo).
+# Os contatos são resolvidos por grupo, depois pelo índice da entidade
+# primária na sua lista, pela ordem no grupo e pelo índice da secundária.
+REGRAS = {
+    (CAMADA_MISSIL, CAMADA_INIMIGO): (0, 0),
+    (CAMADA_MISSIL, CAMADA_INIMISSIL): (0, 1),
+    (CAMADA_MISSIL, CAMADA_UFO): (0, 2),
+    (CAMADA_INIMISSIL, CAMADA_NAVE): (1, 0),
+    (CAMADA_NAVE, CAMADA_POWERUP): (2, 0),
+    (CAMADA_NAVE, CAMADA_INIMIGO): (3, 0),
+}
+
+# Caixa: (left, right, bottom, top, camada, índice, entidade ou (fase estreita, partes))
+_LEFT = itemgetter(0)
+
+# (textura, escala, ângulo) -> (pontos, eixos) do polígono, relativo ao centro
+_FORMAS = {}
+
+
+def forma(textura, escala, angulo):
+    """Polígono da textura escalado e girado como o arcade faz, e as normais das arestas
+    com a projeção do próprio polígono em cada uma: (nx, ny, mínimo, máximo)."""
+    chave = (textura, escala, angulo)
+    resultado = _FORMAS.get(chave)
+    if resultado is None:
+        rad = math.radians(-angulo)
+        c, s = math.cos(rad), math.sin(rad)
+        pontos = [(x * escala * c - y * escala * s, x * escala * s + y * escala * c)
+                  for x, y in poligonos()[textura]]
+        eixos = []
+        for (x1, y1), (x2, y2) in zip(pontos, pontos[1:] + pontos[:1]):
+            nx, ny = y2 - y1, x1 - x2
+            projecoes = [nx * x + ny * y for x, y in pontos]
+            eixos.append((nx, ny, min(projecoes), max(projecoes)))
+        resultado = _FORMAS[chave] = (pontos, eixos)
+    return resultado
+
+
+def tocam(a, b):
+    """Os polígonos de duas entidades se sobrepõem (encostar não conta, como no arcade)."""
+    pontos_a, eixos_a = forma(a.textura, a.escala, a.angle)
+    pontos_b, eixos_b = forma(b.textura, b.escala, b.angle)
+    dx, dy = b.center_x - a.center_x, b.center_y - a.center_y
+    for nx, ny, min_a, max_a in eixos_a:
+        desloca = nx * dx + ny * dy
+        projecoes = [nx * x + ny * y for x, y in pontos_b]
+        if max_a <= min(projecoes) + desloca or max(projecoes) + desloca <= min_a:
+            return False
+    for nx, ny, min_b, max_b in eixos_b:
+        desloca = nx * dx + ny * dy
+        projecoes = [nx * x + ny * y for x, y in pontos_a]
+        if max(projecoes) <= min_b + desloca or max_b + desloca <= min(projecoes):
+            return False
+    return True
+
+
+def mascara(regras):
+    """Matriz simétrica QTD_CAMADAS x QTD_CAMADAS: quais camadas colidem entre si."""
+    matriz = [[False] * QTD_CAMADAS for _ in range(QTD_CAMADAS)]
+    for a, b in regras:
+        matriz[a][b] = matriz[b][a] = True
+    return matriz
+
+
+class MundoColisao:
+    """Caixas de um passo; `contatos()` faz a fase ampla e a estreita."""
+
+    def __init__(self, regras=REGRAS):
+        self.regras = regras
+        self.mascara = mascara(regras)
+        self.vizinhas = [[b for b in range(QTD_CAMADAS) if linha[b]] for linha in self.mascara]
+        self.limpa()
+
+    def limpa(self):
+        self._caixas = []
+
+    def adiciona(self, camada, entidades):
+        """Entidades com centro e tamanho; o índice é a posição na lista."""
+        caixas = self._caixas
+        for i, entidade in enumerate(entidades):
+            # As mesmas contas das propriedades left/right/bottom/top, sem chamá-las
+            x, y = entidade.center_x, entidade.center_y
+            meia_l, meia_a = entidade.width / 2, entidade.height / 2
+            caixas.append((x - meia_l, x + meia_l, y - meia_a, y + meia_a, camada, i, entidade))
+
+    def adiciona_composto(self, camada, caixa, colisoes, partes):
+        """Corpo com partes: `caixa` envolve todas e `colisoes(entidade)` dá os índices das
+        partes cujas caixas ela toca; `partes[i]` é a entidade da parte i."""
+        left, right, bottom, top = caixa
+        self._caixas.append((left, right, bottom, top, camada, None, (colisoes, partes)))
+
+    def _candidatos(self):
+        """Pares de caixas de camadas vizinhas que se sobrepõem."""
+        ativas = [[] for _ in range(QTD_CAMADAS)]
+        vizinhas = self.vizinhas
+        pares = []
+        for caixa in sorted(self._caixas, key=_LEFT):
+            left, _, bottom, top, camada, _, _ = caixa
+            for outra_camada in vizinhas[camada]:
+                lista = ativas[outra_camada]
+                if not lista:
+                    continue
+                # Descarta as que terminaram antes desta começar
+                lista = ativas[outra_camada] = [a for a in lista if a[1] > left]
+                for outra in lista:
+                    if outra[2] < top and outra[3] > bottom:
+                        pares.append((outra, caixa))
+            ativas[camada].append(caixa)
+        return pares
+
+    def contatos(self):
+        """[(camada primária, índice, camada secundária, índice)] na ordem das regras."""
+        regras = self.regras
+        chaves = []
+        for a, b in self._candidatos():
+            if (a[4], b[4]) not in regras:
+                a, b = b, a
+            grupo, ordem = regras[a[4], b[4]]
+            if b[5] is None:
+                colisoes, partes = b[6]
+                for parte in colisoes(a[6]):
+                    if tocam(a[6], partes[parte]):
+                        chaves.append((grupo, a[5], ordem, parte, a[4], b[4]))
+            elif a[5] is None:
+                colisoes, partes = a[6]
+                for parte in colisoes(b[6]):
+                    if tocam(partes[parte], b[6]):
+                        chaves.append((grupo, parte, ordem, b[5], a[4], b[4]))
+            elif tocam(a[6], b[6]):
+                chaves.append((grupo, a[5], ordem, b[5], a[4], b[4]))
+        chaves.sort()
+        return [(ca, ia, cb, ib) for _, ia, _, ib, ca, cb in chaves]
@@ -0,0 +1,180 @@
+"""
+Constantes do Invaxians
+=======================
+Compartilhadas entre a simulação (sem arcade) e a janela de jogo.
+"""
+
+# ------------------------ CONSTANTES GERAIS ------------------------
+ESCALA_ESTRELA = 0.5
+D_ALPHA_ESTRELA = 3
+V_Y_ESTRELA = 3
+QTD_ESTRELAS = 100
+CAMADAS_ESTRELAS = 3   # camadas de paralaxe do fundo
+
+ESCALA_NAVE = 0.5
+V_X_NAVE = 5   # velocidade padrão da nave
+
+ESCALA_VIDA = 0.8
+QTD_VIDAS = 3
+MAX_VIDAS = 5
+DT_REVIVE = 200
+
+ESCALA_FASE_P = 0.8
+ESCALA_FASE_G = 0.9
+
+V_Y_MISSIL = 9
+
+ESCALA_INIMIGO = 0.4
+LINS_INIMIGOS = 5
+COLS_INIMIGOS = 7
+
+V_X_INIMIGO_INI = 2    # velocidade mínima dos inimigos
+V_Y_INIMIGO = 4
+A_X_INIMIGO = 0.1
+
+V_Y_INIMISSIL = 5
+P_INIMISSIL_INI = 500    # probabilidade inicial de disparo (quanto menor, mais tiros)
+
+# Curva de dificuldade por fase
+PASSO_V_X_INIMIGO = 0.4   # aumento da velocidade dos inimigos a cada fase
+PASSO_P_INIMISSIL = 30    # redução de p_inimissil a cada fase
+P_INIMISSIL_MIN = 50      # piso de p_inimissil
+
+ESCALA_UFO = 0.4
+V_X_UFO = 5
+P_UFO = 1000
+DT_UFO = 200
+
+# Power-ups
+ESCALA_POWERUP = 0.5
+V_Y_POWERUP = 2
+DT_SPEED_BOOST = 600     # duração do aumento de velocidade da nave (quadros)
+
+# Parâmetros de dificuldade que uma Simulacao aceita sobrescrever (ver varredura.py)
+DIFICULDADE_PADRAO = {
+    "PASSO_V_X_INIMIGO": PASSO_V_X_INIMIGO,
+    "PASSO_P_INIMISSIL": PASSO_P_INIMISSIL,
+    "P_INIMISSIL_MIN": P_INIMISSIL_MIN,
+    "A_X_INIMIGO": A_X_INIMIGO,
+    "P_UFO": P_UFO,
+    "DT_SPEED_BOOST": DT_SPEED_BOOST,
+}
+
+# Explosões
+ESCALA_EXPLOSAO = 0.7
+QTD_QUADROS_EXPLOSAO = 9
+V_ANIM_EXPLOSAO = 0.25   # quadros de animação avançados por quadro de jogo
+DT_EXPLOSAO = round(QTD_QUADROS_EXPLOSAO / V_ANIM_EXPLOSAO)   # duração em passos
+MAX_EXPLOSOES = 256      # explosões simultâneas; a mais antiga dá lugar à nova
+
+# Detritos e faíscas das explosões (partículas só da janela)
+MAX_PARTICULAS = 2048
+QTD_DETRITOS = 10        # por explosão
+QTD_FAISCAS = 6
+V_DETRITO = (0.5, 3.0)   # faixa de velocidade inicial (pixels por passo)
+V_FAISCA = (4.0, 8.0)
+G_DETRITO = 0.12         # gravidade (pixels por passo ao quadrado)
+G_FAISCA = 0.0
+DT_DETRITO = (25, 45)    # faixa de duração (passos)
+DT_FAISCA = (6, 14)
+
+# Pools de objetos: quantos objetos livres cada tipo mantém para reuso
+CAPACIDADE_POOL = {
+    "missil": 32,
+    "inimissil": 256,
+    "ufo": 2,
+    "powerup": 8,
+}
+
+# Áudio: vozes simultâneas por som e prioridades para o roubo de vozes
+VOZES_SOM = {
+    "tiro": 4,
+    "explosao": 6,
+}
+PRIORIDADE_TIRO = 0
+PRIORIDADE_EXPLOSAO = 1
+PRIORIDADE_NAVE = 2   # explosão que custou uma vida ou a partida
+
+# Laço de simulação com passo fixo
+TAXA_TICKS = 60              # passos de simulação por segundo
+MAX_PASSOS_POR_QUADRO = 5    # limite de passos de recuperação num único quadro
+MEMORIA_REBOBINAR = 2 * 1024 * 1024   # bytes de estados guardados para rebobinar (uns 8 s)
+
+# Telemetria (--telemetria PASTA)
+LOTE_TELEMETRIA = 64                  # registros por lote comprimido
+FILA_TELEMETRIA = 32                  # lotes esperando a escrita; com a fila cheia, o lote é descartado
+BYTES_ARQUIVO_TELEMETRIA = 1024 * 1024   # tamanho de um arquivo antes de passar ao próximo
+ARQUIVOS_TELEMETRIA = 8               # arquivos mantidos; o mais antigo é apagado
+LARG_BALDE_QUADRO_MS = 2              # faixas do histograma de tempos de quadro
+BALDES_QUADRO = 32                    # a última faixa junta tudo acima de 62 ms
+
+# Cooperativo em rede (servidor.py)
+MAX_JOGADORES = 2
+PORTA_SERVIDOR = 47474
+HISTORICO_INSTANTANEOS = 64   # ticks guardados como base para os deltas
+
+# Janela
+LARG_TELA = 800
+ALT_TELA = 600
+TIT_TELA = "Invaxians"
+
+# --- CONSTANTE ADICIONADA: MARGEM INFERIOR DA TELA ---
+MARGEM_Y_TELA = 40
+# -----------------------------------------------------
+
+# Estados do jogo
+GAME_STATE_MENU = 0
+GAME_STATE_PLAYING = 1
+GAME_STATE_GAME_OVER = 2
+
+# Teclas lógicas (independentes do arcade)
+TECLA_ESQUERDA = 1
+TECLA_DIREITA = 2
+TECLA_ESPACO = 3
+TECLA_PAUSA = 4
+
+# ------------------------ TEXTURAS ------------------------
+PATH_PNG = "spaceshooter/PNG"
+PATH_AUDIO = "spaceshooter/Audio"
+PATH_ATLAS = "spaceshooter/atlas.ivx"   # gerado por atlas.py a partir de PATH_PNG
+PATH_HITBOXES = "spaceshooter/hitboxes.json"   # gerado por hitboxes.py, versionado com os PNGs
+
+# id simbólico -> (arquivo relativo a PATH_PNG, largura, altura em pixels)
+# As dimensões permitem posicionar e desenhar sem abrir os PNGs; as colisões
+# usam as caixas dos pixels opacos de PATH_HITBOXES.
+TEXTURAS = {
+    "nave": ("playerShip2_red.png", 112, 75),
+    "ufo": ("ufoBlue.png", 91, 91),
+    "missil": ("Lasers/laserRed01.png", 9, 54),
+    "inimissil": ("Lasers/laserGreen04.png", 13, 37),
+    "inimigo1": ("Enemies/enemyGreen1.png", 93, 84),
+    "inimigo2": ("Enemies/enemyGreen2.png", 104, 84),
+    "inimigo3": ("Enemies/enemyGreen3.png", 103, 84),
+    "inimigo4": ("Enemies/enemyGreen4.png", 82, 84),
+    "inimigo5": ("Enemies/enemyGreen5.png", 97, 84),
+    "powerup_speed": ("Power-ups/bolt_gold.png", 98, 92),
+    "powerup_life": ("Power-ups/shield_bronze.png", 98, 92),
+    "fase_g": ("Power-ups/star_gold.png", 31, 30),
+    "fase_p": ("Power-ups/star_bronze.png", 31, 30),
+    "vida": ("UI/playerLife2_red.png", 37, 26),
+    "estrela": ("Effects/star1.png", 25, 24),
+    "fundo": ("Backgrounds/fundo_espaco.png", 800, 600),
+    "explosao0": ("Effects/explosion00.png", 362, 375),
+    "explosao1": ("Effects/explosion01.png", 362, 375),
+    "explosao2": ("Effects/explosion02.png", 392, 349),
+    "explosao3": ("Effects/explosion03.png", 365, 375),
+    "explosao4": ("Effects/explosion04.png", 386, 350),
+    "explosao5": ("Effects/explosion05.png", 393, 383),
+    "explosao6": ("Effects/explosion06.png", 374, 374),
+    "explosao7": ("Effects/explosion07.png", 375, 375),
+    "explosao8": ("Effects/explosion08.png", 365, 319),
+    "botao_start_normal": ("UI/Buttons/start_button_normal.png", 200, 50),
+    "botao_start_hover": ("UI/Buttons/start_button_hover.png", 200, 50),
+    "botao_start_pressed": ("UI/Buttons/start_button_pressed.png", 200, 50),
+    "botao_restart_normal": ("UI/Buttons/restart_button_normal.png", 200, 50),
+    "botao_restart_hover": ("UI/Buttons/restart_button_hover.png", 200, 50),
+    "botao_restart_pressed": ("UI/Buttons/restart_button_pressed.png", 200, 50),
+}
+
+# Tipos de inimigo, um por linha da formação
+TIPOS_INIMIGO = [f"inimigo{i+1}" for i in range(5)]
@@ -0,0 +1,282 @@
+import struct
+from collections import deque
+
+import numpy as np
+
+from constantes import *
+from simulacao import Entidade, EVENTO_ESTADO, EVENTO_PAUSA, EVENTO_FASE, EVENTO_VIDAS, EVENTO_RESTAURADO
+
+"""
+Estados salvos
+==============
+O estado inteiro de uma Simulacao (contadores, a agenda de timers,
+entidades, as explosões, a formação e os dois geradores aleatórios)
+empacotado em bytes com struct e arrays, para salvar e restaurar em
+microssegundos. Restaurar e seguir com as mesmas teclas dá exatamente a
+mesma partida; a dificuldade não entra no estado, é a da Simulacao que
+recebe os bytes.
+
+Formato (little-endian):
+    cabeçalho  "IVXS", versão (u8), semente (u64)
+    geral      tick, quadro, entradas gravadas (u32), estado, pausado, jogadores (u8),
+               fase (u16), placar (u32), vidas (u16), 4 contagens (u16)
+    jogador    teclas de direção seguradas, da mais antiga para a mais nova (u8 x 2, 0 = nenhuma)
+    agenda     quantidade (u16); tipo (u8), índice (u16), prazo em quadros (u32) por timer
+    entidade   textura, tipo, dono, alpha (u8), ângulo (i16), escala, largura, altura,
+               x, y, x e y anteriores (NaN = nenhum), vx, vy (f64);
+               as naves e depois mísseis, mísseis inimigos, UFOs e power-ups
+    explosões  relógio (u32), quantidade (u16); em colunas, da mais antiga para a mais
+               nova: x, y, vx, vy (f64), idade, vida (i32), tipo (u8)
+    formação   lins, cols (u8); x, y, x e y anteriores, vx (f64 x lins*cols); vivos (bits)
+    random     624 palavras + posição (u32), gauss_next (f64, NaN = nenhum)
+    numpy      estado e incremento do PCG64 (u128), has_uint32 (u8), uinteger (u32)
+
+    python benchmark.py estados       # tamanho e tempos de salvar e restaurar
+"""
+
+MARCA = b"IVXS"
+VERSAO = 4
+
+CABECALHO = struct.Struct("<4sBQ")
+GERAL = struct.Struct("<IIIBBBHIH4H")
+JOGADOR = struct.Struct("<BB")
+AGENDA = struct.Struct("<H")
+TIMER = struct.Struct("<BHI")
+ENTIDADE = struct.Struct("<BBBBh9d")
+EXPLOSOES = struct.Struct("<IH")
+COLUNAS_EXPLOSOES = ("<f8", "<f8", "<f8", "<f8", "<i4", "<i4", "u1")
+BYTES_EXPLOSAO = sum(np.dtype(tipo).itemsize for tipo in COLUNAS_EXPLOSOES)
+FORMACAO = struct.Struct("<BB")
+MERSENNE = struct.Struct("<625Id")   # estado do random: 624 palavras, posição e gauss_next
+PCG64 = struct.Struct("<16s16sBI")
+
+# Textura e tipo viram códigos de um byte
+CODIGO_TEXTURA = {nome: i for i, nome in enumerate(TEXTURAS)}
+NOME_TEXTURA = list(TEXTURAS)
+TIPOS = (None, "speed", "life")
+NAN = float("nan")
+
+
+class EstadoInvalido(ValueError):
+    """Bytes que não são um estado salvo do Invaxians nesta versão."""
+
+
+def _listas(sim):
+    return (("missil", sim.missil_list), ("inimissil", sim.inimissil_list), ("ufo", sim.ufo_list),
+            ("powerup", sim.powerup_list))
+
+
+# ------------------------ SALVAR ------------------------
+def _empacota_entidade(e):
+    return ENTIDADE.pack(
+        CODIGO_TEXTURA[e.textura], TIPOS.index(e.tipo), 255 if e.dono is None else e.dono, e.alpha, e.angle,
+        e.escala, e.width, e.height, e.center_x, e.center_y,
+        NAN if e.anterior_x is None else e.anterior_x, NAN if e.anterior_y is None else e.anterior_y,
+        e.change_x, e.change_y)
+
+
+def salva(sim):
+    """Bytes com o estado completo da simulação."""
+    listas = _listas(sim)
+    timers = sim.agenda.timers()
+    partes = [
+        CABECALHO.pack(MARCA, VERSAO, sim.semente),
+        GERAL.pack(sim.tick, sim.quadro, len(sim.entradas or ()), sim.game_state, sim.pausado,
+                   sim.jogadores, sim.fase, sim.placar, sim.vidas, *(len(lista) for _, lista in listas)),
+        b"".join(JOGADOR.pack(*(direcoes + [0, 0])[:2]) for direcoes in sim.direcoes),
+        AGENDA.pack(len(timers)),
+        b"".join(TIMER.pack(tipo, indice, prazo) for (tipo, indice), prazo in timers),
+        # Uma nave por jogador, ou nenhuma antes da primeira partida
+        bytes([len(sim.naves)]),
+        b"".join(_empacota_entidade(nave) for nave in sim.naves),
+    ]
+    partes += [b"".join(_empacota_entidade(e) for e in lista) for _, lista in listas]
+
+    explosoes = sim.explosoes
+    ativas = explosoes.ativas()
+    partes.append(EXPLOSOES.pack(explosoes.tick, len(ativas)))
+    colunas = (explosoes.x0, explosoes.y0, explosoes.vx, explosoes.vy,
+               explosoes.tick - explosoes.nascimento, explosoes.vida, explosoes.tipo)
+    partes += [coluna[ativas].astype(tipo).tobytes() for coluna, tipo in zip(colunas, COLUNAS_EXPLOSOES)]
+
+    f = sim.formacao
+    partes.append(FORMACAO.pack(f.lins, f.cols))
+    partes += [f.x.tobytes(), f.y.tobytes(), f.x_ant.tobytes(), f.y_ant.tobytes(), f.vx.tobytes(),
+               np.packbits(f.vivo).tobytes()]
+
+    _, palavras, gauss_next = sim.rng.getstate()
+    partes.append(MERSENNE.pack(*palavras, NAN if gauss_next is None else gauss_next))
+
+    pcg = f.rng.bit_generator.state
+    partes.append(PCG64.pack(pcg["state"]["state"].to_bytes(16, "little"),
+                             pcg["state"]["inc"].to_bytes(16, "little"),
+                             pcg["has_uint32"], pcg["uinteger"]))
+    return b"".join(partes)
+
+
+# ------------------------ RESTAURAR ------------------------
+def _desempacota_entidade(e, campos):
+    (textura, tipo, dono, e.alpha, e.angle, e.escala, e.width, e.height, e.center_x, e.center_y,
+     anterior_x, anterior_y, e.change_x, e.change_y) = campos
+    e.textura = NOME_TEXTURA[textura]
+    e.tipo = TIPOS[tipo]
+    e.dono = None if dono == 255 else dono
+    # NaN é o único valor diferente de si mesmo
+    e.anterior_x = None if anterior_x != anterior_x else anterior_x
+    e.anterior_y = None if anterior_y != anterior_y else anterior_y
+
+
+def _confere_tamanho(dados, jogadores, contagens):
+    """Levanta EstadoInvalido se os bytes não têm o tamanho que as suas contagens pedem."""
+    pos = CABECALHO.size + GERAL.size + jogadores * JOGADOR.size
+    try:
+        n, = AGENDA.unpack_from(dados, pos)
+        pos += AGENDA.size + n * TIMER.size
+        naves = dados[pos]
+        pos += 1 + (naves + sum(contagens)) * ENTIDADE.size
+        _, n = EXPLOSOES.unpack_from(dados, pos)
+        pos += EXPLOSOES.size + n * BYTES_EXPLOSAO
+        lins, cols = FORMACAO.unpack_from(dados, pos)
+    except (struct.error, IndexError):
+        raise EstadoInvalido("estado cortado") from None
+    n = lins * cols
+    pos += FORMACAO.size + 5 * 8 * n + (n + 7) // 8 + MERSENNE.size + PCG64.size
+    if pos != len(dados):
+        raise EstadoInvalido(f"estado de {len(dados)} bytes; as contagens pedem {pos}")
+
+
+def restaura(sim, dados):
+    """Põe a simulação no estado salvo em `dados`.
+
+    As entidades em jogo voltam aos pools e as do estado saem deles; as
+    teclas gravadas depois do salvamento são descartadas, para que o replay
+    continue valendo. Os eventos do passo são EVENTO_RESTAURADO e os do que
+    mudou. Bytes inválidos ou cortados levantam EstadoInvalido antes de a
+    simulação ser tocada.
+    """
+    dados = memoryview(dados)
+    if len(dados) < CABECALHO.size + GERAL.size:
+        raise EstadoInvalido("estado curto demais")
+    marca, versao, semente = CABECALHO.unpack_from(dados)
+    if marca != MARCA or versao != VERSAO:
+        raise EstadoInvalido(f"não é um estado salvo versão {VERSAO}")
+    (tick, quadro, entradas, game_state, pausado, jogadores, fase, placar, vidas,
+     *contagens) = GERAL.unpack_from(dados, CABECALHO.size)
+    if jogadores != sim.jogadores:
+        raise EstadoInvalido(f"estado de {jogadores} jogadores numa simulação de {sim.jogadores}")
+    _confere_tamanho(dados, jogadores, contagens)
+
+    eventos = [EVENTO_RESTAURADO]
+    if game_state != sim.game_state:
+        eventos.append(EVENTO_ESTADO)
+    if pausado != sim.pausado:
+        eventos.append(EVENTO_PAUSA)
+    if fase != sim.fase:
+        eventos.append(EVENTO_FASE)
+    if vidas != sim.vidas:
+        eventos.append(EVENTO_VIDAS)
+
+    sim.semente = semente
+    sim.tick, sim.quadro = tick, quadro
+    sim.game_state, sim.pausado = game_state, bool(pausado)
+    sim.fase, sim.placar, sim.vidas = fase, placar, vidas
+    if sim.entradas is not None:
+        del sim.entradas[entradas:]
+    sim.atualiza_dificuldade()
+    sim.eventos[:] = eventos
+
+    pos = CABECALHO.size + GERAL.size
+    sim.direcoes = [[tecla for tecla in teclas if tecla]
+                    for teclas in JOGADOR.iter_unpack(dados[pos:pos + jogadores * JOGADOR.size])]
+    pos += jogadores * JOGADOR.size
+    n, = AGENDA.unpack_from(dados, pos)
+    pos += AGENDA.size
+    sim.agenda.carrega(quadro, (((tipo, indice), prazo) for tipo, indice, prazo
+                                in TIMER.iter_unpack(dados[pos:pos + n * TIMER.size])))
+    pos += n * TIMER.size
+
+    naves = dados[pos]
+    pos += 1
+    while len(sim.naves) < naves:
+        sim.naves.append(Entidade("nave", ESCALA_NAVE))
+    del sim.naves[naves:]
+    for nave, campos in zip(sim.naves, ENTIDADE.iter_unpack(dados[pos:pos + naves * ENTIDADE.size])):
+        _desempacota_entidade(nave, campos)
+    pos += naves * ENTIDADE.size
+
+    sim.libera_todas()
+    for (tipo, lista), n in zip(_listas(sim), contagens):
+        pool = sim.pools[tipo]
+        for campos in ENTIDADE.iter_unpack(dados[pos:pos + n * ENTIDADE.size]):
+            entidade = pool.adquire()
+            _desempacota_entidade(entidade, campos)
+            lista.append(entidade)
+        pos += n * ENTIDADE.size
+
+    explosoes = sim.explosoes
+    explosoes.tick, n = EXPLOSOES.unpack_from(dados, pos)
+    pos += EXPLOSOES.size
+    colunas = []
+    for tipo in COLUNAS_EXPLOSOES:
+        coluna = np.frombuffer(dados, tipo, n, pos)
+        colunas.append(coluna)
+        pos += coluna.nbytes
+    explosoes.carrega(*colunas)
+
+    f = sim.formacao
+    lins, cols = FORMACAO.unpack_from(dados, pos)
+    pos += FORMACAO.size
+    if (lins, cols) != (f.lins, f.cols):
+        f.monta(lins, cols, 0.0)
+    n = lins * cols
+    for destino in (f.x, f.y, f.x_ant, f.y_ant, f.vx):
+        destino[:] = np.frombuffer(dados, np.float64, n, pos)
+        pos += 8 * n
+    bits = (n + 7) // 8
+    f.vivo[:] = np.unpackbits(np.frombuffer(dados, np.uint8, bits, pos), count=n).view(bool)
+    f.quantidade = int(np.count_nonzero(f.vivo))
+    pos += bits
+
+    *palavras, gauss_next = MERSENNE.unpack_from(dados, pos)
+    pos += MERSENNE.size
+    sim.rng.setstate((3, tuple(palavras), None if gauss_next != gauss_next else gauss_next))
+
+    estado, inc, has_uint32, uinteger = PCG64.unpack_from(dados, pos)
+    f.rng.bit_generator.state = {
+        "bit_generator": "PCG64",
+        "state": {"state": int.from_bytes(estado, "little"), "inc": int.from_bytes(inc, "little")},
+        "has_uint32": has_uint32, "uinteger": uinteger,
+    }
+
+
+# ------------------------ REBOBINAR ------------------------
+class Rebobinador:
+    """Anel de estados por tick com teto de memória; os mais antigos saem primeiro."""
+
+    def __init__(self, limite_bytes=MEMORIA_REBOBINAR):
+        self.limite_bytes = limite_bytes
+        self.estados = deque()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self.estados)
+
+    def limpa(self):
+        self.estados.clear()
+        self.bytes = 0
+
+    def guarda(self, sim):
+        dados = salva(sim)
+        self.estados.append(dados)
+        self.bytes += len(dados)
+        while self.bytes > self.limite_bytes:
+            self.bytes -= len(self.estados.popleft())
+
+    def volta(self, sim):
+        """Restaura o estado mais recente e o tira do anel; False se o anel está vazio."""
+        if not self.estados:
+            return False
+        dados = self.estados.pop()
+        self.bytes -= len(dados)
+        restaura(sim, dados)
+        return True
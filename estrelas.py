@@ -0,0 +1,46 @@
+import numpy as np
+
+from constantes import *
+
+"""
+Campo de estrelas em arrays
+===========================
+Todas as estrelas piscam, descem e voltam ao topo num único passo
+vetorizado. Cada estrela pertence a uma camada de paralaxe: camadas mais
+distantes são menores e mais lentas.
+"""
+
+
+class CampoEstrelas:
+    """Posição, brilho e velocidade de `quantidade` estrelas em arrays NumPy."""
+
+    def __init__(self, quantidade=QTD_ESTRELAS, camadas=CAMADAS_ESTRELAS, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.quantidade = quantidade
+        rng = self.rng
+        self.camada = rng.integers(0, camadas, quantidade)
+        # Camada 0 é a mais distante; a última se move como as estrelas originais
+        profundidade = (self.camada + 1) / camadas
+        self.fator = 0.4 + 0.6 * profundidade
+        self.escala = rng.uniform(0.6, 1.0, quantidade) * ESCALA_ESTRELA * self.fator
+        self.x = rng.integers(0, LARG_TELA + 1, quantidade).astype(np.float32)
+        self.y = rng.integers(0, ALT_TELA + 1, quantidade).astype(np.float32)
+        self.alpha = rng.integers(0, 256, quantidade).astype(np.float32)
+        self.d_alpha = rng.integers(1, D_ALPHA_ESTRELA + 1, quantidade).astype(np.float32)
+        self.vy = -rng.integers(1, V_Y_ESTRELA + 1, quantidade) * self.fator
+
+    def atualiza(self):
+        alpha = self.alpha
+        alpha += self.d_alpha
+        fora = (alpha < 0) | (alpha > 255)
+        self.d_alpha[fora] *= -1
+        alpha[fora] += self.d_alpha[fora]
+
+        # Estrelas que saíram por baixo voltam ao topo com nova velocidade
+        y = self.y
+        saiu = y < 0
+        n = int(np.count_nonzero(saiu))
+        if n:
+            y[saiu] = ALT_TELA
+            self.vy[saiu] = -self.rng.integers(1, V_Y_ESTRELA + 1, n) * self.fator[saiu]
+        y += self.vy
@@ -0,0 +1,238 @@
+import math
+
+import numpy as np
+
+from constantes import *
+from hitboxes import caixas
+
+"""
+Formação de inimigos em arrays NumPy
+====================================
+Posições, velocidades e tamanhos ficam em vetores; limites e rebote são
+resolvidos com uma operação vetorizada por quadro, sem laço Python sobre
+os inimigos, e os intervalos entre disparos são sorteados em lote. Como
+a grade se move como um bloco rígido, a posição de um míssil leva direto
+às células candidatas a colisão.
+"""
+
+
+class Inimigo:
+    """Visão de um inimigo da formação com a mesma interface de Entidade."""
+
+    __slots__ = ("formacao", "indice")
+
+    angle = 0
+    alpha = 255
+    escala = ESCALA_INIMIGO
+
+    def __init__(self, formacao, indice):
+        self.formacao = formacao
+        self.indice = indice
+
+    @property
+    def textura(self):
+        return TIPOS_INIMIGO[self.formacao.tipo[self.indice]]
+
+    @property
+    def vivo(self):
+        return bool(self.formacao.vivo[self.indice])
+
+    @property
+    def center_x(self):
+        return float(self.formacao.x[self.indice])
+
+    @property
+    def center_y(self):
+        return float(self.formacao.y[self.indice])
+
+    @property
+    def anterior_x(self):
+        return float(self.formacao.x_ant[self.indice])
+
+    @property
+    def anterior_y(self):
+        return float(self.formacao.y_ant[self.indice])
+
+    @property
+    def change_x(self):
+        return float(self.formacao.vx[self.indice])
+
+    @property
+    def width(self):
+        return float(self.formacao.largura[self.indice])
+
+    @property
+    def height(self):
+        return float(self.formacao.altura[self.indice])
+
+    @property
+    def left(self):
+        return self.center_x - self.width / 2
+
+    @property
+    def right(self):
+        return self.center_x + self.width / 2
+
+    @property
+    def bottom(self):
+        return self.center_y - self.height / 2
+
+    @property
+    def top(self):
+        return self.center_y + self.height / 2
+
+
+class Formacao:
+    """Grade de inimigos guardada como arrays paralelos."""
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.lins = self.cols = None
+        self.monta(0, 0, V_X_INIMIGO_INI)
+
+    def monta(self, lins, cols, vel_x):
+        """Posiciona lins x cols inimigos como InimigoSprite fazia, linha a linha.
+
+        Com a mesma grade da montagem anterior, os arrays e os Inimigo são
+        reaproveitados: só posições, velocidades e vivos voltam ao início.
+        """
+        if (lins, cols) != (self.lins, self.cols):
+            self._aloca(lins, cols)
+        np.copyto(self.x, self.x0)
+        np.copyto(self.y, self.y0)
+        np.copyto(self.x_ant, self.x0)   # posições no passo anterior, para interpolar o desenho
+        np.copyto(self.y_ant, self.y0)
+        self.vx.fill(vel_x)
+        self.vivo.fill(True)
+        self.quantidade = len(self.inimigos)
+
+    def _aloca(self, lins, cols):
+        """Cria os arrays e a geometria de uma grade lins x cols."""
+        n = lins * cols
+        lin, col = np.divmod(np.arange(n), max(cols, 1))
+        self.lins = lins
+        self.cols = cols
+        self.tipo = lin % len(TIPOS_INIMIGO)
+        dimensoes = np.array([caixas()[t] for t in TIPOS_INIMIGO], dtype=float) * ESCALA_INIMIGO
+        self.largura = dimensoes[self.tipo, 0]
+        self.altura = dimensoes[self.tipo, 1]
+
+        # Geometria da grade no momento da montagem, usada pelo índice de colisão
+        self.x0 = LARG_TELA / 2 + 1.2 * (col - cols / 2) * self.largura
+        self.y0 = (ALT_TELA - MARGEM_Y_TELA) - 1.2 * lin * self.altura - self.altura / 2
+        self.topo0 = float(ALT_TELA - MARGEM_Y_TELA)
+        self.larg_lin = [float(dimensoes[l % len(TIPOS_INIMIGO), 0]) for l in range(lins)]
+        self.alt_lin = [float(dimensoes[l % len(TIPOS_INIMIGO), 1]) for l in range(lins)]
+        self.alt_min = min(self.alt_lin, default=0.0)
+        self.alt_max = max(self.alt_lin, default=0.0)
+        if n:
+            # Caixa da grade inteira, com folga para os arredondamentos do deslocamento
+            self.caixa0 = (float((self.x0 - self.largura / 2).min()) - 1,
+                           float((self.x0 + self.largura / 2).max()) + 1,
+                           float((self.y0 - self.altura / 2).min()) - 1,
+                           float((self.y0 + self.altura / 2).max()) + 1)
+        else:
+            self.caixa0 = (0.0, 0.0, 0.0, 0.0)
+
+        self.x = np.empty(n)
+        self.y = np.empty(n)
+        self.x_ant = np.empty(n)
+        self.y_ant = np.empty(n)
+        self.vx = np.empty(n)
+        self.vivo = np.empty(n, dtype=bool)
+        self.inimigos = [Inimigo(self, i) for i in range(n)]
+
+    def __len__(self):
+        return self.quantidade
+
+    def vivos(self):
+        """Inimigos ainda vivos, na ordem de criação."""
+        return [self.inimigos[i] for i in np.flatnonzero(self.vivo)]
+
+    def remove(self, indice):
+        if self.vivo[indice]:
+            self.vivo[indice] = False
+            self.quantidade -= 1
+
+    # ------------------------ MOVIMENTO ------------------------
+    def move(self):
+        self.x_ant[:] = self.x
+        self.y_ant[:] = self.y
+        self.x += self.vx
+
+    def limites(self):
+        """Menor left e maior right entre os inimigos vivos."""
+        if not self.quantidade:
+            return 0, 0
+        vivo = self.vivo
+        meia = self.largura[vivo] / 2
+        x = self.x[vivo]
+        return float((x - meia).min()), float((x + meia).max())
+
+    def quica(self, vel_inimigo_x, aceleracao=A_X_INIMIGO):
+        """Inverte a direção, acelera e desce a formação ao tocar a borda."""
+        x_min, x_max = self.limites()
+        if self.quantidade and (x_min < 0 or x_max > LARG_TELA):
+            vx = self.vx
+            np.negative(vx, out=vx)
+            acelera = np.abs(vx) < vel_inimigo_x * 2
+            vx[acelera] += np.copysign(aceleracao, vx[acelera])
+            self.y -= V_Y_INIMIGO
+            return True
+        return False
+
+    # ------------------------ DISPAROS E COLISÕES ------------------------
+    def intervalos(self, p_inimissil, n):
+        """Quadros até o próximo disparo de n inimigos com chance 1/p_inimissil por quadro.
+
+        É a distribuição geométrica do sorteio quadro a quadro; como ela não
+        tem memória, sortear o intervalo uma vez dá os mesmos disparos.
+        """
+        return self.rng.geometric(1 / max(p_inimissil, 1), n)
+
+    def deslocamento(self):
+        """Quanto a formação andou desde a montagem (todos se movem juntos)."""
+        return float(self.x[0] - self.x0[0]), float(self.y[0] - self.y0[0])
+
+    def caixa(self):
+        """(left, right, bottom, top) que envolve a grade, vivos ou não."""
+        dx, dy = self.deslocamento()
+        left, right, bottom, top = self.caixa0
+        return left + dx, right + dx, bottom + dy, top + dy
+
+    def colisoes(self, entidade):
+        """Índices dos inimigos vivos cuja caixa sobrepõe a da entidade.
+
+        Em vez de testar a formação inteira, converte a caixa da entidade nas
+        linhas e colunas da grade que ela pode tocar e testa só essas células.
+        """
+        if not self.quantidade:
+            return []
+        dx, dy = self.deslocamento()
+        e_left, e_right = entidade.left, entidade.right
+        e_bottom, e_top = entidade.bottom, entidade.top
+        topo = self.topo0 + dy
+
+        # Linhas: o topo da linha lin fica em topo - 1.2 * lin * altura
+        lin_min = max(math.floor(((topo - e_top) / self.alt_max - 1) / 1.2), 0)
+        lin_max = min(math.ceil((topo - e_bottom) / (1.2 * self.alt_min)), self.lins - 1)
+
+        cols = self.cols
+        meio = LARG_TELA / 2 + dx
+        vivo, x, y, largura, altura = self.vivo, self.x, self.y, self.largura, self.altura
+        hits = []
+        for lin in range(lin_min, lin_max + 1):
+            # Colunas: o centro da coluna col fica em meio + 1.2 * (col - cols / 2) * largura
+            passo = 1.2 * self.larg_lin[lin]
+            meia = self.larg_lin[lin] / 2
+            col_min = max(math.floor((e_left - meia - meio) / passo + cols / 2), 0)
+            col_max = min(math.ceil((e_right + meia - meio) / passo + cols / 2), cols - 1)
+            for i in range(lin * cols + col_min, lin * cols + col_max + 1):
+                if not vivo[i]:
+                    continue
+                meia_l = largura[i] / 2
+                meia_a = altura[i] / 2
+                if (x[i] - meia_l < e_right and x[i] + meia_l > e_left and
+                        y[i] - meia_a < e_top and y[i] + meia_a > e_bottom):
+                    hits.append(i)
+        return hits
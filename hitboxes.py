@@ -0,0 +1,166 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+
+from constantes import *
+
+"""
+Hit boxes pré-calculadas
+========================
+Etapa de build que varre os pixels de cada PNG de TEXTURAS uma vez e guarda,
+num JSON pequeno versionado com o jogo, a caixa dos pixels opacos e o
+polígono convexo (o algoritmo padrão do arcade) de cada textura, junto com
+o SHA-1 do arquivo de origem. Refazer só recalcula os PNGs cujo hash mudou.
+
+A simulação tira daqui, sem abrir PNG nem importar PIL, o tamanho das
+entidades (a caixa da fase ampla das colisões) e os polígonos da fase
+estreita, os mesmos que os sprites do arcade usavam; a janela e o atlas
+usam os polígonos em vez de varrer os pixels de novo. As coordenadas são
+em pixels, a partir do centro da imagem, com y para cima (como as hit
+boxes do arcade).
+
+    python hitboxes.py             # refazer sempre que um PNG mudar
+    python hitboxes.py --confere   # falha se algum PNG mudou desde o último build
+    python benchmark.py hitboxes 2000 --tolerancia 1   # precisão contra os polígonos do arcade e tempos
+"""
+
+VERSAO = 1
+CAMINHO = os.path.join(os.path.dirname(os.path.abspath(__file__)), PATH_HITBOXES)
+
+
+def hash_arquivo(dados):
+    return hashlib.sha1(dados).hexdigest()
+
+
+# ------------------------ BUILD ------------------------
+def calcula(imagem):
+    """Caixa dos pixels opacos [left, bottom, right, top] e polígono de uma imagem RGBA."""
+    from arcade import hitbox   # só a etapa de build precisa do algoritmo do arcade
+
+    meia_l, meia_a = imagem.width / 2, imagem.height / 2
+    x0, y0, x1, y1 = imagem.getchannel("A").getbbox() or (0, 0, imagem.width, imagem.height)
+    return {
+        "caixa": [x0 - meia_l, meia_a - y1, x1 - meia_l, meia_a - y0],
+        "poligono": [list(p) for p in hitbox.algo_default.calculate(imagem)],
+    }
+
+
+def monta(base_path=".", caminho=None):
+    """Atualiza o cache com os PNGs de TEXTURAS; devolve (entradas, ids recalculados)."""
+    from PIL import Image
+
+    caminho = caminho or os.path.join(base_path, PATH_HITBOXES)
+    anteriores = le(caminho)
+    entradas, recalculadas = {}, []
+    for textura, (arquivo, _, _) in TEXTURAS.items():
+        try:
+            with open(os.path.join(base_path, PATH_PNG, arquivo), "rb") as arq:
+                dados = arq.read()
+        except FileNotFoundError:
+            print(f"AVISO: textura '{arquivo}' não encontrada; fica fora das hit boxes.")
+            continue
+        sha1 = hash_arquivo(dados)
+        entrada = anteriores.get(textura)
+        if entrada is None or entrada["sha1"] != sha1 or entrada["arquivo"] != arquivo:
+            with Image.open(os.path.join(base_path, PATH_PNG, arquivo)) as img:
+                entrada = {"arquivo": arquivo, "sha1": sha1, **calcula(img.convert("RGBA"))}
+            recalculadas.append(textura)
+        entradas[textura] = entrada
+
+    # Uma textura por linha, para que o diff mostre só os PNGs que mudaram
+    linhas = ",\n".join(f"  {json.dumps(textura)}: {json.dumps(entrada, sort_keys=True)}"
+                        for textura, entrada in sorted(entradas.items()))
+    with open(caminho, "w") as arq:
+        arq.write(f'{{"versao": {VERSAO}, "texturas": {{\n{linhas}\n}}}}\n')
+    return entradas, recalculadas
+
+
+def desatualizadas(base_path=".", caminho=None):
+    """Ids cujo PNG não bate com o hash guardado (ou que não estão no cache)."""
+    entradas = le(caminho or os.path.join(base_path, PATH_HITBOXES))
+    resultado = []
+    for textura, (arquivo, _, _) in TEXTURAS.items():
+        try:
+            with open(os.path.join(base_path, PATH_PNG, arquivo), "rb") as arq:
+                sha1 = hash_arquivo(arq.read())
+        except FileNotFoundError:
+            continue
+        entrada = entradas.get(textura)
+        if entrada is None or entrada["sha1"] != sha1:
+            resultado.append(textura)
+    return resultado
+
+
+# ------------------------ LEITURA ------------------------
+def le(caminho=CAMINHO):
+    """Entradas do cache por id de textura; vazio se o arquivo não existe ou é de outra versão."""
+    try:
+        with open(caminho) as arq:
+            cache = json.load(arq)
+    except FileNotFoundError:
+        return {}
+    if cache.get("versao") != VERSAO:
+        print(f"AVISO: {caminho} não é um cache de hit boxes versão {VERSAO}; refaça com 'python hitboxes.py'.")
+        return {}
+    return cache["texturas"]
+
+
+@functools.cache
+def caixas():
+    """id -> (largura, altura) em pixels da caixa de colisão, centrada na textura.
+
+    A caixa centrada cobre todos os pixels opacos (e o polígono, em
+    qualquer ângulo múltiplo de 180°), então só serve à fase ampla: quem
+    decide o contato é o polígono de poligonos(). Sem entrada no cache,
+    vale a imagem inteira de constantes.TEXTURAS.
+    """
+    entradas = le()
+    resultado = {}
+    for textura, (_, largura, altura) in TEXTURAS.items():
+        entrada = entradas.get(textura)
+        if entrada is not None:
+            left, bottom, right, top = entrada["caixa"]
+            largura, altura = 2 * max(-left, right), 2 * max(-bottom, top)
+        resultado[textura] = (largura, altura)
+    return resultado
+
+
+def le_poligonos(caminho=CAMINHO):
+    """id -> polígono [(x, y)] de cada textura; sem entrada no cache, o retângulo da imagem."""
+    entradas = le(caminho)
+    resultado = {}
+    for textura, (_, largura, altura) in TEXTURAS.items():
+        entrada = entradas.get(textura)
+        if entrada is not None:
+            resultado[textura] = [tuple(p) for p in entrada["poligono"]]
+        else:
+            meia_l, meia_a = largura / 2, altura / 2
+            resultado[textura] = [(-meia_l, -meia_a), (meia_l, -meia_a), (meia_l, meia_a), (-meia_l, meia_a)]
+    return resultado
+
+
+@functools.cache
+def poligonos():
+    return le_poligonos()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-calcula as hit boxes das texturas do Invaxians")
+    parser.add_argument("--confere", action="store_true",
+                        help="só confere os hashes; sai com erro se algum PNG mudou")
+    args = parser.parse_args()
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    if args.confere:
+        mudaram = desatualizadas(base_path)
+        if mudaram:
+            raise SystemExit(f"hit boxes desatualizadas: {', '.join(mudaram)}; refaça com 'python hitboxes.py'")
+        print("hit boxes em dia")
+        return
+    entradas, recalculadas = monta(base_path)
+    print(f"{len(entradas)} texturas, {len(recalculadas)} recalculadas -> {PATH_HITBOXES}")
+
+
+if __name__ == "__main__":
+    main()
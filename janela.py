@@ -0,0 +1,875 @@
+import os
+import threading
+import time
+
+import arcade
+import arcade.gui
+import numpy as np
+from PIL import Image
+from arcade.gl import BufferDescription
+from pyglet.gl import GL_PROGRAM_POINT_SIZE
+
+from constantes import *
+from simulacao import (Simulacao, EVENTO_TIRO, EVENTO_EXPLOSAO, EVENTO_ESTADO,
+                       EVENTO_PAUSA, EVENTO_MORTE)
+from texturas import RegistroTexturas
+from pool import Pool
+import replay
+from perfil import PERFIL_DESLIGADO, LatenciaEntrada, cria_perfil
+from telemetria import cria_telemetria
+from estrelas import CampoEstrelas
+from particulas import Particulas, TIPO_EXPLOSAO
+from audio import Mixer
+from estado import Rebobinador
+
+"""
+Janela do Invaxians
+===================
+Tudo o que depende do arcade, do pyglet e dos arquivos de imagem e som:
+a MeuJogo e os seus desenhos em lote. Só é importado quando uma janela é
+aberta; a simulação, o modo --headless e os replays rodam sem este módulo.
+"""
+
+# Teclas do arcade -> teclas lógicas da simulação
+TECLAS = {
+    arcade.key.LEFT: TECLA_ESQUERDA,
+    arcade.key.RIGHT: TECLA_DIREITA,
+    arcade.key.SPACE: TECLA_ESPACO,
+    arcade.key.P: TECLA_PAUSA,
+}
+
+# ------------------------ SPRITES AUXILIARES ------------------------
+class DesenhoEstrelas:
+    """Desenha o CampoEstrelas inteiro numa única chamada, como pontos texturizados."""
+
+    VERTEX_SHADER = """
+        #version 330
+        uniform WindowBlock {
+            mat4 projection;
+            mat4 view;
+        } window;
+        in vec2 in_pos;
+        in float in_tam;
+        in float in_alpha;
+        out float v_alpha;
+        void main() {
+            gl_Position = window.projection * window.view * vec4(in_pos, 0.0, 1.0);
+            gl_PointSize = in_tam;
+            v_alpha = in_alpha;
+        }
+    """
+    FRAGMENT_SHADER = """
+        #version 330
+        uniform sampler2D textura;
+        in float v_alpha;
+        out vec4 cor;
+        void main() {
+            vec4 texel = texture(textura, vec2(gl_PointCoord.x, 1.0 - gl_PointCoord.y));
+            cor = vec4(texel.rgb, texel.a * v_alpha);
+        }
+    """
+
+    def __init__(self, ctx, campo, textura):
+        self.ctx = ctx
+        self.campo = campo
+        lado = max(TEXTURAS["estrela"][1:])
+        self.tamanho = (campo.escala * lado).astype(np.float32)
+        self.dados = np.empty((campo.quantidade, 4), dtype=np.float32)
+        self.buffer = ctx.buffer(reserve=self.dados.nbytes)
+        self.geometria = ctx.geometry(
+            [BufferDescription(self.buffer, "2f 1f 1f", ["in_pos", "in_tam", "in_alpha"])],
+            mode=ctx.POINTS,
+        )
+        self.programa = ctx.program(vertex_shader=self.VERTEX_SHADER,
+                                    fragment_shader=self.FRAGMENT_SHADER)
+        imagem = textura.image.convert("RGBA").transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+        self.textura = ctx.texture(imagem.size, components=4, data=imagem.tobytes())
+
+    def draw(self):
+        campo, dados = self.campo, self.dados
+        dados[:, 0] = campo.x
+        dados[:, 1] = campo.y
+        dados[:, 2] = self.tamanho
+        dados[:, 3] = campo.alpha / 255
+        self.buffer.write(dados)
+        self.textura.use(0)
+        with self.ctx.enabled(self.ctx.BLEND, GL_PROGRAM_POINT_SIZE):
+            self.geometria.render(self.programa)
+
+
+class DesenhoParticulas:
+    """Desenha explosões, detritos e faíscas de vários emissores numa única chamada.
+
+    Cada partícula é um ponto com centro, meia largura/altura, recorte do
+    atlas e cor; o geometry shader o transforma num retângulo. O atlas tem
+    os quadros da explosão e um bloco branco, tingido para detritos e faíscas.
+    """
+
+    VERTEX_SHADER = """
+        #version 330
+        in vec2 in_pos;
+        in vec2 in_metade;
+        in vec4 in_uv;
+        in vec4 in_cor;
+        out vec2 v_metade;
+        out vec4 v_uv;
+        out vec4 v_cor;
+        void main() {
+            gl_Position = vec4(in_pos, 0.0, 1.0);
+            v_metade = in_metade;
+            v_uv = in_uv;
+            v_cor = in_cor;
+        }
+    """
+    GEOMETRY_SHADER = """
+        #version 330
+        layout (points) in;
+        layout (triangle_strip, max_vertices = 4) out;
+        uniform WindowBlock {
+            mat4 projection;
+            mat4 view;
+        } window;
+        in vec2 v_metade[];
+        in vec4 v_uv[];
+        in vec4 v_cor[];
+        out vec2 g_uv;
+        out vec4 g_cor;
+        void main() {
+            if (v_cor[0].a <= 0.0) {
+                return;   // já desbotou
+            }
+            mat4 mvp = window.projection * window.view;
+            vec2 centro = gl_in[0].gl_Position.xy;
+            vec2 m = v_metade[0];
+            vec4 uv = v_uv[0];
+            g_cor = v_cor[0];
+            g_uv = uv.xy; gl_Position = mvp * vec4(centro.x - m.x, centro.y - m.y, 0.0, 1.0); EmitVertex();
+            g_uv = uv.zy; gl_Position = mvp * vec4(centro.x + m.x, centro.y - m.y, 0.0, 1.0); EmitVertex();
+            g_uv = uv.xw; gl_Position = mvp * vec4(centro.x - m.x, centro.y + m.y, 0.0, 1.0); EmitVertex();
+            g_uv = uv.zw; gl_Position = mvp * vec4(centro.x + m.x, centro.y + m.y, 0.0, 1.0); EmitVertex();
+            EndPrimitive();
+        }
+    """
+    FRAGMENT_SHADER = """
+        #version 330
+        uniform sampler2D textura;
+        in vec2 g_uv;
+        in vec4 g_cor;
+        out vec4 cor;
+        void main() {
+            cor = texture(textura, g_uv) * g_cor;
+        }
+    """
+
+    # Recortes: os quadros da explosão e depois um por tipo de partícula (detrito, faísca)
+    METADE_PARTICULA = ((1.5, 1.5), (1.0, 1.0))
+    COR_PARTICULA = ((0.75, 0.65, 0.55, 1.0), (1.0, 0.9, 0.45, 1.0))
+
+    def __init__(self, ctx, texturas, emissores):
+        self.ctx = ctx
+        self.emissores = emissores
+        self.dados = np.zeros((sum(e.capacidade for e in emissores), 12), dtype=np.float32)
+        self.buffer = ctx.buffer(reserve=self.dados.nbytes)
+        self.geometria = ctx.geometry(
+            [BufferDescription(self.buffer, "2f 2f 4f 4f", ["in_pos", "in_metade", "in_uv", "in_cor"])],
+            mode=ctx.POINTS,
+        )
+        self.programa = ctx.program(vertex_shader=self.VERTEX_SHADER, geometry_shader=self.GEOMETRY_SHADER,
+                                    fragment_shader=self.FRAGMENT_SHADER)
+        self.monta_atlas(texturas)
+
+    def monta_atlas(self, texturas):
+        """Uma textura com os quadros da explosão lado a lado e um bloco branco no fim."""
+        quadros = [texturas.get(f"explosao{q}") for q in range(QTD_QUADROS_EXPLOSAO)]
+        imagens = [q.image.convert("RGBA") if q else Image.new("RGBA", (1, 1)) for q in quadros]
+        branco = Image.new("RGBA", (4, 4), (255, 255, 255, 255))
+        largura = sum(imagem.width for imagem in imagens) + branco.width
+        altura = max(imagem.height for imagem in imagens)
+        atlas = Image.new("RGBA", (largura, altura))
+        recortes = []
+        x = 0
+        for imagem in imagens + [branco]:
+            atlas.paste(imagem, (x, 0))
+            # O atlas vai de cabeça para baixo para a GL: v conta a partir de baixo
+            recortes.append((x / largura, (altura - imagem.height) / altura,
+                             (x + imagem.width) / largura, 1.0))
+            x += imagem.width
+        # Detritos e faíscas amostram só o centro do bloco branco
+        u, v = (largura - 2) / largura, (altura - 2) / altura
+        recortes[-1] = (u, v, u, v)
+
+        # Tabela por recorte: meia largura, meia altura, u0, v0, u1, v1, r, g, b, a
+        escala = ESCALA_EXPLOSAO / 2
+        metades = [(TEXTURAS[f"explosao{q}"][1] * escala, TEXTURAS[f"explosao{q}"][2] * escala)
+                   for q in range(QTD_QUADROS_EXPLOSAO)] + list(self.METADE_PARTICULA)
+        recortes = recortes[:-1] + [recortes[-1]] * len(self.COR_PARTICULA)
+        cores = [(1.0, 1.0, 1.0, 1.0 if q else 0.0) for q in quadros] + list(self.COR_PARTICULA)
+        self.tabela = np.array([m + r + c for m, r, c in zip(metades, recortes, cores)], dtype=np.float32)
+        imagem = atlas.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+        self.textura = self.ctx.texture(imagem.size, components=4, data=imagem.tobytes())
+
+    def draw(self):
+        """Recalcula as partículas vivas de todos os emissores em lote e desenha numa chamada."""
+        n = 0
+        for emissor in self.emissores:
+            if emissor.ociosa():
+                continue
+            x, y, idade, tipo, vida = emissor.calcula()
+            dados = self.dados[n:n + len(x)]
+            n += len(x)
+            explosao = tipo == TIPO_EXPLOSAO
+            quadro = np.minimum(idade * V_ANIM_EXPLOSAO, QTD_QUADROS_EXPLOSAO - 1).astype(np.intp)
+            dados[:, 0] = x
+            dados[:, 1] = y
+            dados[:, 2:] = self.tabela[np.where(explosao, quadro, QTD_QUADROS_EXPLOSAO - 1 + tipo)]
+            # Detritos e faíscas desbotam ao longo da vida
+            dados[:, 11] *= np.where(explosao, 1.0, 1.0 - idade / vida)
+        if not n:
+            return 0
+        self.buffer.write(self.dados[:n])
+        self.textura.use(0)
+        with self.ctx.enabled(self.ctx.BLEND):
+            self.geometria.render(self.programa, vertices=n)
+        return 1
+
+
+class Espelho:
+    """Mantém uma SpriteList sincronizada com uma lista de entidades da simulação.
+
+    Sprites que deixam de ser usados ficam invisíveis na SpriteList e voltam
+    pelo pool, em vez de serem removidos e recriados a cada tiro ou explosão.
+    Vários espelhos podem compartilhar a mesma SpriteList: o pool é preenchido
+    na criação, então a ordem de criação dos espelhos é a ordem de desenho.
+    """
+
+    def __init__(self, texturas, capacidade=1, sprite_list=None):
+        self.sprite_list = sprite_list if sprite_list is not None else arcade.SpriteList()
+        self.texturas = texturas
+        self.pool = Pool(self._novo_sprite, capacidade, descarta=self._remove_sprite, preenche=True)
+        self._sprites = {}
+
+    def _novo_sprite(self):
+        sprite = arcade.Sprite()
+        sprite.textura_id = None
+        sprite.visible = False
+        self.sprite_list.append(sprite)
+        return sprite
+
+    @staticmethod
+    def _remove_sprite(sprite):
+        sprite.remove_from_sprite_lists()
+
+    def sincroniza(self, entidades, alfa=1.0):
+        """Posiciona os sprites entre o passo anterior e o atual (0 <= alfa <= 1)."""
+        anteriores = self._sprites
+        atuais = {}
+        for entidade in entidades:
+            sprite = anteriores.pop(entidade, None)
+            if sprite is None:
+                sprite = self.pool.adquire()
+                sprite.visible = True
+            if sprite.textura_id != entidade.textura:
+                sprite.texture = self.texturas[entidade.textura]
+                sprite.textura_id = entidade.textura
+            sprite.scale = entidade.escala
+            x, y = entidade.center_x, entidade.center_y
+            anterior_x = entidade.anterior_x
+            if anterior_x is not None and alfa < 1.0:
+                anterior_y = entidade.anterior_y
+                x = anterior_x + (x - anterior_x) * alfa
+                y = anterior_y + (y - anterior_y) * alfa
+            sprite.position = (x, y)
+            sprite.angle = entidade.angle
+            sprite.alpha = entidade.alpha
+            atuais[entidade] = sprite
+        for sprite in anteriores.values():
+            sprite.visible = False
+            self.pool.libera(sprite)
+        self._sprites = atuais
+
+
+class CamadaHUD:
+    """Placar, vidas e fases desenhados numa textura que só é refeita quando mudam."""
+
+    def __init__(self, ctx, texturas):
+        self.ctx = ctx
+        self.texturas = texturas
+        self.textura = ctx.texture(ctx.screen.size, components=4)
+        self.fbo = ctx.framebuffer(color_attachments=[self.textura])
+        self.quad = arcade.gl.geometry.quad_2d_fs()
+        self.vida_list = arcade.SpriteList()
+        self.fase_list = arcade.SpriteList()
+        self.score_text = arcade.Text("0", 5, ALT_TELA - 5, arcade.color.WHITE, 20, anchor_y="top", bold=True, font_name="Courier New")
+        self.placar = self.vidas = self.fase = None
+        self.reconstrucoes = 0
+
+    def atualiza(self, placar, vidas, fase):
+        """Refaz a camada se placar, vidas ou fase mudaram desde a última vez."""
+        if (placar, vidas, fase) == (self.placar, self.vidas, self.fase):
+            return
+        if placar != self.placar:
+            self.score_text.text = str(placar)
+        if vidas != self.vidas:
+            self.monta_vidas(vidas)
+        if fase != self.fase:
+            self.monta_fases(fase)
+        self.placar, self.vidas, self.fase = placar, vidas, fase
+
+        with self.fbo.activate():
+            self.fbo.clear()
+            self.vida_list.draw()
+            self.fase_list.draw()
+            self.score_text.draw()
+        self.reconstrucoes += 1
+
+    def monta_vidas(self, vidas):
+        """Mostra um indicador por vida; os sprites já criados são reaproveitados."""
+        while len(self.vida_list) < vidas:
+            vida = arcade.Sprite(self.texturas["vida"], ESCALA_VIDA)
+            vida.left = 1.2 * len(self.vida_list) * vida.width
+            vida.bottom = 0
+            self.vida_list.append(vida)
+        for i, vida in enumerate(self.vida_list):
+            vida.visible = i < vidas
+
+    def monta_fases(self, fase):
+        """Reposiciona os indicadores de fase, criando sprites só se faltarem."""
+        icones = [("fase_g", ESCALA_FASE_G)] * (fase // 5) + [("fase_p", ESCALA_FASE_P)] * (fase % 5)
+        while len(self.fase_list) < len(icones):
+            self.fase_list.append(arcade.Sprite(self.texturas["fase_p"], ESCALA_FASE_P))
+        for j, icone in enumerate(self.fase_list):
+            icone.visible = j < len(icones)
+            if not icone.visible:
+                continue
+            nome, escala = icones[j]
+            icone.texture = self.texturas[nome]
+            icone.scale = escala
+            icone.right = LARG_TELA - 1.2 * j * icone.width
+            icone.bottom = 0
+
+    def draw(self):
+        self.textura.use(0)
+        with self.ctx.enabled(self.ctx.BLEND):
+            self.quad.render(self.ctx.utility_textured_quad_program)
+
+
+# ------------------------ JOGO ------------------------
+class MeuJogo(arcade.Window):
+    def __init__(self, taxa_ticks=TAXA_TICKS, semente=None, arquivo_replay=None, arquivo_perfil=None,
+                 qtd_estrelas=QTD_ESTRELAS, mede_inicio=False, sim=None, pasta_telemetria=None):
+        super().__init__(LARG_TELA, ALT_TELA, TIT_TELA)
+        # Assets a partir da pasta do jogo; o diretório atual fica como está
+        # (caminhos de --grava e --perfil continuam relativos a ele)
+        self.base_path = os.path.dirname(os.path.abspath(__file__))
+
+        # Regras do jogo, avançadas em passos fixos independentes do FPS (ou,
+        # no cooperativo, o estado que chega do servidor)
+        self.sim = sim or Simulacao(semente)
+        self.qtd_estrelas = qtd_estrelas
+        self.arquivo_replay = arquivo_replay
+        if arquivo_replay:
+            self.sim.grava_entradas()
+        self.dt_tick = 1 / taxa_ticks
+        self.acumulador = 0.0
+
+        # Estados dos últimos segundos, guardados a cada passo (só na simulação local)
+        self.rebobinador = Rebobinador() if isinstance(self.sim, Simulacao) else None
+        self.rebobinando = False
+
+        # Teclas de direção seguradas no teclado (a simulação guarda as suas) e a
+        # latência do evento ao primeiro passo que move a nave (só na simulação local)
+        self.direcoes = []
+        self.latencia = LatenciaEntrada() if isinstance(self.sim, Simulacao) else None
+
+        # Telemetria das partidas (--telemetria), escrita numa thread (só na simulação local)
+        self.telemetria = None
+        if pasta_telemetria and isinstance(self.sim, Simulacao):
+            self.telemetria = cria_telemetria(pasta_telemetria)
+
+        # Todas as texturas do jogo, carregadas uma única vez (do atlas, se houver)
+        self.texturas = RegistroTexturas(self.base_path).carrega()
+
+        # Listas de sprites - Inicialize-as SEMPRE como SpriteList vazias
+        self.estrela_list = None
+        self.background_list = arcade.SpriteList() # <--- NOVO: Lista para o sprite de fundo
+
+        # Perfil por subsistema: F3 mostra o painel; --perfil exporta desde o início
+        self.perfil = PERFIL_DESLIGADO
+        self.mostra_perfil = False
+        self.perfil_text = arcade.Text("", LARG_TELA - 10, ALT_TELA - 10, arcade.color.LIGHT_GREEN, 10,
+                                       anchor_x="right", anchor_y="top", multiline=True, width=300,
+                                       font_name="Courier New")
+        if arquivo_perfil:
+            self.liga_perfil(cria_perfil(arquivo_perfil))
+
+        # Sprites que espelham as entidades da simulação. Todos ficam num único
+        # lote (uma SpriteList, um atlas, uma chamada de desenho); a ordem de
+        # criação abaixo é a ordem de desenho.
+        self.lote_jogo = arcade.SpriteList()
+        self.nave_list = Espelho(self.texturas, MAX_JOGADORES, self.lote_jogo)
+        self.missil_list = Espelho(self.texturas, CAPACIDADE_POOL["missil"], self.lote_jogo)
+        self.inimigo_list = Espelho(self.texturas, LINS_INIMIGOS * COLS_INIMIGOS, self.lote_jogo)
+        self.inimissil_list = Espelho(self.texturas, CAPACIDADE_POOL["inimissil"], self.lote_jogo)
+        self.ufo_list = Espelho(self.texturas, CAPACIDADE_POOL["ufo"], self.lote_jogo)
+        self.powerup_list = Espelho(self.texturas, CAPACIDADE_POOL["powerup"], self.lote_jogo)
+
+        # Explosões da simulação mais detritos e faíscas, que são só visuais e
+        # andam no relógio das explosões: tudo em arrays, numa chamada de desenho
+        self.particulas = Particulas(MAX_PARTICULAS, np.random.default_rng(self.sim.semente))
+        self.relogio_particulas = self.sim.explosoes.tick
+        self.desenho_particulas = DesenhoParticulas(self.ctx, self.texturas,
+                                                    [self.sim.explosoes, self.particulas])
+
+        # HUD em camada própria, refeita só quando placar, vidas ou fase mudam
+        self.hud = CamadaHUD(self.ctx, self.texturas)
+
+        # Sons: decodificados numa thread enquanto a tela de carregamento aparece
+        self.snd_shot = None
+        self.snd_explosion = None
+        self.mixer = Mixer()
+        self.music = None
+        self.music_player = None
+        self.carregando = True
+        self.carregador = threading.Thread(target=self.carrega_sons, daemon=True)
+        self.carregador.start()
+
+        # Tempo até o primeiro quadro (--mede-inicio)
+        self.mede_inicio = mede_inicio
+        self.quadros_desenhados = 0
+
+        # --- TEXTURAS DOS BOTÕES (já no registro) ---
+        botoes = ("botao_start_normal", "botao_start_hover", "botao_start_pressed",
+                  "botao_restart_normal", "botao_restart_hover", "botao_restart_pressed")
+        self.use_image_buttons = all(botao in self.texturas for botao in botoes)
+        if self.use_image_buttons:
+            # Botão de Iniciar
+            self.start_tex_normal = self.texturas["botao_start_normal"]
+            self.start_tex_hover = self.texturas["botao_start_hover"]
+            self.start_tex_pressed = self.texturas["botao_start_pressed"]
+
+            # Botão de Recomeçar
+            self.restart_tex_normal = self.texturas["botao_restart_normal"]
+            self.restart_tex_hover = self.texturas["botao_restart_hover"]
+            self.restart_tex_pressed = self.texturas["botao_restart_pressed"]
+        else:
+            print("Usando botões de texto como fallback.")
+        # --- FIM DAS TEXTURAS DOS BOTÕES ---
+
+        # Textos
+        self.game_over_text = arcade.Text(
+            "GAME OVER", LARG_TELA / 2, ALT_TELA / 2 + 50,
+            arcade.color.RED, 60, anchor_x="center", anchor_y="center", bold=True, font_name="Courier New"
+        )
+        self.pause_text = arcade.Text(
+            "PAUSE", LARG_TELA / 2, ALT_TELA / 2,
+            arcade.color.GREEN, 60, anchor_x="center", anchor_y="center", bold=True, font_name="Courier New"
+        )
+        self.title_text = arcade.Text(
+            "INVAXIANS", LARG_TELA / 2, ALT_TELA / 2 + 50,
+            arcade.color.YELLOW, 60, anchor_x="center", anchor_y="center", bold=True, font_name="Courier New"
+        )
+        self.loading_text = arcade.Text(
+            "CARREGANDO...", LARG_TELA / 2, ALT_TELA / 2 - 50,
+            arcade.color.WHITE, 20, anchor_x="center", anchor_y="center", font_name="Courier New"
+        )
+
+        self.set_mouse_visible(True)
+        # arcade.set_background_color(arcade.color.MIDNIGHT_BLUE) # REMOVA ESTA LINHA OU COMENTE
+
+        # Gerenciador de UI para os botões
+        self.manager = arcade.gui.UIManager()
+        self.manager.enable()
+
+        # Botões
+        self.start_button = None
+        self.restart_button = None
+        self.setup_buttons()
+
+        # O botão de iniciar só aparece quando o carregamento terminar
+        self.set_active_buttons(None)
+
+    def set_active_buttons(self, game_state):
+        """Ativa/desativa os botões com base no estado do jogo."""
+        self.manager.clear()
+
+        if game_state == GAME_STATE_MENU:
+            self.manager.add(self.start_button)
+        elif game_state == GAME_STATE_GAME_OVER:
+            self.manager.add(self.restart_button)
+
+    def setup_buttons(self):
+        """Configura os botões de iniciar e recomeçar."""
+        if self.use_image_buttons:
+            # Botão de Iniciar Jogo com Imagens
+            self.start_button = arcade.gui.UITextureButton(
+                texture=self.start_tex_normal,
+                texture_hovered=self.start_tex_hover,
+                texture_pressed=self.start_tex_pressed,
+                center_x=LARG_TELA / 2,
+                center_y=ALT_TELA / 2 - 50,
+                scale=1.0
+            )
+            self.start_button.on_click = self.on_start_button_click
+
+            # Botão de Recomeçar com Imagens
+            self.restart_button = arcade.gui.UITextureButton(
+                texture=self.restart_tex_normal,
+                texture_hovered=self.restart_tex_hover,
+                texture_pressed=self.restart_tex_pressed,
+                center_x=LARG_TELA / 2,
+                center_y=ALT_TELA / 2 - 50,
+                scale=1.0
+            )
+            self.restart_button.on_click = self.on_restart_button_click
+        else:
+            # Fallback para botões de texto se as imagens não forem encontradas
+            self.start_button = arcade.gui.UIFlatButton(
+                text="Iniciar Jogo",
+                center_x=LARG_TELA / 2,
+                center_y=ALT_TELA / 2 - 50,
+                width=200,
+                height=50,
+                style={
+                    "font_size": 18,
+                    "font_name": "Arial",
+                    "font_color": arcade.color.WHITE,
+                    "bg_color": arcade.color.DARK_GREEN,
+                    "border_width": 2,
+                    "border_color": arcade.color.WHITE,
+                    "bg_color_pressed": arcade.color.LIGHT_GREEN,
+                    "font_color_pressed": arcade.color.BLACK,
+                }
+            )
+            self.start_button.on_click = self.on_start_button_click
+
+            self.restart_button = arcade.gui.UIFlatButton(
+                text="Recomeçar",
+                center_x=LARG_TELA / 2,
+                center_y=ALT_TELA / 2 - 50,
+                width=200,
+                height=50,
+                style={
+                    "font_size": 18,
+                    "font_name": "Arial",
+                    "font_color": arcade.color.WHITE,
+                    "bg_color": arcade.color.DARK_RED,
+                    "border_width": 2,
+                    "border_color": arcade.color.WHITE,
+                    "bg_color_pressed": arcade.color.LIGHT_RED,
+                    "font_color_pressed": arcade.color.BLACK,
+                }
+            )
+            self.restart_button.on_click = self.on_restart_button_click
+
+
+    def on_start_button_click(self, event):
+        """Chamado quando o botão 'Iniciar Jogo' é clicado."""
+        self.clica_espaco()
+
+    def on_restart_button_click(self, event):
+        """Chamado quando o botão 'Recomeçar' é clicado."""
+        self.clica_espaco()
+
+    def clica_espaco(self):
+        """Os botões valem um toque no espaço, para o início entrar no replay como uma tecla."""
+        self.sim.pressiona(TECLA_ESPACO)
+        self.sim.solta(TECLA_ESPACO)
+        self.processa_eventos()
+
+    # ------------------------ CONFIGURAÇÕES INICIAIS ------------------------
+    def carrega_sons(self):
+        """Decodifica os sons (roda na thread de carregamento)."""
+        path_audio = os.path.join(self.base_path, PATH_AUDIO)
+        self.snd_shot = arcade.load_sound(os.path.join(path_audio, "laser5.ogg"))
+        self.snd_explosion = arcade.load_sound(os.path.join(path_audio, "explosion2.ogg"))
+        try:
+            self.music = arcade.load_sound(os.path.join(path_audio, "background.ogg"), streaming=True)
+        except FileNotFoundError:
+            self.music = None
+
+    def termina_carregamento(self):
+        """Cria o player da música e libera o menu, já na thread principal."""
+        self.carregador.join()
+        if self.snd_shot:
+            self.mixer.registra("tiro", self.snd_shot, VOZES_SOM["tiro"])
+        if self.snd_explosion:
+            self.mixer.registra("explosao", self.snd_explosion, VOZES_SOM["explosao"])
+        if self.music:
+            self.music_player = self.music.play(volume=0.4, loop=True)
+            self.music_player.pause()
+        self.carregando = False
+        self.set_active_buttons(self.sim.game_state)
+        if self.mede_inicio:
+            print(f"pronto {time.perf_counter():.6f}", flush=True)
+
+    def inicia_bg(self):
+        """Cria as estrelas de fundo e o sprite de imagem de fundo."""
+        # Limpa a lista de fundo antes de adicionar um novo sprite, caso seja chamada mais de uma vez
+        self.background_list = arcade.SpriteList() 
+        if "fundo" in self.texturas:
+            background_sprite = arcade.Sprite(self.texturas["fundo"], scale=1.0)
+            background_sprite.center_x = LARG_TELA / 2
+            background_sprite.center_y = ALT_TELA / 2
+            self.background_list.append(background_sprite) # <--- Adiciona o sprite à lista
+        else:
+            print("AVISO: Imagem de fundo 'fundo_espaco.png' não encontrada. Usando estrelas e cor de fundo padrão.")
+            self.background_list = None # Se não houver imagem, define a lista como None para não tentar desenhá-la
+            arcade.set_background_color(arcade.color.MIDNIGHT_BLUE) # Fallback para cor
+
+        self.estrela_list = None
+        if self.qtd_estrelas > 0 and "estrela" in self.texturas:
+            self.campo_estrelas = CampoEstrelas(self.qtd_estrelas, rng=np.random.default_rng(self.sim.semente))
+            self.estrela_list = DesenhoEstrelas(self.ctx, self.campo_estrelas, self.texturas["estrela"])
+
+    # ------------------------ MÉTODOS DE SUPORTE ------------------------
+    def liga_perfil(self, perfil):
+        self.perfil = perfil
+        self.sim.perfil = perfil
+
+    def alterna_perfil(self):
+        """F3: mostra/esconde o painel de tempos, ligando o perfil se preciso."""
+        self.mostra_perfil = not self.mostra_perfil
+        if self.mostra_perfil and not self.perfil.ativo:
+            self.liga_perfil(cria_perfil())
+        elif not self.mostra_perfil and self.perfil.exportador is None:
+            self.liga_perfil(PERFIL_DESLIGADO)
+
+    def atualiza_particulas(self):
+        """Acompanha o relógio das explosões e estilhaça as que nasceram desde a última vez."""
+        explosoes = self.sim.explosoes
+        passos = explosoes.tick - self.relogio_particulas
+        self.relogio_particulas = explosoes.tick
+        if passos < 0:
+            self.particulas.limpa()   # o relógio voltou: rebobinou
+        if passos <= 0:
+            return
+        self.particulas.atualiza(passos)
+        ativas = explosoes.ativas()
+        if len(ativas):
+            idade = explosoes.tick - explosoes.nascimento[ativas]
+            novas = idade < passos
+            if novas.any():
+                self.particulas.estilhaca(explosoes.x0[ativas[novas]], explosoes.y0[ativas[novas]], idade[novas])
+
+    def processa_eventos(self):
+        """Reage aos eventos emitidos pela simulação (sons, botões, música)."""
+        eventos = self.sim.eventos
+        tick = self.sim.tick
+        if self.telemetria is not None and eventos:
+            self.telemetria.observa(self.sim)
+        # Explosão no mesmo passo em que uma nave foi atingida (vida perdida ou fim de
+        # jogo); power-up de vida, início e rebobinar não passam na frente das outras vozes
+        prioridade = PRIORIDADE_NAVE if EVENTO_MORTE in eventos else PRIORIDADE_EXPLOSAO
+        for evento in eventos:
+            if evento == EVENTO_TIRO:
+                self.mixer.toca("tiro", tick, PRIORIDADE_TIRO)
+            elif evento == EVENTO_EXPLOSAO:
+                self.mixer.toca("explosao", tick, prioridade)
+            elif evento == EVENTO_ESTADO:
+                jogando = self.sim.game_state == GAME_STATE_PLAYING
+                if jogando and not self.rebobinando and self.rebobinador is not None:
+                    self.rebobinador.limpa()   # partida nova: não se volta para a anterior
+                self.set_active_buttons(self.sim.game_state)
+                self.set_mouse_visible(not jogando)
+                if self.music_player:
+                    if jogando:
+                        self.music_player.play()
+                    else:
+                        self.music_player.pause()
+            elif evento == EVENTO_PAUSA:
+                if self.music_player:
+                    if self.sim.pausado:
+                        self.music_player.pause()
+                    else:
+                        self.music_player.play()
+        self.sim.eventos.clear()
+
+    def sincroniza_sprites(self, alfa=1.0):
+        """Copia as posições das entidades da simulação para os sprites."""
+        sim = self.sim
+        self.nave_list.sincroniza(sim.naves, alfa)
+        self.missil_list.sincroniza(sim.missil_list, alfa)
+        self.inimigo_list.sincroniza(sim.formacao.vivos(), alfa)
+        self.inimissil_list.sincroniza(sim.inimissil_list, alfa)
+        self.ufo_list.sincroniza(sim.ufo_list, alfa)
+        self.powerup_list.sincroniza(sim.powerup_list, alfa)
+        self.hud.atualiza(sim.placar, sim.vidas, sim.fase)
+
+    # ------------------------ DRAW ------------------------
+    def on_draw(self):
+        perfil = self.perfil
+        t = perfil.agora()
+        chamadas = 0   # chamadas de desenho emitidas neste quadro
+        self.clear()
+        # --- Desenha a lista de fundo primeiro ---
+        if self.background_list: # Verifica se a lista não é None (em caso de erro de carregamento)
+            self.background_list.draw()
+            chamadas += 1
+        # --- Fim da lista de fundo ---
+        t = perfil.secao("draw_fundo", t)
+
+        if self.estrela_list:
+            self.estrela_list.draw()
+            chamadas += 1
+        t = perfil.secao("draw_estrelas", t)
+
+        game_state = self.sim.game_state
+        if self.carregando:
+            self.title_text.draw()
+            self.loading_text.draw()
+            chamadas += 2
+        elif game_state == GAME_STATE_MENU:
+            self.title_text.draw()
+            chamadas += 1
+        elif game_state == GAME_STATE_PLAYING:
+            self.lote_jogo.draw()
+            t = perfil.secao("draw_jogo", t)
+            chamadas += self.desenho_particulas.draw()
+            t = perfil.secao("draw_particulas", t)
+            self.hud.draw()
+            t = perfil.secao("draw_hud", t)
+            chamadas += 2
+            if self.sim.pausado:
+                self.pause_text.draw()
+                chamadas += 1
+        elif game_state == GAME_STATE_GAME_OVER:
+            self.game_over_text.draw()
+            self.hud.score_text.draw()
+            chamadas += 2
+        t = perfil.secao("draw_textos", t)
+
+        self.manager.draw()
+        chamadas += 1
+        perfil.secao("draw_gui", t)
+
+        if self.mostra_perfil:
+            self.desenha_perfil()
+        perfil.conta("draw_calls", chamadas)
+        if perfil.ativo:
+            perfil.conta("vozes", self.mixer.ativas())
+        perfil.fecha_quadro()
+
+        if self.mede_inicio:
+            if not self.quadros_desenhados:
+                self.ctx.finish()
+                print(f"primeiro_quadro {time.perf_counter():.6f}", flush=True)
+            if not self.carregando:
+                self.close()
+        self.quadros_desenhados += 1
+
+    def desenha_perfil(self):
+        """Painel com média e pior caso de cada seção e o gráfico do tempo total."""
+        perfil = self.perfil
+        if perfil.quadros % 15 == 0:   # refazer o layout do texto a cada quadro custaria caro
+            linhas = [f"{'seção':<16}{'média':>7}{'pior':>7}"]
+            linhas += [f"{nome:<16}{media:7.3f}{pior:7.3f}" for nome, media, pior in perfil.resumo()]
+            linhas += [f"{nome:<16}{valor:7.0f}" for nome, valor in perfil.contadores.items()]
+            self.perfil_text.text = "\n".join(linhas)
+        arcade.draw_lrbt_rectangle_filled(LARG_TELA - 320, LARG_TELA, ALT_TELA - 340, ALT_TELA,
+                                          (0, 0, 0, 180))
+        self.perfil_text.draw()
+
+        # Gráfico: tempo total de cada quadro da janela; a linha de 16,7 ms é o limite a 60 Hz
+        base, escala = ALT_TELA - 335, 4.0
+        arcade.draw_line(LARG_TELA - 320, base + 16.7 * escala, LARG_TELA, base + 16.7 * escala,
+                         arcade.color.RED, 1)
+        if len(perfil.totais) > 1:
+            passo_x = 320 / perfil.janela
+            pontos = [(LARG_TELA - 320 + i * passo_x, base + min(ms, 20) * escala)
+                      for i, ms in enumerate(perfil.totais)]
+            arcade.draw_line_strip(pontos, arcade.color.LIGHT_GREEN, 1)
+
+    # ------------------------ UPDATE ------------------------
+    def on_update(self, delta_time: float):
+        if self.carregando:
+            if self.carregador.is_alive():
+                return
+            self.termina_carregamento()
+        if self.telemetria is not None:
+            self.telemetria.quadro(delta_time)
+        # Passo fixo: o tempo real acumulado vira um número inteiro de passos
+        self.acumulador += delta_time
+        passos = 0
+        while self.acumulador >= self.dt_tick and passos < MAX_PASSOS_POR_QUADRO:
+            if self.estrela_list:
+                self.campo_estrelas.atualiza()
+            if self.rebobinando:
+                self.rebobinador.volta(self.sim)
+            else:
+                sim = self.sim
+                sim.passo()
+                if self.latencia is not None:
+                    self.latencia.apos_passo(sim)
+                if self.rebobinador is not None and sim.game_state == GAME_STATE_PLAYING and not sim.pausado:
+                    self.rebobinador.guarda(sim)
+            self.atualiza_particulas()
+            self.processa_eventos()
+            self.acumulador -= self.dt_tick
+            passos += 1
+        if passos == MAX_PASSOS_POR_QUADRO:
+            # Máquina sobrecarregada: descarta o atraso em vez de acumular
+            self.acumulador %= self.dt_tick
+
+        if self.perfil.ativo and self.latencia is not None and self.latencia.ms:
+            resumo = self.latencia.resumo()
+            self.perfil.conta("entrada_ms", resumo["p50_ms"])
+            self.perfil.conta("entrada_ticks", resumo["pior_ticks"])
+
+        parado = self.sim.game_state != GAME_STATE_PLAYING or self.sim.pausado or self.rebobinando
+        alfa = 1.0 if parado else self.acumulador / self.dt_tick
+        t = self.perfil.agora()
+        self.sincroniza_sprites(alfa)
+        self.perfil.secao("sincroniza", t)
+
+    # ------------------------ INPUT ------------------------
+    def on_key_press(self, key, modifiers):
+        if key == arcade.key.F3:
+            self.alterna_perfil()
+            return
+        if key == arcade.key.BACKSPACE:
+            self.rebobinando = self.rebobinador is not None
+            return
+        tecla = TECLAS.get(key)
+        if tecla in (TECLA_ESQUERDA, TECLA_DIREITA):
+            if tecla in self.direcoes:
+                self.direcoes.remove(tecla)
+            self.direcoes.append(tecla)
+        if tecla is None or self.carregando:
+            return
+        self.sim.pressiona(tecla)
+        self.processa_eventos()
+        if self.latencia is not None and tecla in (TECLA_ESQUERDA, TECLA_DIREITA):
+            self.latencia.chegou(self.sim)
+
+    def on_close(self):
+        if self.arquivo_replay:
+            replay.salva(self.arquivo_replay, self.sim)
+            print(f"Replay salvo em {self.arquivo_replay}")
+        if self.perfil.ativo:
+            self.perfil.fecha()
+        if self.telemetria is not None:
+            self.telemetria.fecha(self.sim)
+        super().on_close()
+
+    def on_key_release(self, key, modifiers):
+        if key == arcade.key.BACKSPACE:
+            self.rebobinando = False
+            self.sincroniza_direcoes()
+            return
+        tecla = TECLAS.get(key)
+        if tecla is None:
+            return
+        if tecla in self.direcoes:
+            self.direcoes.remove(tecla)
+        self.sim.solta(tecla)
+        if self.latencia is not None and tecla in (TECLA_ESQUERDA, TECLA_DIREITA):
+            self.latencia.chegou(self.sim)
+
+    def sincroniza_direcoes(self):
+        """Depois de rebobinar, a simulação volta a segurar o que o teclado segura."""
+        if self.rebobinador is None or self.sim.direcoes[0] == self.direcoes:
+            return
+        for tecla in list(self.sim.direcoes[0]):
+            self.sim.solta(tecla)
+        for tecla in self.direcoes:
+            self.sim.pressiona(tecla)
@@ -0,0 +1,138 @@
+import numpy as np
+
+from constantes import *
+
+"""
+Partículas em arrays
+====================
+Explosões, detritos e faíscas guardados em vetores de capacidade fixa.
+Cada partícula sai de um ponto com velocidade constante e a gravidade do
+seu tipo, então a posição e a idade em qualquer passo vêm de uma conta
+fechada a partir do passo de nascimento: avançar um passo é só avançar o
+relógio, e um quadro é um número fixo de operações vetorizadas sobre as
+vivas, sem trabalho em Python por explosão.
+
+Com os vetores cheios, a partícula nova ocupa o lugar da mais antiga.
+"""
+
+TIPO_EXPLOSAO = 0
+TIPO_DETRITO = 1
+TIPO_FAISCA = 2
+
+GRAVIDADE = np.array([0.0, G_DETRITO, G_FAISCA])
+NENHUMA = np.zeros(0, dtype=np.intp)
+
+
+class Particulas:
+    """Até `capacidade` partículas; o índice circular `cursor` aponta a mais antiga."""
+
+    def __init__(self, capacidade, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.capacidade = capacidade
+        self.tick = 0
+        self.cursor = 0
+        self.fim = 0   # passo a partir do qual todas estão mortas
+        self.x0 = np.zeros(capacidade)
+        self.y0 = np.zeros(capacidade)
+        self.vx = np.zeros(capacidade)
+        self.vy = np.zeros(capacidade)
+        self.nascimento = np.zeros(capacidade, dtype=np.int64)
+        self.vida = np.zeros(capacidade, dtype=np.int64)   # vida 0 = posição livre
+        self.tipo = np.zeros(capacidade, dtype=np.uint8)
+
+    def atualiza(self, passos=1):
+        self.tick += passos
+
+    def limpa(self):
+        self.vida.fill(0)
+        self.cursor = 0
+        self.fim = 0
+
+    def ociosa(self):
+        """Nenhuma partícula viva: quem consulta pode pular as contas."""
+        return self.tick >= self.fim
+
+    # ------------------------ EMISSÃO ------------------------
+    def emite(self, x, y, tipo, vida, vx=0.0, vy=0.0):
+        """Uma partícula nascida neste passo."""
+        i = self.cursor
+        self.x0[i] = x
+        self.y0[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.nascimento[i] = self.tick
+        self.vida[i] = vida
+        self.tipo[i] = tipo
+        self.cursor = (i + 1) % self.capacidade
+        self.fim = max(self.fim, self.tick + vida)
+
+    def emite_muitas(self, x, y, tipo, vida, vx=0.0, vy=0.0, idade=0):
+        """Várias partículas numa só escrita vetorizada; além da capacidade, ficam as últimas."""
+        x, y, vx, vy, vida, idade = np.broadcast_arrays(x, y, vx, vy, vida, idade)
+        n = len(x)
+        if n > self.capacidade:
+            x, y, vx, vy, vida, idade = (a[-self.capacidade:] for a in (x, y, vx, vy, vida, idade))
+            n = self.capacidade
+        indices = (self.cursor + np.arange(n)) % self.capacidade
+        self.x0[indices] = x
+        self.y0[indices] = y
+        self.vx[indices] = vx
+        self.vy[indices] = vy
+        self.nascimento[indices] = self.tick - idade
+        self.vida[indices] = vida
+        self.tipo[indices] = tipo
+        self.cursor = (self.cursor + n) % self.capacidade
+        if n:
+            self.fim = max(self.fim, int((self.tick - idade + vida).max()))
+
+    def estilhaca(self, x, y, idade=0):
+        """Detritos e faíscas saindo de cada ponto (x[i], y[i]) em direções sorteadas."""
+        x, y, idade = np.broadcast_arrays(np.asarray(x, dtype=float), y, idade)
+        rng = self.rng
+        for tipo, quantidade, velocidade, vida in ((TIPO_DETRITO, QTD_DETRITOS, V_DETRITO, DT_DETRITO),
+                                                   (TIPO_FAISCA, QTD_FAISCAS, V_FAISCA, DT_FAISCA)):
+            n = len(x) * quantidade
+            angulo = rng.uniform(0, 2 * np.pi, n)
+            modulo = rng.uniform(*velocidade, n)
+            self.emite_muitas(np.repeat(x, quantidade), np.repeat(y, quantidade), tipo,
+                              rng.integers(*vida, n, endpoint=True),
+                              modulo * np.cos(angulo), modulo * np.sin(angulo), np.repeat(idade, quantidade))
+
+    # ------------------------ CONSULTA ------------------------
+    def ativas(self):
+        """Índices das partículas vivas, da mais antiga para a mais nova."""
+        if self.tick >= self.fim:
+            return NENHUMA
+        ordem = (self.cursor + np.arange(self.capacidade)) % self.capacidade
+        idade = self.tick - self.nascimento[ordem]
+        return ordem[(idade >= 0) & (idade < self.vida[ordem])]
+
+    def calcula(self):
+        """(x, y, idade, tipo, vida) das partículas vivas, num passo vetorizado."""
+        idade = self.tick - self.nascimento
+        vivas = np.flatnonzero((idade >= 0) & (idade < self.vida))
+        idade = idade[vivas]
+        tipo = self.tipo[vivas]
+        t = idade.astype(float)
+        x = self.x0[vivas] + self.vx[vivas] * t
+        y = self.y0[vivas] + (self.vy[vivas] - GRAVIDADE[tipo] * t / 2) * t
+        return x, y, idade, tipo, self.vida[vivas]
+
+    def carrega(self, x, y, vx, vy, idade, vida, tipo):
+        """Substitui tudo pelas partículas dadas, da mais antiga para a mais nova."""
+        self.limpa()
+        n = len(x)
+        self.x0[:n] = x
+        self.y0[:n] = y
+        self.vx[:n] = vx
+        self.vy[:n] = vy
+        self.nascimento[:n] = self.tick - np.asarray(idade)
+        self.vida[:n] = vida
+        self.tipo[:n] = tipo
+        self.cursor = n % self.capacidade
+        if n:
+            self.fim = int((self.nascimento[:n] + self.vida[:n]).max())
+
+    def quantidade(self):
+        idade = self.tick - self.nascimento
+        return int(np.count_nonzero((idade >= 0) & (idade < self.vida)))
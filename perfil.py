@@ -0,0 +1,176 @@
+import csv
+import json
+import time
+from collections import deque
+
+"""
+Perfil por subsistema
+=====================
+Cronometra as seções do quadro (colisões, formação, disparos, UFO, cada
+camada desenhada...) e mantém médias móveis e piores casos. Desligado,
+o custo é uma chamada vazia por seção.
+
+    t = perfil.agora()
+    ...                              # trabalho da seção
+    t = perfil.secao("colisoes", t)  # encerra a seção e já abre a próxima
+"""
+
+SECOES_SIMULACAO = ["atualiza", "colisoes", "resolucao", "formacao", "disparos", "ufo"]
+SECOES_DESENHO = ["sincroniza", "draw_fundo", "draw_estrelas", "draw_jogo", "draw_particulas",
+                  "draw_hud", "draw_textos", "draw_gui"]
+SECOES = SECOES_SIMULACAO + SECOES_DESENHO
+
+# Valores contados por quadro (não são tempos)
+CONTADORES = ["draw_calls", "vozes", "entrada_ms", "entrada_ticks"]
+
+
+class PerfilDesligado:
+    """Perfil que não mede nada; usado quando o profiler está desligado."""
+
+    ativo = False
+
+    def agora(self):
+        return 0.0
+
+    def secao(self, nome, inicio):
+        return 0.0
+
+    def conta(self, nome, valor):
+        pass
+
+    def fecha_quadro(self):
+        pass
+
+
+PERFIL_DESLIGADO = PerfilDesligado()
+
+
+class Perfil:
+    """Tempos por seção com janela móvel de `janela` quadros, em milissegundos."""
+
+    ativo = True
+
+    def __init__(self, janela=120, exportador=None):
+        self.janela = janela
+        self.exportador = exportador
+        self.amostras = {}
+        self.totais = deque(maxlen=janela)
+        self.atual = {}
+        self.contadores = {}
+        self.quadros = 0
+
+    def agora(self):
+        return time.perf_counter()
+
+    def secao(self, nome, inicio):
+        fim = time.perf_counter()
+        self.atual[nome] = self.atual.get(nome, 0.0) + (fim - inicio) * 1000
+        return fim
+
+    def conta(self, nome, valor):
+        """Registra um valor do quadro (ex.: chamadas de desenho)."""
+        self.contadores[nome] = valor
+
+    def fecha_quadro(self):
+        """Consolida as seções medidas desde o último fechamento."""
+        atual = self.atual
+        for nome, ms in atual.items():
+            amostras = self.amostras.get(nome)
+            if amostras is None:
+                amostras = self.amostras[nome] = deque(maxlen=self.janela)
+            amostras.append(ms)
+        self.totais.append(sum(atual.values()))
+        if self.exportador:
+            self.exportador.escreve(self.quadros, atual, self.contadores)
+        self.atual = {}
+        self.quadros += 1
+
+    def resumo(self):
+        """[(seção, média, pior)] na janela móvel, na ordem de SECOES."""
+        nomes = [n for n in SECOES if n in self.amostras]
+        nomes += [n for n in self.amostras if n not in SECOES]
+        return [(n, sum(self.amostras[n]) / len(self.amostras[n]), max(self.amostras[n]))
+                for n in nomes]
+
+    def fecha(self):
+        if self.exportador:
+            self.exportador.fecha()
+            self.exportador = None
+
+
+# ------------------------ EXPORTAÇÃO ------------------------
+class ExportadorCSV:
+    """Uma linha por quadro: quadro, tempo de cada seção e total (ms)."""
+
+    def __init__(self, caminho):
+        self.arquivo = open(caminho, "w", newline="")
+        self.escritor = csv.writer(self.arquivo)
+        self.escritor.writerow(["quadro"] + SECOES + ["total"] + CONTADORES)
+
+    def escreve(self, quadro, secoes, contadores):
+        self.escritor.writerow([quadro] + [f"{secoes[n]:.4f}" if n in secoes else "" for n in SECOES]
+                               + [f"{sum(secoes.values()):.4f}"]
+                               + [contadores.get(n, "") for n in CONTADORES])
+
+    def fecha(self):
+        self.arquivo.close()
+
+
+class ExportadorJSON:
+    """Um objeto JSON por linha com as seções medidas no quadro."""
+
+    def __init__(self, caminho):
+        self.arquivo = open(caminho, "w")
+
+    def escreve(self, quadro, secoes, contadores):
+        self.arquivo.write(json.dumps({"quadro": quadro, **secoes, **contadores}) + "\n")
+
+    def fecha(self):
+        self.arquivo.close()
+
+
+# ------------------------ LATÊNCIA DE ENTRADA ------------------------
+class LatenciaEntrada:
+    """Do evento de tecla de direção ao primeiro passo em que a nave segue o novo sentido.
+
+    A janela avisa cada evento com o sentido que ele deixa segurado e chama
+    apos_passo depois de cada passo; só o evento mais recente fica pendente.
+    Um passo que não avança o quadro (menu, pausa) descarta o pendente.
+    """
+
+    def __init__(self, janela=600):
+        self.ticks = deque(maxlen=janela)
+        self.ms = deque(maxlen=janela)
+        self.pendente = None   # (sentido, tick, quadro, instante)
+
+    def chegou(self, sim, jogador=0):
+        self.pendente = (sim.direcao_nave(jogador), sim.tick, sim.quadro, time.perf_counter())
+
+    def apos_passo(self, sim, jogador=0):
+        if self.pendente is None or len(sim.naves) <= jogador:
+            return
+        sentido, tick, quadro, instante = self.pendente
+        if sim.quadro == quadro:
+            self.pendente = None
+            return
+        vx = sim.naves[jogador].change_x
+        if (vx > 0) - (vx < 0) == sentido:
+            self.ms.append((time.perf_counter() - instante) * 1000)
+            self.ticks.append(sim.tick - tick)
+            self.pendente = None
+
+    def resumo(self):
+        """Mediana e pior caso, em ms e em ticks, das medidas na janela móvel."""
+        if not self.ms:
+            return None
+        ms = sorted(self.ms)
+        return {"amostras": len(ms), "p50_ms": ms[len(ms) // 2], "pior_ms": ms[-1],
+                "p50_ticks": sorted(self.ticks)[len(ms) // 2], "pior_ticks": max(self.ticks)}
+
+
+def cria_perfil(caminho=None, janela=120):
+    """Perfil ligado, exportando para CSV ou JSON lines conforme a extensão."""
+    exportador = None
+    if caminho:
+        exportador = (ExportadorJSON if caminho.endswith((".json", ".jsonl")) else ExportadorCSV)(caminho)
+    return Perfil(janela, exportador)
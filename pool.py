@@ -0,0 +1,53 @@
+"""
+Pool de objetos reutilizáveis
+=============================
+Evita criar e descartar um objeto por tiro, explosão ou power-up: objetos
+liberados voltam para o pool e são entregues de novo no próximo pedido.
+"""
+
+
+class Pool:
+    """Pool de capacidade fixa com estatísticas de acertos, faltas e pico de uso."""
+
+    def __init__(self, fabrica, capacidade, descarta=None, preenche=False):
+        self.fabrica = fabrica
+        self.capacidade = capacidade
+        self.descarta = descarta
+        self.livres = []
+        self.em_uso = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.pico = 0
+        if preenche:
+            self.livres = [fabrica() for _ in range(capacidade)]
+
+    def adquire(self):
+        """Entrega um objeto livre ou, se não houver, cria um novo."""
+        if self.livres:
+            self.acertos += 1
+            obj = self.livres.pop()
+        else:
+            self.faltas += 1
+            obj = self.fabrica()
+        self.em_uso += 1
+        if self.em_uso > self.pico:
+            self.pico = self.em_uso
+        return obj
+
+    def libera(self, obj):
+        """Devolve o objeto; acima da capacidade ele é descartado."""
+        self.em_uso -= 1
+        if len(self.livres) < self.capacidade:
+            self.livres.append(obj)
+        elif self.descarta:
+            self.descarta(obj)
+
+    def estatisticas(self):
+        return {
+            "capacidade": self.capacidade,
+            "em_uso": self.em_uso,
+            "livres": len(self.livres),
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "pico": self.pico,
+        }
@@ -0,0 +1,388 @@
+import asyncio
+import struct
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from constantes import *
+from formacao import Formacao
+from particulas import Particulas, TIPO_EXPLOSAO
+from simulacao import (Entidade, EVENTO_TIRO, EVENTO_EXPLOSAO, EVENTO_ESTADO, EVENTO_PAUSA,
+                       EVENTO_FASE, EVENTO_VIDAS)
+
+"""
+Protocolo do cooperativo em rede
+================================
+O servidor (servidor.py) é o dono das regras; os clientes só desenham e
+mandam entradas. Tudo passa por TCP em quadros com tamanho na frente.
+
+Entrada (cliente -> servidor), uma por instantâneo recebido: número de
+sequência, último tick recebido (ack), campo de bits das teclas e a última
+latência medida pelo cliente. Esquerda/direita dizem se a tecla está
+segurada; tiro/pausa, se foi apertada desde a entrada anterior.
+
+Instantâneo (servidor -> cliente), um por tick: o estado inteiro vira um
+vetor de int16 (posições em 1/8 de pixel, formação como deslocamento da
+grade e bits de vivos) e vai como delta contra o último tick que o cliente
+confirmou: máscara de palavras alteradas e só as palavras novas. Sem base
+confirmada, o delta é contra zeros.
+"""
+
+# Teclas
+BIT_ESQUERDA = 1
+BIT_DIREITA = 2
+BIT_TIRO = 4
+BIT_PAUSA = 8
+SEGURADAS = ((TECLA_ESQUERDA, BIT_ESQUERDA), (TECLA_DIREITA, BIT_DIREITA))
+APERTADAS = ((TECLA_PAUSA, BIT_PAUSA), (TECLA_ESPACO, BIT_TIRO))
+BITS_TECLA = dict(SEGURADAS + APERTADAS)
+
+# Eventos da simulação, um bit cada
+EVENTOS = (EVENTO_TIRO, EVENTO_EXPLOSAO, EVENTO_ESTADO, EVENTO_PAUSA, EVENTO_FASE, EVENTO_VIDAS)
+
+# Mensagens
+MSG_BOAS_VINDAS = 1
+MSG_INSTANTANEO = 2
+MSG_ENTRADA = 3
+TAMANHO = struct.Struct("<H")
+BOAS_VINDAS = struct.Struct("<BBBI")    # tipo, jogador, jogadores, sessão
+INSTANTANEO = struct.Struct("<BIIIB")   # tipo, tick, tick base, última entrada aplicada, eventos
+ENTRADA = struct.Struct("<BIIBI")       # tipo, sequência, ack, bits, latência (µs)
+DELTA = struct.Struct("<H")             # palavras do vetor
+
+QUANTIZACAO = 8   # posições em 1/8 de pixel
+TAM_CABECALHO = 8
+QTD_LISTAS = 5    # mísseis, mísseis inimigos, UFOs, explosões, power-ups
+
+
+# ------------------------ ENTRADAS ------------------------
+def aplica_entrada(sim, jogador, seguradas, bits):
+    """Converte o campo de bits em pressiona/solta; devolve as teclas seguradas agora."""
+    for tecla, bit in SEGURADAS:
+        if seguradas & bit and not bits & bit:
+            sim.solta(tecla, jogador)
+    for tecla, bit in SEGURADAS:
+        if bits & bit and not seguradas & bit:
+            sim.pressiona(tecla, jogador)
+    for tecla, bit in APERTADAS:
+        if bits & bit:
+            sim.pressiona(tecla, jogador)
+    return bits & (BIT_ESQUERDA | BIT_DIREITA)
+
+
+def bits_eventos(eventos):
+    bits = 0
+    for i, evento in enumerate(EVENTOS):
+        if evento in eventos:
+            bits |= 1 << i
+    return bits
+
+
+# ------------------------ INSTANTÂNEOS ------------------------
+# Vetor: cabeçalho, contagens das listas, posições (deslocamento da formação,
+# naves, entidades e explosões, em 1/8 de pixel), extras (alfa das naves,
+# idade das explosões, tipo dos power-ups) e os bits de vivos da formação.
+def codifica(sim):
+    """Vetor int16 com tudo o que um cliente precisa para desenhar o tick."""
+    formacao = sim.formacao
+    explosoes = sim.explosoes
+    ativas = explosoes.ativas()
+    cabecalho = [sim.game_state, sim.pausado | bool(sim.bonus_ufo) << 1, sim.fase, sim.placar,
+                 sim.vidas, len(sim.naves), formacao.lins, formacao.cols,
+                 len(sim.missil_list), len(sim.inimissil_list), len(sim.ufo_list), len(ativas),
+                 len(sim.powerup_list)]
+
+    posicoes = list(formacao.deslocamento()) if len(formacao.vivo) else [0.0, 0.0]
+    for lista in (sim.naves, sim.missil_list, sim.inimissil_list, sim.ufo_list):
+        for entidade in lista:
+            posicoes += (entidade.center_x, entidade.center_y)
+    posicoes += np.column_stack((explosoes.x0[ativas], explosoes.y0[ativas])).ravel().tolist()
+    for power in sim.powerup_list:
+        posicoes += (power.center_x, power.center_y)
+    extras = [nave.alpha for nave in sim.naves]
+    extras += (explosoes.tick - explosoes.nascimento[ativas]).tolist()
+    extras += [power.tipo == "life" for power in sim.powerup_list]
+
+    posicoes = np.clip(np.rint(np.array(posicoes) * QUANTIZACAO), -32768, 32767)
+    vivos = np.packbits(formacao.vivo)
+    if len(vivos) % 2:
+        vivos = np.append(vivos, np.uint8(0))
+    return np.concatenate((np.array(cabecalho, dtype="<i2"), posicoes.astype("<i2"),
+                           np.array(extras, dtype="<i2"), vivos.view("<i2")))
+
+
+def _ajusta(base, n):
+    if len(base) == n:
+        return base
+    ajustada = np.zeros(n, dtype="<i2")
+    m = min(n, len(base))
+    ajustada[:m] = base[:m]
+    return ajustada
+
+
+def delta(base, atual):
+    """Bytes que levam `base` a `atual`: tamanho, máscara de palavras alteradas e as palavras."""
+    mudou = _ajusta(base, len(atual)) != atual
+    return DELTA.pack(len(atual)) + np.packbits(mudou).tobytes() + atual[mudou].tobytes()
+
+
+def aplica_delta(base, dados):
+    (n,) = DELTA.unpack_from(dados)
+    tam_mascara = (n + 7) // 8
+    mudou = np.unpackbits(np.frombuffer(dados, np.uint8, tam_mascara, DELTA.size), count=n).view(bool)
+    vetor = _ajusta(base, n).copy()
+    vetor[mudou] = np.frombuffer(dados, "<i2", offset=DELTA.size + tam_mascara)
+    return vetor
+
+
+VAZIO = np.zeros(0, dtype="<i2")
+
+
+# ------------------------ QUADROS ------------------------
+def quadro(mensagem):
+    return TAMANHO.pack(len(mensagem)) + mensagem
+
+
+async def le_quadro(reader):
+    """Próxima mensagem da conexão, ou None quando ela fecha."""
+    try:
+        (tamanho,) = TAMANHO.unpack(await reader.readexactly(TAMANHO.size))
+        return await reader.readexactly(tamanho)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+
+# ------------------------ CLIENTE ------------------------
+class ClienteCoop:
+    """Conexão de um jogador: reconstrói os instantâneos e manda as teclas.
+
+    `pressiona`/`solta` podem ser chamados de outra thread (a da janela).
+    """
+
+    def __init__(self):
+        self.jogador = None
+        self.jogadores = MAX_JOGADORES
+        self.sessao = None
+        self.reader = self.writer = None
+        self._trava = threading.Lock()
+        self._seguradas = 0
+        self._apertadas = 0
+        self.seq = 0
+        self._enviadas = deque()   # (sequência, instante do envio)
+        self.latencia_us = 0
+        self.latencias = deque(maxlen=1000)
+        self.bytes_recebidos = 0
+        self._recebidos = {}        # tick -> vetor, bases para os próximos deltas
+        self.tick = 0
+        self.vetor = None
+        self._novo = False
+        self._eventos = 0
+
+    async def conecta(self, host, porta):
+        self.reader, self.writer = await asyncio.open_connection(host, porta)
+        mensagem = await le_quadro(self.reader)
+        if mensagem is None or mensagem[0] != MSG_BOAS_VINDAS:
+            raise ConnectionError("o servidor não respondeu com boas-vindas")
+        _, self.jogador, self.jogadores, self.sessao = BOAS_VINDAS.unpack(mensagem)
+
+    async def recebe(self):
+        """Lê e reconstrói o próximo instantâneo; False quando a conexão fecha."""
+        mensagem = await le_quadro(self.reader)
+        if mensagem is None:
+            return False
+        self.bytes_recebidos += TAMANHO.size + len(mensagem)
+        _, tick, base, ultima, eventos = INSTANTANEO.unpack_from(mensagem)
+        vetor = aplica_delta(self._recebidos.get(base, VAZIO), memoryview(mensagem)[INSTANTANEO.size:])
+        self._recebidos[tick] = vetor
+        if len(self._recebidos) > HISTORICO_INSTANTANEOS:
+            del self._recebidos[next(iter(self._recebidos))]
+
+        # Latência de ponta a ponta: do envio da entrada ao instantâneo que a aplicou
+        agora = time.perf_counter()
+        while self._enviadas and self._enviadas[0][0] <= ultima:
+            _, enviada = self._enviadas.popleft()
+            self.latencia_us = int((agora - enviada) * 1e6)
+            self.latencias.append(self.latencia_us)
+
+        with self._trava:
+            self.tick, self.vetor, self._novo = tick, vetor, True
+            self._eventos |= eventos
+        return True
+
+    async def envia_entrada(self):
+        with self._trava:
+            bits = self._seguradas | self._apertadas
+            self._apertadas = 0
+        self.seq += 1
+        self._enviadas.append((self.seq, time.perf_counter()))
+        self.writer.write(quadro(ENTRADA.pack(MSG_ENTRADA, self.seq, self.tick, bits,
+                                              min(self.latencia_us, 2 ** 32 - 1))))
+        await self.writer.drain()
+
+    async def roda(self):
+        """Recebe instantâneos e responde a cada um com as teclas atuais."""
+        while await self.recebe():
+            await self.envia_entrada()
+
+    def fecha(self):
+        if self.writer:
+            self.writer.close()
+
+    def inicia_em_thread(self, host, porta, espera=5.0):
+        """Conecta e roda o cliente num laço asyncio próprio, para uso pela janela."""
+        pronto = threading.Event()
+        erro = []
+
+        async def principal():
+            try:
+                await self.conecta(host, porta)
+            except OSError as exc:
+                erro.append(exc)
+                return
+            finally:
+                pronto.set()
+            await self.roda()
+
+        threading.Thread(target=asyncio.run, args=(principal(),), daemon=True).start()
+        if not pronto.wait(espera):
+            raise ConnectionError(f"sem resposta de {host}:{porta}")
+        if erro:
+            raise erro[0]
+        return self
+
+    # Teclas, da thread que for
+    def pressiona(self, tecla):
+        bit = BITS_TECLA.get(tecla, 0)
+        with self._trava:
+            if bit & (BIT_ESQUERDA | BIT_DIREITA):
+                self._seguradas |= bit
+            else:
+                self._apertadas |= bit
+
+    def solta(self, tecla):
+        with self._trava:
+            self._seguradas &= ~BITS_TECLA.get(tecla, 0)
+
+    def consome(self):
+        """(tick, vetor, bits de eventos) do instantâneo mais novo, ou None se nada chegou."""
+        with self._trava:
+            if not self._novo:
+                return None
+            eventos, self._eventos, self._novo = self._eventos, 0, False
+            return self.tick, self.vetor, eventos
+
+
+class SimulacaoRemota:
+    """Estado reconstruído dos instantâneos, com a interface de Simulacao que a janela e o bot usam."""
+
+    # Tipos de entidade na ordem das contagens; as explosões (None) vão para Particulas
+    ESCALAS = (ESCALA_NAVE, ESCALA_INIMIGO, ESCALA_UFO, None, ESCALA_POWERUP)
+    TEXTURAS = ("missil", "inimissil", "ufo", None, "powerup_speed")
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+        self.semente = cliente.sessao or 0
+        self.tick = 0
+        self.game_state = GAME_STATE_MENU
+        self.pausado = False
+        self.bonus_ufo = 0
+        self.fase = 1
+        self.placar = 0
+        self.vidas = 0
+        self.naves = []
+        self.formacao = Formacao()
+        self.missil_list = []
+        self.inimissil_list = []
+        self.ufo_list = []
+        self.powerup_list = []
+        self.explosoes = Particulas(MAX_EXPLOSOES)
+        self.eventos = []
+        self.perfil = None
+        self._reservas = [[] for _ in self.TEXTURAS]
+        self._reserva_naves = []
+
+    @property
+    def nave(self):
+        jogador = self.cliente.jogador or 0
+        return self.naves[jogador] if jogador < len(self.naves) else None
+
+    def pressiona(self, tecla):
+        self.cliente.pressiona(tecla)
+
+    def solta(self, tecla):
+        self.cliente.solta(tecla)
+
+    def inicia_partida(self):
+        self.cliente.pressiona(TECLA_ESPACO)
+
+    def passo(self):
+        """Aplica o instantâneo mais novo, se chegou algum desde o último passo."""
+        novo = self.cliente.consome()
+        if novo is None:
+            return
+        self.tick, vetor, bits = novo
+        self.eventos = [evento for i, evento in enumerate(EVENTOS) if bits & 1 << i]
+        self.decodifica(vetor)
+
+    def decodifica(self, vetor):
+        cabecalho = vetor[:TAM_CABECALHO + QTD_LISTAS].tolist()
+        (self.game_state, flags, self.fase, self.placar, self.vidas,
+         jogadores, lins, cols) = cabecalho[:TAM_CABECALHO]
+        contagens = cabecalho[TAM_CABECALHO:]
+        self.pausado = bool(flags & 1)
+        self.bonus_ufo = flags >> 1 & 1
+
+        i = TAM_CABECALHO + QTD_LISTAS
+        n_posicoes = 2 + 2 * (jogadores + sum(contagens))
+        posicoes = (vetor[i:i + n_posicoes] / QUANTIZACAO).tolist()
+        i += n_posicoes
+        n_extras = jogadores + contagens[3] + contagens[4]
+        extras = vetor[i:i + n_extras].tolist()
+        i += n_extras
+
+        reserva = self._reserva_naves
+        while len(reserva) < jogadores:
+            reserva.append(Entidade("nave", ESCALA_NAVE))
+        self.naves = reserva[:jogadores]
+        p = 2
+        for nave, alpha in zip(self.naves, extras):
+            nave.center_x, nave.center_y, nave.alpha = posicoes[p], posicoes[p + 1], alpha
+            p += 2
+        e = jogadores
+
+        listas = []
+        for tipo, n in enumerate(contagens):
+            if tipo == 3:
+                self.explosoes.tick = self.tick
+                self.explosoes.carrega(posicoes[p:p + 2 * n:2], posicoes[p + 1:p + 2 * n:2], 0.0, 0.0,
+                                       extras[e:e + n], DT_EXPLOSAO, TIPO_EXPLOSAO)
+                p += 2 * n
+                e += n
+                continue
+            reserva = self._reservas[tipo]
+            while len(reserva) < n:
+                entidade = Entidade(self.TEXTURAS[tipo], self.ESCALAS[tipo])
+                entidade.angle = 180 if tipo == 1 else 0
+                reserva.append(entidade)
+            lista = reserva[:n]
+            for entidade in lista:
+                entidade.center_x, entidade.center_y = posicoes[p], posicoes[p + 1]
+                p += 2
+            if tipo == 4:
+                for power, vida in zip(lista, extras[e:e + n]):
+                    power.textura = "powerup_life" if vida else "powerup_speed"
+                e += n
+            listas.append(lista)
+        self.missil_list, self.inimissil_list, self.ufo_list, self.powerup_list = listas
+
+        formacao = self.formacao
+        if (lins, cols) != (formacao.lins, formacao.cols):
+            formacao.monta(lins, cols, 0.0)
+        formacao.vivo[:] = np.unpackbits(vetor[i:].view(np.uint8), count=lins * cols).view(bool)
+        formacao.quantidade = int(formacao.vivo.sum())
+        np.add(formacao.x0, posicoes[0], out=formacao.x)
+        np.add(formacao.y0, posicoes[1], out=formacao.y)
+        formacao.x_ant[:] = formacao.x
+        formacao.y_ant[:] = formacao.y
@@ -0,0 +1,82 @@
+import struct
+
+from simulacao import Simulacao
+
+"""
+Replays de partidas
+===================
+Um replay guarda a semente da sessão e as teclas recebidas, cada uma
+marcada com o tick da simulação em que chegou. Reexecutar as mesmas teclas
+nos mesmos ticks, com a mesma semente, reproduz a partida exatamente.
+
+Formato (little-endian):
+    cabeçalho  "IVXR", versão (u8), semente (u64), quantidade de eventos (u32)
+    evento     tick (u32), tecla << 1 | pressionada (u8)
+    rodapé     ticks totais (u32), placar final (u32), fase final (u16)
+"""
+
+MARCA = b"IVXR"
+VERSAO = 5
+
+CABECALHO = struct.Struct("<4sBQI")
+EVENTO = struct.Struct("<IB")
+RODAPE = struct.Struct("<IIH")
+
+
+class ReplayInvalido(ValueError):
+    """Arquivo que não é um replay do Invaxians nesta versão."""
+
+
+def salva(caminho, sim):
+    """Grava as entradas registradas pela simulação e o resultado final."""
+    entradas = sim.entradas or []
+    with open(caminho, "wb") as arq:
+        arq.write(CABECALHO.pack(MARCA, VERSAO, sim.semente, len(entradas)))
+        arq.write(b"".join(EVENTO.pack(tick, tecla << 1 | pressionada)
+                           for tick, tecla, pressionada in entradas))
+        arq.write(RODAPE.pack(sim.tick, sim.placar, sim.fase))
+
+
+def carrega(caminho):
+    """Lê um replay: (semente, entradas, (ticks, placar, fase))."""
+    with open(caminho, "rb") as arq:
+        dados = arq.read()
+    if len(dados) < CABECALHO.size + RODAPE.size:
+        raise ReplayInvalido(f"{caminho}: arquivo curto demais")
+    marca, versao, semente, quantidade = CABECALHO.unpack_from(dados)
+    if marca != MARCA or versao != VERSAO:
+        raise ReplayInvalido(f"{caminho}: não é um replay versão {VERSAO}")
+    if len(dados) != CABECALHO.size + quantidade * EVENTO.size + RODAPE.size:
+        raise ReplayInvalido(f"{caminho}: tamanho não confere com o cabeçalho")
+    entradas = [(tick, codigo >> 1, bool(codigo & 1))
+                for tick, codigo in EVENTO.iter_unpack(dados[CABECALHO.size:-RODAPE.size])]
+    final = RODAPE.unpack_from(dados, len(dados) - RODAPE.size)
+    return semente, entradas, final
+
+
+def reproduz(caminho):
+    """Reexecuta o replay sem janela, o mais rápido possível.
+
+    Devolve a simulação ao fim e o resultado (ticks, placar, fase) gravado,
+    para conferência.
+    """
+    semente, entradas, final = carrega(caminho)
+    ticks = final[0]
+    sim = Simulacao(semente)
+    i = 0
+    while sim.tick < ticks:
+        while i < len(entradas) and entradas[i][0] == sim.tick:
+            _, tecla, pressionada = entradas[i]
+            if pressionada:
+                sim.pressiona(tecla)
+            else:
+                sim.solta(tecla)
+            i += 1
+        sim.passo()
+    # Teclas recebidas depois do último passo
+    for _, tecla, pressionada in entradas[i:]:
+        if pressionada:
+            sim.pressiona(tecla)
+        else:
+            sim.solta(tecla)
+    return sim, final
@@ -0,0 +1,290 @@
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from collections import deque
+
+from constantes import *
+from simulacao import Simulacao
+from bot import BotSimples
+from rede import (ClienteCoop, SimulacaoRemota, aplica_entrada, bits_eventos, codifica, delta, quadro,
+                  le_quadro, BOAS_VINDAS, ENTRADA, INSTANTANEO, MSG_BOAS_VINDAS, MSG_ENTRADA,
+                  MSG_INSTANTANEO, TAMANHO, VAZIO)
+
+"""
+Servidor do cooperativo
+=======================
+Um processo, um laço asyncio e várias sessões de MAX_JOGADORES naves. A
+cada tick o servidor aplica as entradas que chegaram, avança cada sessão
+e manda a cada cliente o instantâneo em delta contra o último tick que ele
+confirmou. Cliente atrasado (buffer de envio cheio) pula instantâneos; o
+próximo delta parte do que ele confirmou, então nada se perde.
+
+    python servidor.py                          # serve em PORTA_SERVIDOR
+    python invaxians.py --conecta 127.0.0.1     # um jogador com janela
+    python servidor.py --teste --sessoes 12     # bots em localhost; relatório e sai
+"""
+
+LIMITE_BUFFER = 64 * 1024   # bytes pendentes acima dos quais o instantâneo do tick é pulado
+
+
+class Conexao:
+    """Um jogador conectado: entradas ainda não aplicadas, ack e teclas seguradas."""
+
+    def __init__(self, writer, jogador):
+        self.writer = writer
+        self.jogador = jogador
+        self.entradas = deque()   # (sequência, bits, instante da chegada)
+        self.seguradas = 0
+        self.ack = 0              # último tick que o cliente tem
+        self.ultima = 0           # última sequência aplicada
+        self.pulados = 0
+
+
+class Sessao:
+    """Uma partida cooperativa e os instantâneos recentes, bases dos deltas."""
+
+    def __init__(self, numero, semente=None):
+        self.numero = numero
+        self.sim = Simulacao(semente, jogadores=MAX_JOGADORES)
+        self.conexoes = [None] * MAX_JOGADORES
+        self.historico = {}   # tick -> vetor
+        self.ticks = 0
+        self.bytes = 0
+        self.bytes_completos = 0   # o que os mesmos instantâneos custariam sem delta
+        self.bytes_entradas = 0
+        self.latencias = deque(maxlen=4000)    # de ponta a ponta, medidas pelos clientes (µs)
+        self.residencias = deque(maxlen=4000)  # chegada da entrada -> envio do instantâneo (µs)
+
+    def vaga(self):
+        return next((j for j, conexao in enumerate(self.conexoes) if conexao is None), None)
+
+    def vazia(self):
+        return all(conexao is None for conexao in self.conexoes)
+
+    def sai(self, jogador):
+        """Solta as teclas de quem desconectou; a nave fica parada."""
+        conexao = self.conexoes[jogador]
+        aplica_entrada(self.sim, jogador, conexao.seguradas, 0)
+        self.conexoes[jogador] = None
+
+    def passo(self):
+        sim = self.sim
+        chegadas = []
+        for conexao in self.conexoes:
+            if conexao is None:
+                continue
+            while conexao.entradas:
+                seq, bits, chegada = conexao.entradas.popleft()
+                conexao.seguradas = aplica_entrada(sim, conexao.jogador, conexao.seguradas, bits)
+                conexao.ultima = seq
+                chegadas.append(chegada)
+        # Eventos das entradas (tiro, pausa, início) mais os do passo; os do
+        # instantâneo anterior foram limpos depois de enviados
+        eventos = list(sim.eventos)
+        sim.passo()
+        eventos += sim.eventos
+
+        vetor = codifica(sim)
+        historico = self.historico
+        historico[sim.tick] = vetor
+        if len(historico) > HISTORICO_INSTANTANEOS:
+            del historico[next(iter(historico))]
+
+        bits = bits_eventos(eventos)
+        completo = None
+        for conexao in self.conexoes:
+            if conexao is None:
+                continue
+            if conexao.writer.transport.get_write_buffer_size() > LIMITE_BUFFER:
+                conexao.pulados += 1
+                continue
+            base = conexao.ack if conexao.ack in historico else 0
+            mensagem = quadro(INSTANTANEO.pack(MSG_INSTANTANEO, sim.tick, base, conexao.ultima, bits) +
+                              delta(historico.get(base, VAZIO), vetor))
+            conexao.writer.write(mensagem)
+            self.bytes += len(mensagem)
+            if completo is None:
+                completo = TAMANHO.size + INSTANTANEO.size + len(delta(VAZIO, vetor))
+            self.bytes_completos += completo
+        sim.eventos.clear()
+        agora = time.perf_counter()
+        self.residencias.extend(int((agora - chegada) * 1e6) for chegada in chegadas)
+        self.ticks += 1
+
+
+class ServidorCoop:
+    """Aceita jogadores, forma as sessões e as avança a TAXA_TICKS."""
+
+    def __init__(self, semente=None):
+        self.semente = semente
+        self.sessoes = {}
+        self.numeros = itertools.count(1)
+        self.porta = None
+        self.duracoes = deque(maxlen=10_000)   # custo de um tick de todas as sessões (ms)
+        self.ticks = 0
+        self.atrasados = 0
+
+    async def inicia(self, host="0.0.0.0", porta=PORTA_SERVIDOR):
+        servidor = await asyncio.start_server(self.atende, host, porta)
+        self.porta = servidor.sockets[0].getsockname()[1]
+        return servidor
+
+    def sessao_com_vaga(self):
+        for sessao in self.sessoes.values():
+            if sessao.vaga() is not None:
+                return sessao
+        numero = next(self.numeros)
+        semente = None if self.semente is None else self.semente + numero
+        sessao = self.sessoes[numero] = Sessao(numero, semente)
+        return sessao
+
+    async def atende(self, reader, writer):
+        sessao = self.sessao_com_vaga()
+        jogador = sessao.vaga()
+        conexao = sessao.conexoes[jogador] = Conexao(writer, jogador)
+        writer.write(quadro(BOAS_VINDAS.pack(MSG_BOAS_VINDAS, jogador, MAX_JOGADORES, sessao.numero)))
+        try:
+            while (mensagem := await le_quadro(reader)) is not None:
+                if mensagem[0] != MSG_ENTRADA:
+                    continue
+                _, seq, ack, bits, latencia = ENTRADA.unpack(mensagem)
+                conexao.entradas.append((seq, bits, time.perf_counter()))
+                conexao.ack = ack
+                if latencia:
+                    sessao.latencias.append(latencia)
+                sessao.bytes_entradas += TAMANHO.size + len(mensagem)
+        finally:
+            sessao.sai(jogador)
+            if sessao.vazia():
+                self.sessoes.pop(sessao.numero, None)
+            writer.close()
+
+    async def roda(self, segundos=None):
+        """Laço de ticks; sem `segundos`, roda até ser cancelado."""
+        laco = asyncio.get_running_loop()
+        dt = 1 / TAXA_TICKS
+        proximo = laco.time()
+        fim = None if segundos is None else proximo + segundos
+        while fim is None or laco.time() < fim:
+            inicio = time.perf_counter()
+            for sessao in list(self.sessoes.values()):
+                sessao.passo()
+            self.duracoes.append((time.perf_counter() - inicio) * 1000)
+            self.ticks += 1
+            proximo += dt
+            espera = proximo - laco.time()
+            if espera < 0:
+                # Tick atrasado: segue o relógio em vez de acumular ticks de recuperação
+                self.atrasados += 1
+                proximo = laco.time()
+            await asyncio.sleep(max(espera, 0))
+
+    def relatorio(self):
+        sessoes = list(self.sessoes.values())
+        ticks = sum(s.ticks for s in sessoes) or 1
+        latencias = sorted(l for s in sessoes for l in s.latencias)
+        residencias = sorted(r for s in sessoes for r in s.residencias)
+
+        def percentil(valores, p):
+            return valores[min(len(valores) - 1, int(p * len(valores)))] / 1000 if valores else 0.0
+
+        duracoes = sorted(self.duracoes)
+        return {
+            "sessoes": len(sessoes),
+            "jogadores": sum(c is not None for s in sessoes for c in s.conexoes),
+            "ticks": self.ticks,
+            "tick_p50_ms": statistics.median(duracoes) if duracoes else 0.0,
+            "tick_p99_ms": duracoes[int(0.99 * (len(duracoes) - 1))] if duracoes else 0.0,
+            "ticks_atrasados": self.atrasados,
+            "bytes_por_tick": sum(s.bytes for s in sessoes) / ticks,
+            "bytes_por_tick_sem_delta": sum(s.bytes_completos for s in sessoes) / ticks,
+            "bytes_entrada_por_tick": sum(s.bytes_entradas for s in sessoes) / ticks,
+            "instantaneos_pulados": sum(c.pulados for s in sessoes for c in s.conexoes if c),
+            "latencia_p50_ms": percentil(latencias, 0.50),
+            "latencia_p95_ms": percentil(latencias, 0.95),
+            "residencia_p50_ms": percentil(residencias, 0.50),
+            "residencia_p95_ms": percentil(residencias, 0.95),
+        }
+
+
+def imprime(r):
+    print(f"{r['sessoes']} sessões, {r['jogadores']} jogadores, {r['ticks']} ticks")
+    print(f"tick do servidor: p50 {r['tick_p50_ms']:.2f} ms  p99 {r['tick_p99_ms']:.2f} ms  "
+          f"(orçamento {1000 / TAXA_TICKS:.1f} ms), {r['ticks_atrasados']} atrasados")
+    economia = 1 - r["bytes_por_tick"] / r["bytes_por_tick_sem_delta"] if r["bytes_por_tick_sem_delta"] else 0
+    print(f"instantâneos: {r['bytes_por_tick']:.0f} bytes/tick por sessão "
+          f"(sem delta {r['bytes_por_tick_sem_delta']:.0f}, -{economia:.0%}), "
+          f"entradas {r['bytes_entrada_por_tick']:.0f} bytes/tick, {r['instantaneos_pulados']} pulados")
+    print(f"latência da entrada: ponta a ponta p50 {r['latencia_p50_ms']:.1f} ms  "
+          f"p95 {r['latencia_p95_ms']:.1f} ms; no servidor p50 {r['residencia_p50_ms']:.1f} ms  "
+          f"p95 {r['residencia_p95_ms']:.1f} ms")
+
+
+# ------------------------ TESTE EM LOCALHOST ------------------------
+async def joga_bot(cliente):
+    """Cliente sem janela: reconstrói o estado e joga com o piloto automático."""
+    remota = SimulacaoRemota(cliente)
+    bot = BotSimples()
+    while await cliente.recebe():
+        remota.passo()
+        bot.joga(remota)
+        await cliente.envia_entrada()
+
+
+async def teste(sessoes, segundos, semente=0):
+    servidor = ServidorCoop(semente)
+    rede = await servidor.inicia("127.0.0.1", 0)
+    clientes = []
+    for _ in range(sessoes * MAX_JOGADORES):
+        cliente = ClienteCoop()
+        await cliente.conecta("127.0.0.1", servidor.porta)
+        clientes.append(cliente)
+    tarefas = [asyncio.create_task(joga_bot(cliente)) for cliente in clientes]
+    await servidor.roda(segundos)
+    relatorio = servidor.relatorio()
+    for cliente in clientes:
+        cliente.fecha()
+    await asyncio.gather(*tarefas, return_exceptions=True)
+    rede.close()
+    await rede.wait_closed()
+    return relatorio
+
+
+async def serve(host, porta, intervalo):
+    servidor = ServidorCoop()
+    rede = await servidor.inicia(host, porta)
+    print(f"servindo em {host}:{servidor.porta}")
+    async with rede:
+        tarefa = asyncio.create_task(servidor.roda())
+        while True:
+            await asyncio.sleep(intervalo)
+            if servidor.sessoes:
+                imprime(servidor.relatorio())
+            if tarefa.done():
+                tarefa.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor do cooperativo do Invaxians")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--porta", type=int, default=PORTA_SERVIDOR)
+    parser.add_argument("--intervalo", type=float, default=10.0, help="segundos entre relatórios")
+    parser.add_argument("--teste", action="store_true",
+                        help="roda sessões de bots em localhost, imprime o relatório e sai")
+    parser.add_argument("--sessoes", type=int, default=12, help="sessões do --teste")
+    parser.add_argument("--segundos", type=float, default=10.0, help="duração do --teste")
+    args = parser.parse_args()
+
+    if args.teste:
+        imprime(asyncio.run(teste(args.sessoes, args.segundos)))
+        return
+    try:
+        asyncio.run(serve(args.host, args.porta, args.intervalo))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,568 @@
+import random
+
+import numpy as np
+
+from constantes import *
+from agenda import Agenda, sorteia_intervalo
+from colisao import (MundoColisao, CAMADA_MISSIL, CAMADA_INIMISSIL, CAMADA_INIMIGO,
+                     CAMADA_UFO, CAMADA_POWERUP, CAMADA_NAVE)
+from formacao import Formacao
+from hitboxes import caixas
+from particulas import Particulas, TIPO_EXPLOSAO
+from pool import Pool
+from perfil import PERFIL_DESLIGADO
+
+"""
+Simulação do Invaxians
+======================
+Regras do jogo sem dependência do arcade: pode ser executada sem janela
+(testes de carga, balanceamento) ou desenhada pela MeuJogo.
+"""
+
+# Eventos emitidos para a camada de apresentação (sons, botões, música, telemetria)
+EVENTO_TIRO = "tiro"
+EVENTO_EXPLOSAO = "explosao"
+EVENTO_ESTADO = "estado"
+EVENTO_PAUSA = "pausa"
+EVENTO_FASE = "fase"
+EVENTO_VIDAS = "vidas"
+EVENTO_MORTE = "morte"                    # vida perdida (a última é também fim de jogo)
+EVENTO_POWERUP_SPEED = "powerup_speed"    # power-up apanhado
+EVENTO_POWERUP_LIFE = "powerup_life"
+EVENTO_UFO = "ufo"                        # UFO abatido
+EVENTO_INICIO = "inicio"                  # partida nova (não vem de estado restaurado)
+EVENTO_RESTAURADO = "restaurado"          # estado.restaura trocou o estado inteiro
+
+# Timers da agenda; a chave é (tipo, jogador ou inimigo) e vence na ordem abaixo
+TIMER_REVIVE = 0      # fim da invencibilidade depois de perder uma vida
+TIMER_SPEED = 1       # fim do power-up de velocidade
+TIMER_BONUS_UFO = 2   # fim do bônus de tiros do UFO
+TIMER_DISPARO = 3     # próximo disparo do inimigo
+TIMER_UFO = 4         # próximo UFO
+
+
+# Textura usada para construir as entidades de cada pool
+TEXTURA_POOL = {
+    "missil": "missil",
+    "inimissil": "inimissil",
+    "ufo": "ufo",
+    "powerup": "powerup_speed",
+}
+
+
+# ------------------------ ENTIDADES ------------------------
+class Entidade:
+    """Retângulo móvel que substitui arcade.Sprite nas regras do jogo."""
+
+    __slots__ = ("textura", "escala", "width", "height", "center_x", "center_y",
+                 "change_x", "change_y", "angle", "alpha", "tipo", "dono",
+                 "anterior_x", "anterior_y")
+
+    def __init__(self, textura, escala, center_x=0.0, center_y=0.0):
+        self.reinicia(textura, escala, center_x, center_y)
+
+    def reinicia(self, textura, escala, center_x=0.0, center_y=0.0):
+        """Deixa a entidade como recém-criada (usado ao sair de um pool)."""
+        largura, altura = caixas()[textura]
+        self.textura = textura
+        self.escala = escala
+        self.width = largura * escala
+        self.height = altura * escala
+        self.center_x = center_x
+        self.center_y = center_y
+        self.anterior_x = None   # posição no passo anterior, para interpolar o desenho
+        self.anterior_y = None
+        self.change_x = 0.0
+        self.change_y = 0.0
+        self.angle = 0
+        self.alpha = 255
+        self.tipo = None
+        self.dono = None   # jogador que disparou (mísseis)
+
+    @property
+    def left(self):
+        return self.center_x - self.width / 2
+
+    @left.setter
+    def left(self, valor):
+        self.center_x = valor + self.width / 2
+
+    @property
+    def right(self):
+        return self.center_x + self.width / 2
+
+    @right.setter
+    def right(self, valor):
+        self.center_x = valor - self.width / 2
+
+    @property
+    def bottom(self):
+        return self.center_y - self.height / 2
+
+    @bottom.setter
+    def bottom(self, valor):
+        self.center_y = valor + self.height / 2
+
+    @property
+    def top(self):
+        return self.center_y + self.height / 2
+
+    @top.setter
+    def top(self, valor):
+        self.center_y = valor - self.height / 2
+
+    def update(self):
+        self.anterior_x = self.center_x
+        self.anterior_y = self.center_y
+        self.center_x += self.change_x
+        self.center_y += self.change_y
+
+
+# ------------------------ SIMULAÇÃO ------------------------
+class Simulacao:
+    """Estado completo de uma partida e as regras que o fazem avançar."""
+
+    def __init__(self, semente=None, dificuldade=None, jogadores=1):
+        # Aleatoriedade da sessão: a mesma semente e as mesmas teclas
+        # reproduzem a partida exatamente
+        self.semente = semente if semente is not None else random.randrange(2 ** 63)
+        self.rng = random.Random(self.semente)
+
+        # Entidades; uma nave por jogador, todas na mesma partida (cooperativo)
+        self.jogadores = jogadores
+        self.naves = []
+        self.missil_list = []
+        self.formacao = Formacao(np.random.default_rng(self.semente))
+        self.inimissil_list = []
+        self.ufo_list = []
+        self.powerup_list = []
+        self.explosoes = Particulas(MAX_EXPLOSOES)   # só explosões paradas: não usa o rng
+
+        # Estados do jogo
+        self.placar = 0
+        self.game_state = GAME_STATE_MENU
+        self.vidas = 0   # compartilhadas entre os jogadores
+        self.fase = 1
+        self.pausado = False
+        self.quadro = 0
+        self.agenda = Agenda(self.quadro)   # timers e próximos disparos, em quadros
+        self.tick = 0   # passos chamados, inclusive no menu e em pausa
+
+        # Teclas de direção seguradas por jogador, a mais recente por último;
+        # a velocidade das naves sai delas uma vez por passo
+        self.direcoes = [[] for _ in range(jogadores)]
+
+        # Teclas gravadas como (tick, tecla, pressionada); None = sem gravação
+        self.entradas = None
+
+        # Dificuldade dinâmica, com parâmetros opcionalmente sobrescritos
+        self.dificuldade = {**DIFICULDADE_PADRAO, **(dificuldade or {})}
+        desconhecidos = self.dificuldade.keys() - DIFICULDADE_PADRAO.keys()
+        if desconhecidos:
+            raise ValueError(f"parâmetros de dificuldade desconhecidos: {sorted(desconhecidos)}")
+        self.vel_inimigo_x = V_X_INIMIGO_INI
+        self.p_inimissil = P_INIMISSIL_INI
+
+        # Pools por tipo de entidade descartável
+        self.pools = {
+            tipo: Pool(lambda tipo=tipo: Entidade(TEXTURA_POOL[tipo], 1.0), capacidade)
+            for tipo, capacidade in CAPACIDADE_POOL.items()
+        }
+
+        # Caixas de todas as camadas, refeitas a cada passo
+        self.mundo = MundoColisao()
+
+        # Cronometragem por seção (desligada por padrão)
+        self.perfil = PERFIL_DESLIGADO
+
+        # Eventos do último passo, consumidos pela apresentação
+        self.eventos = []
+
+    # Atalhos para o jogador 0, o único numa partida solo
+    @property
+    def nave(self):
+        return self.naves[0] if self.naves else None
+
+    @property
+    def revive(self):
+        return self.restante(TIMER_REVIVE)
+
+    @revive.setter
+    def revive(self, valor):
+        self.liga_timer(TIMER_REVIVE, valor)
+
+    @property
+    def speed_timer(self):
+        return self.restante(TIMER_SPEED)
+
+    @speed_timer.setter
+    def speed_timer(self, valor):
+        self.liga_timer(TIMER_SPEED, valor)
+
+    @property
+    def bonus_ufo(self):
+        return self.restante(TIMER_BONUS_UFO)
+
+    @bonus_ufo.setter
+    def bonus_ufo(self, valor):
+        self.liga_timer(TIMER_BONUS_UFO, valor)
+
+    # ------------------------ CONFIGURAÇÕES INICIAIS ------------------------
+    def atualiza_dificuldade(self):
+        """Ajusta dificuldade com base na fase atual."""
+        d = self.dificuldade
+        self.vel_inimigo_x = V_X_INIMIGO_INI + d["PASSO_V_X_INIMIGO"] * (self.fase - 1)
+        self.p_inimissil = max(P_INIMISSIL_INI - d["PASSO_P_INIMISSIL"] * (self.fase - 1),
+                               d["P_INIMISSIL_MIN"])
+
+    def inicia_partida(self):
+        """Começa uma partida nova a partir da fase 1."""
+        self.fase = 1
+        self.muda_estado(GAME_STATE_PLAYING)
+        self.eventos.append(EVENTO_INICIO)
+        self.inicia_jogo()
+
+    def inicia_jogo(self):
+        """Reinicia / inicia a fase, reposicionando as entidades existentes."""
+        self.libera_todas()
+
+        # Dificuldade
+        self.atualiza_dificuldade()
+
+        # Naves dos jogadores, reaproveitadas entre fases e espaçadas igualmente
+        while len(self.naves) < self.jogadores:
+            self.naves.append(Entidade("nave", ESCALA_NAVE))
+        for jogador, nave in enumerate(self.naves):
+            nave.reinicia("nave", ESCALA_NAVE, LARG_TELA * (jogador + 1) / (self.jogadores + 1))
+            nave.bottom = MARGEM_Y_TELA
+        self.vidas = QTD_VIDAS
+
+        # Inimigos
+        self.formacao.monta(LINS_INIMIGOS, COLS_INIMIGOS, self.vel_inimigo_x)
+
+        self.placar = 0
+        self.pausado = False
+
+        # Timers desligados e o primeiro disparo de cada inimigo já sorteado
+        self.agenda.limpa(self.quadro)
+        self.agenda_disparos(range(len(self.formacao.vivo)))
+        self.eventos.append(EVENTO_FASE)
+
+    def libera_todas(self):
+        """Devolve aos pools todas as entidades descartáveis em jogo."""
+        for lista, tipo in ((self.missil_list, "missil"), (self.inimissil_list, "inimissil"),
+                            (self.ufo_list, "ufo"), (self.powerup_list, "powerup")):
+            pool = self.pools[tipo]
+            for entidade in lista:
+                pool.libera(entidade)
+            lista.clear()
+        self.explosoes.limpa()
+
+    def muda_estado(self, game_state):
+        self.game_state = game_state
+        self.eventos.append(EVENTO_ESTADO)
+
+    # ------------------------ MÉTODOS DE SUPORTE ------------------------
+    def nova(self, tipo, textura, escala, x=0.0, y=0.0):
+        """Entidade do pool do tipo, reiniciada com textura, escala e posição."""
+        entidade = self.pools[tipo].adquire()
+        entidade.reinicia(textura, escala, x, y)
+        return entidade
+
+    def descarta(self, lista, tipo, entidade):
+        """Tira a entidade da lista (se ainda estiver nela) e a devolve ao pool."""
+        try:
+            lista.remove(entidade)
+        except ValueError:
+            return
+        self.pools[tipo].libera(entidade)
+
+    def liga_timer(self, tipo, duracao, indice=0):
+        """Agenda o fim do timer daqui a `duracao` quadros; 0 o desliga."""
+        if duracao > 0:
+            self.agenda.agenda((tipo, indice), self.quadro + duracao)
+        else:
+            self.agenda.cancela((tipo, indice))
+
+    def restante(self, tipo, indice=0):
+        """Quadros até o fim do timer (0 = desligado)."""
+        return self.agenda.restante((tipo, indice))
+
+    def agenda_disparos(self, indices):
+        """Sorteia e agenda o próximo disparo de cada inimigo dos índices."""
+        if not indices:
+            return
+        agenda, quadro = self.agenda, self.quadro
+        for i, intervalo in zip(indices, self.formacao.intervalos(self.p_inimissil, len(indices)).tolist()):
+            agenda.agenda((TIMER_DISPARO, i), quadro + intervalo)
+
+    def estatisticas_pools(self):
+        return {tipo: pool.estatisticas() for tipo, pool in self.pools.items()}
+
+    def cria_explosao(self, x, y):
+        self.explosoes.emite(x, y, TIPO_EXPLOSAO, DT_EXPLOSAO)
+        self.eventos.append(EVENTO_EXPLOSAO)
+
+    def cria_powerup(self, x, y):
+        if self.rng.random() < 0.5:
+            power = self.nova("powerup", "powerup_speed", ESCALA_POWERUP, x, y)   # aumento de velocidade
+            power.tipo = "speed"
+        else:
+            power = self.nova("powerup", "powerup_life", ESCALA_POWERUP, x, y)    # vida extra
+            power.tipo = "life"
+        power.change_y = -V_Y_POWERUP   # cai lentamente
+        self.powerup_list.append(power)
+
+    def cria_ufo(self):
+        ufo = self.nova("ufo", "ufo", ESCALA_UFO)
+        if self.rng.random() < 0.5:
+            ufo.change_x = V_X_UFO
+            ufo.left = -ufo.width
+        else:
+            ufo.change_x = -V_X_UFO
+            ufo.right = LARG_TELA + ufo.width
+        ufo.top = ALT_TELA - 50
+        self.ufo_list.append(ufo)
+
+    def atualiza_velocidade_nave(self, jogador=0):
+        """Velocidade da nave, maior enquanto dura o power-up."""
+        if self.restante(TIMER_SPEED, jogador):
+            return V_X_NAVE * 1.8
+        return V_X_NAVE
+
+    def direcao_nave(self, jogador=0):
+        """-1, 0 ou 1: o sentido da tecla de direção segurada mais recente."""
+        direcoes = self.direcoes[jogador]
+        if not direcoes:
+            return 0
+        return -1 if direcoes[-1] == TECLA_ESQUERDA else 1
+
+    def fim_de_jogo(self):
+        self.muda_estado(GAME_STATE_GAME_OVER)
+
+    # ------------------------ ATUALIZAÇÃO DAS ENTIDADES ------------------------
+    def atualiza_nave(self, nave):
+        if nave.left < 0:
+            nave.left = 0
+        elif nave.right > LARG_TELA - 1:
+            nave.right = LARG_TELA - 1
+        nave.update()
+
+    # ------------------------ COLISÕES ------------------------
+    def detecta_colisoes(self):
+        """Monta o mundo de colisões com as posições atuais e devolve os contatos."""
+        mundo = self.mundo
+        mundo.limpa()
+        mundo.adiciona(CAMADA_MISSIL, self.missil_list)
+        mundo.adiciona(CAMADA_INIMISSIL, self.inimissil_list)
+        mundo.adiciona(CAMADA_UFO, self.ufo_list)
+        mundo.adiciona(CAMADA_POWERUP, self.powerup_list)
+        mundo.adiciona(CAMADA_NAVE, self.naves)
+        if self.formacao.quantidade:
+            mundo.adiciona_composto(CAMADA_INIMIGO, self.formacao.caixa(), self.formacao.colisoes,
+                                    self.formacao.inimigos)
+        return mundo.contatos()
+
+    def resolve_contatos(self, contatos):
+        """Aplica os contatos na ordem em que vieram; as remoções ficam para o fim.
+
+        Uma entidade removida por um contato anterior não participa dos
+        seguintes, exceto o míssil do jogador, que acerta tudo o que toca
+        no mesmo passo.
+        """
+        formacao = self.formacao
+        removidos = {CAMADA_MISSIL: set(), CAMADA_INIMISSIL: set(), CAMADA_INIMIGO: set(),
+                     CAMADA_UFO: set(), CAMADA_POWERUP: set(), CAMADA_NAVE: set()}
+        nave_atingida = False
+        for camada_a, a, camada_b, b in contatos:
+            if b in removidos[camada_b]:
+                continue
+            if camada_a == CAMADA_MISSIL:
+                removidos[CAMADA_MISSIL].add(a)
+                removidos[camada_b].add(b)
+                if camada_b == CAMADA_INIMIGO:
+                    self.cria_explosao(float(formacao.x[b]), float(formacao.y[b]))
+                    self.placar += 1
+                elif camada_b == CAMADA_INIMISSIL:
+                    inimissil = self.inimissil_list[b]
+                    self.cria_explosao(inimissil.center_x, inimissil.center_y)
+                else:
+                    ufo = self.ufo_list[b]
+                    self.cria_explosao(ufo.center_x, ufo.center_y)
+                    self.cria_powerup(ufo.center_x, ufo.center_y)
+                    self.eventos.append(EVENTO_UFO)
+            elif camada_a == CAMADA_INIMISSIL:
+                # Só o primeiro míssil tira vida; os seguintes passam pela nave invencível
+                if a in removidos[CAMADA_INIMISSIL] or self.restante(TIMER_REVIVE, b):
+                    continue
+                inimissil = self.inimissil_list[a]
+                self.cria_explosao(inimissil.center_x, inimissil.center_y)
+                removidos[CAMADA_INIMISSIL].add(a)
+                self.eventos.append(EVENTO_MORTE)
+                if self.vidas:
+                    self.liga_timer(TIMER_REVIVE, DT_REVIVE - 1, b)
+                    self.naves[b].alpha = 64
+                    self.vidas -= 1
+                    self.eventos.append(EVENTO_VIDAS)
+                else:
+                    self.fim_de_jogo()
+            elif camada_b == CAMADA_POWERUP:
+                power = self.powerup_list[b]
+                self.eventos.append(EVENTO_POWERUP_SPEED if power.tipo == "speed" else EVENTO_POWERUP_LIFE)
+                if power.tipo == "speed":
+                    self.liga_timer(TIMER_SPEED, self.dificuldade["DT_SPEED_BOOST"], a)
+                elif power.tipo == "life" and self.vidas < MAX_VIDAS:
+                    self.vidas += 1
+                    self.eventos.append(EVENTO_VIDAS)
+                removidos[CAMADA_POWERUP].add(b)
+            elif not nave_atingida:
+                nave_atingida = True
+                self.eventos.append(EVENTO_MORTE)
+                self.fim_de_jogo()
+
+        for i in removidos[CAMADA_INIMIGO]:
+            formacao.remove(i)
+            self.agenda.cancela((TIMER_DISPARO, i))
+        # Projéteis que saíram da tela também voltam ao pool (bottom > ALT_TELA, top < 0)
+        removidos[CAMADA_MISSIL] |= {i for i, missil in enumerate(self.missil_list)
+                                     if missil.center_y - missil.height / 2 > ALT_TELA}
+        removidos[CAMADA_INIMISSIL] |= {i for i, inimissil in enumerate(self.inimissil_list)
+                                        if inimissil.center_y + inimissil.height / 2 < 0}
+        self.filtra(self.missil_list, "missil", removidos[CAMADA_MISSIL])
+        self.filtra(self.inimissil_list, "inimissil", removidos[CAMADA_INIMISSIL])
+        self.filtra(self.ufo_list, "ufo", removidos[CAMADA_UFO])
+        self.filtra(self.powerup_list, "powerup", removidos[CAMADA_POWERUP])
+
+    def filtra(self, lista, tipo, removidos):
+        """Devolve ao pool as entidades dos índices removidos, mantendo a ordem das demais."""
+        if not removidos:
+            return
+        pool = self.pools[tipo]
+        for i in removidos:
+            pool.libera(lista[i])
+        lista[:] = [entidade for i, entidade in enumerate(lista) if i not in removidos]
+
+    # ------------------------ UPDATE ------------------------
+    def passo(self):
+        """Avança a simulação em um quadro."""
+        self.eventos.clear()
+        self.tick += 1
+        if self.game_state != GAME_STATE_PLAYING or self.pausado:
+            return
+        self.quadro += 1
+        perfil = self.perfil
+        t = perfil.agora()
+
+        # Atualizar listas; as naves seguem as teclas seguradas neste passo
+        for jogador, nave in enumerate(self.naves):
+            nave.change_x = self.direcao_nave(jogador) * self.atualiza_velocidade_nave(jogador)
+            self.atualiza_nave(nave)
+        for lista in (self.missil_list, self.inimissil_list, self.ufo_list, self.powerup_list):
+            for entidade in lista:
+                entidade.update()
+        self.formacao.move()
+        self.explosoes.atualiza()   # a animação sai da idade; nada por explosão
+
+        # Timers vencidos neste quadro; o custo é o dos que vencem, não o dos inimigos
+        disparos = []
+        ufo_vencido = False
+        for tipo, indice in self.agenda.avanca(self.quadro):
+            if tipo == TIMER_DISPARO:
+                disparos.append(indice)
+            elif tipo == TIMER_UFO:
+                ufo_vencido = True
+            elif tipo == TIMER_REVIVE and self.naves:
+                self.naves[indice].alpha = 255
+
+        t = perfil.secao("atualiza", t)
+
+        # ----- Colisões -----
+        contatos = self.detecta_colisoes()
+        t = perfil.secao("colisoes", t)
+
+        self.resolve_contatos(contatos)
+        t = perfil.secao("resolucao", t)
+
+        # ----- Movimento dos inimigos e direção -----
+        self.formacao.quica(self.vel_inimigo_x, self.dificuldade["A_X_INIMIGO"])
+        t = perfil.secao("formacao", t)
+
+        # ----- Inimigos atirando -----
+        formacao = self.formacao
+        disparos = [i for i in disparos if formacao.vivo[i]]
+        self.agenda_disparos(disparos)
+        for i in disparos:
+            inimissil = self.nova("inimissil", "inimissil", ESCALA_INIMIGO, float(formacao.x[i]))
+            inimissil.top = float(formacao.y[i] - formacao.altura[i] / 2)
+            inimissil.change_y = -V_Y_INIMISSIL
+            inimissil.angle = 180
+            self.inimissil_list.append(inimissil)
+
+        t = perfil.secao("disparos", t)
+
+        # ----- Criação de UFO -----
+        # Sem UFO na tela, o intervalo até o próximo é sorteado uma vez e agendado
+        if not self.ufo_list:
+            if ufo_vencido:
+                self.cria_ufo()
+            elif self.agenda.prazo((TIMER_UFO, 0)) is None:
+                intervalo = sorteia_intervalo(self.rng, self.dificuldade["P_UFO"])
+                if intervalo == 1:
+                    self.cria_ufo()
+                else:
+                    self.agenda.agenda((TIMER_UFO, 0), self.quadro + intervalo - 1)
+
+        for ufo in list(self.ufo_list):
+            if (ufo.left >= LARG_TELA and ufo.change_x > 0) or \
+               (ufo.right <= 0 and ufo.change_x < 0):
+                self.descarta(self.ufo_list, "ufo", ufo)
+        perfil.secao("ufo", t)
+
+        # ----- Próxima fase -----
+        if not self.formacao.quantidade:
+            self.fase += 1
+            self.inicia_jogo()
+
+    # ------------------------ INPUT ------------------------
+    def grava_entradas(self):
+        """Passa a registrar as teclas recebidas, para salvar um replay (só partidas solo)."""
+        self.entradas = []
+
+    def pressiona(self, tecla, jogador=0):
+        if self.entradas is not None:
+            self.entradas.append((self.tick, tecla, True))
+        if tecla in (TECLA_ESQUERDA, TECLA_DIREITA):
+            # Só muda o estado da tecla, em qualquer tela; o passo aplica
+            direcoes = self.direcoes[jogador]
+            if tecla in direcoes:
+                direcoes.remove(tecla)
+            direcoes.append(tecla)
+            return
+        if self.game_state != GAME_STATE_PLAYING:
+            if tecla == TECLA_ESPACO:
+                self.inicia_partida()
+            return
+
+        if not self.naves:
+            return
+
+        nave = self.naves[jogador]
+        if tecla == TECLA_PAUSA:
+            self.pausado = not self.pausado
+            self.eventos.append(EVENTO_PAUSA)
+        elif tecla == TECLA_ESPACO and not self.pausado:
+            # Um míssil por jogador na tela, salvo durante o bônus do UFO
+            if self.bonus_ufo or all(missil.dono != jogador for missil in self.missil_list):
+                missil = self.nova("missil", "missil", ESCALA_NAVE, nave.center_x)
+                missil.dono = jogador
+                missil.bottom = nave.top
+                missil.change_y = V_Y_MISSIL
+                self.missil_list.append(missil)
+                self.eventos.append(EVENTO_TIRO)
+
+    def solta(self, tecla, jogador=0):
+        if self.entradas is not None:
+            self.entradas.append((self.tick, tecla, False))
+        direcoes = self.direcoes[jogador]
+        if tecla in direcoes:
+            direcoes.remove(tecla)
@@ -0,0 +1,240 @@
+import argparse
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+from constantes import *
+from simulacao import (EVENTO_ESTADO, EVENTO_FASE, EVENTO_INICIO, EVENTO_MORTE, EVENTO_POWERUP_SPEED,
+                       EVENTO_POWERUP_LIFE, EVENTO_RESTAURADO, EVENTO_UFO)
+
+"""
+Telemetria de partidas
+======================
+Registros por sessão (uma partida, do início ao fim de jogo): fase
+alcançada, vidas perdidas, power-ups apanhados, UFOs abatidos e, no fim, o
+histograma dos tempos de quadro. O laço do jogo só acrescenta tuplas a um
+lote em memória; lotes cheios vão para uma fila limitada e uma thread os
+codifica, comprime e anexa a arquivos locais que se revezam. Com a fila
+cheia (disco lento, travado) o lote é descartado e contado, nunca espera.
+
+Uma sessão só começa com uma partida nova de verdade (EVENTO_INICIO).
+Estados restaurados não abrem nem fecham sessões; rebobinar para fora do
+fim de jogo retoma a sessão encerrada, que ganha outro registro "fim" (o
+resumo fica com o último).
+
+Cada lote é um membro gzip com um objeto JSON por linha, anexado ao
+arquivo atual; gzip.open lê o arquivo inteiro de uma vez.
+
+    python invaxians.py --telemetria telemetria/
+    python telemetria.py telemetria/          # resumo das sessões gravadas
+    python benchmark.py telemetria 20000      # custo por quadro e descarte com disco lento
+"""
+
+PADRAO_ARQUIVO = "telemetria-{:06d}.jsonl.gz"
+POWERUPS = {EVENTO_POWERUP_SPEED: "speed", EVENTO_POWERUP_LIFE: "life"}
+FIM = None   # avisa a thread de escrita que não vem mais nada
+
+
+# ------------------------ ARQUIVOS ------------------------
+class ArquivoRolante:
+    """Arquivos numerados numa pasta; passa ao próximo acima de `limite_bytes` e guarda só os últimos."""
+
+    def __init__(self, pasta, limite_bytes=BYTES_ARQUIVO_TELEMETRIA, arquivos=ARQUIVOS_TELEMETRIA):
+        os.makedirs(pasta, exist_ok=True)
+        self.pasta = pasta
+        self.limite_bytes = limite_bytes
+        self.arquivos = arquivos
+        numeros = numeros_arquivos(pasta)
+        self.numero = numeros[-1] if numeros else 0   # cada execução começa um arquivo novo
+        self.arquivo = None
+
+    def grava(self, dados):
+        if self.arquivo is None or self.arquivo.tell() + len(dados) > self.limite_bytes:
+            self.proximo()
+        self.arquivo.write(dados)
+        self.arquivo.flush()
+
+    def proximo(self):
+        self.fecha()
+        self.numero += 1
+        self.arquivo = open(os.path.join(self.pasta, PADRAO_ARQUIVO.format(self.numero)), "ab")
+        for numero in numeros_arquivos(self.pasta)[:-self.arquivos]:
+            os.remove(os.path.join(self.pasta, PADRAO_ARQUIVO.format(numero)))
+
+    def fecha(self):
+        if self.arquivo is not None:
+            self.arquivo.close()
+            self.arquivo = None
+
+
+def numeros_arquivos(pasta):
+    """Números dos arquivos de telemetria da pasta, em ordem."""
+    prefixo, sufixo = PADRAO_ARQUIVO.split("{:06d}")
+    return sorted(int(nome[len(prefixo):-len(sufixo)]) for nome in os.listdir(pasta)
+                  if nome.startswith(prefixo) and nome.endswith(sufixo) and nome[len(prefixo):-len(sufixo)].isdigit())
+
+
+def le(pasta):
+    """Registros gravados na pasta, do mais antigo para o mais novo."""
+    for numero in numeros_arquivos(pasta):
+        try:
+            with gzip.open(os.path.join(pasta, PADRAO_ARQUIVO.format(numero)), "rt") as arquivo:
+                for linha in arquivo:
+                    yield json.loads(linha)
+        except EOFError:
+            pass   # último lote cortado (o jogo caiu no meio da escrita)
+
+
+# ------------------------ TELEMETRIA ------------------------
+class Telemetria:
+    """Lote em memória no laço do jogo e uma thread que escreve os lotes cheios."""
+
+    def __init__(self, arquivo, lote=LOTE_TELEMETRIA, fila=FILA_TELEMETRIA):
+        self.arquivo = arquivo
+        self.tamanho_lote = lote
+        self.lote = []
+        self.fila = queue.Queue(fila)
+        self.registros = 0
+        self.descartados = 0   # registros perdidos com a fila cheia (só o laço do jogo mexe)
+        self.erros = 0         # lotes que o disco recusou (só a thread mexe)
+        self.bytes = 0
+
+        self.sessao = None
+        self.encerrada = None   # sessão fechada por fim de jogo, que rebobinar pode retomar
+        self.escala_balde = 1000 / LARG_BALDE_QUADRO_MS
+        self.histograma = [0] * BALDES_QUADRO
+
+        self.thread = threading.Thread(target=self._escreve, name="telemetria", daemon=True)
+        self.thread.start()
+
+    # ------------------------ LAÇO DO JOGO ------------------------
+    def quadro(self, segundos):
+        """Conta a duração de um quadro no histograma da sessão."""
+        if self.sessao is not None:
+            self.histograma[min(int(segundos * self.escala_balde), BALDES_QUADRO - 1)] += 1
+
+    def observa(self, sim):
+        """Registra os eventos do passo (antes de a janela limpá-los)."""
+        if EVENTO_RESTAURADO in sim.eventos:
+            if sim.game_state == GAME_STATE_PLAYING and self.sessao is None and self.encerrada is not None:
+                self.retoma_sessao(sim)
+            return
+        for evento in sim.eventos:
+            if evento == EVENTO_INICIO:
+                self.abre_sessao(sim)
+            elif self.sessao is None:
+                continue
+            elif evento == EVENTO_ESTADO:
+                if sim.game_state != GAME_STATE_PLAYING:
+                    self.fecha_sessao(sim, "fim_de_jogo")
+            elif evento == EVENTO_FASE:
+                # Só fases novas: rebobinar pode voltar a uma anterior
+                if sim.fase > self.fase:
+                    self.fase = sim.fase
+                    self.registra("fase", fase=sim.fase, quadro=sim.quadro)
+            elif evento == EVENTO_MORTE:
+                self.contagens["mortes"] += 1
+                self.registra("morte", fase=sim.fase, vidas=sim.vidas, quadro=sim.quadro)
+            elif evento in POWERUPS:
+                self.contagens["powerups"] += 1
+                self.registra("powerup", tipo=POWERUPS[evento], fase=sim.fase, quadro=sim.quadro)
+            elif evento == EVENTO_UFO:
+                self.contagens["ufos"] += 1
+                self.registra("ufo", fase=sim.fase, quadro=sim.quadro)
+
+    def registra(self, evento, **campos):
+        self.lote.append((time.time(), self.sessao, evento, campos))
+        self.registros += 1
+        if len(self.lote) >= self.tamanho_lote:
+            self.despacha()
+
+    def despacha(self):
+        """Entrega o lote à thread de escrita, ou o descarta se a fila está cheia."""
+        if not self.lote:
+            return
+        lote, self.lote = self.lote, []
+        try:
+            self.fila.put_nowait(lote)
+        except queue.Full:
+            self.descartados += len(lote)
+
+    # ------------------------ SESSÕES ------------------------
+    def abre_sessao(self, sim):
+        if self.sessao is not None:
+            self.fecha_sessao(sim, "reiniciada")
+        self.sessao = uuid.uuid4().hex[:16]
+        self.encerrada = None
+        self.inicio = sim.quadro
+        self.fase = 0
+        self.contagens = {"mortes": 0, "powerups": 0, "ufos": 0}
+        self.histograma = [0] * BALDES_QUADRO
+        self.registra("inicio", semente=sim.semente, jogadores=sim.jogadores, quadro=sim.quadro)
+
+    def fecha_sessao(self, sim, motivo):
+        self.registra("fim", motivo=motivo, fase=sim.fase, placar=sim.placar, quadros=sim.quadro - self.inicio,
+                      **self.contagens, histograma_ms=LARG_BALDE_QUADRO_MS, histograma=self.histograma,
+                      descartados=self.descartados)
+        if motivo == "fim_de_jogo":
+            self.encerrada = (self.sessao, self.inicio, self.fase, self.contagens, self.histograma)
+        self.sessao = None
+        self.despacha()
+
+    def retoma_sessao(self, sim):
+        """Rebobinou para fora do fim de jogo: a mesma partida continua na mesma sessão."""
+        self.sessao, self.inicio, self.fase, self.contagens, self.histograma = self.encerrada
+        self.encerrada = None
+        self.registra("retomada", fase=sim.fase, quadro=sim.quadro)
+
+    def fecha(self, sim=None, espera=2.0):
+        """Encerra a sessão aberta e espera a thread escrever o que já está na fila."""
+        if self.sessao is not None and sim is not None:
+            self.fecha_sessao(sim, "janela_fechada")
+        self.despacha()
+        try:
+            self.fila.put(FIM, timeout=espera)
+        except queue.Full:
+            return
+        self.thread.join(espera)
+
+    # ------------------------ ESCRITA ------------------------
+    def _escreve(self):
+        while True:
+            lote = self.fila.get()
+            if lote is FIM:
+                break
+            linhas = "".join(json.dumps({"t": round(instante, 3), "sessao": sessao, "evento": evento, **campos},
+                                        separators=(",", ":")) + "\n"
+                             for instante, sessao, evento, campos in lote)
+            dados = gzip.compress(linhas.encode(), compresslevel=6)
+            try:
+                self.arquivo.grava(dados)
+                self.bytes += len(dados)
+            except OSError:
+                self.erros += 1
+        self.arquivo.fecha()
+
+
+def cria_telemetria(pasta):
+    """Telemetria gravando em arquivos que se revezam na pasta."""
+    return Telemetria(ArquivoRolante(pasta))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumo das sessões gravadas pela telemetria do Invaxians")
+    parser.add_argument("pasta", help="pasta passada a --telemetria")
+    args = parser.parse_args()
+    # Sessão retomada depois de rebobinar tem mais de um "fim"; vale o último
+    fins = {registro["sessao"]: registro for registro in le(args.pasta) if registro["evento"] == "fim"}
+    for registro in fins.values():
+        print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(registro['t']))}  {registro['sessao']}  "
+              f"fase {registro['fase']:>3}  placar {registro['placar']:>4}  mortes {registro['mortes']}  "
+              f"powerups {registro['powerups']}  ufos {registro['ufos']}  "
+              f"{registro['quadros']} quadros  ({registro['motivo']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from agenda import Agenda, CASAS, HORIZONTE, sorteia_intervalo
+
+"""
+A roda de tempo contra um dicionário chave -> prazo, com operações sorteadas.
+"""
+
+
+def test_agenda_confere_com_dicionario():
+    rng = random.Random(7)
+    agenda = Agenda()
+    referencia = {}
+    agora = 0
+    for _ in range(4000):
+        operacao = rng.random()
+        chave = ("timer", rng.randrange(60))
+        if operacao < 0.45:
+            # Prazos em todas as rodas, inclusive longe o bastante para descer várias de uma vez
+            prazo = agora + rng.randint(1, rng.choice((3, CASAS, CASAS ** 2, CASAS ** 3 + 5000)))
+            agenda.agenda(chave, prazo)
+            referencia[chave] = prazo
+        elif operacao < 0.55:
+            agenda.cancela(chave)
+            referencia.pop(chave, None)
+        elif operacao < 0.6:
+            # Remontar a agenda a partir dos timers não muda o que vence depois
+            agenda = Agenda()
+            agenda.carrega(agora, sorted(referencia.items()))
+        else:
+            agora += rng.randint(0, 3 * CASAS)
+            vencidos = sorted(c for c, p in referencia.items() if p <= agora)
+            for c in vencidos:
+                del referencia[c]
+            assert agenda.avanca(agora) == vencidos
+        assert agenda.timers() == sorted(referencia.items())
+        assert agenda.prazo(chave) == referencia.get(chave)
+
+    agora = max(referencia.values(), default=agora)
+    assert agenda.avanca(agora) == sorted(referencia)
+    assert agenda.timers() == []
+
+
+def test_agenda_alem_do_horizonte():
+    agenda = Agenda(HORIZONTE - 10)
+    agenda.agenda("longe", HORIZONTE - 10 + HORIZONTE + 3)
+    assert agenda.avanca(2 * HORIZONTE - 8) == []
+    assert agenda.avanca(2 * HORIZONTE - 7) == ["longe"]
+
+
+def test_agenda_recusa_prazo_passado():
+    agenda = Agenda(5)
+    with pytest.raises(ValueError):
+        agenda.agenda("x", 5)
+
+
+def test_sorteia_intervalo_tem_a_media_geometrica():
+    rng = random.Random(3)
+    assert sorteia_intervalo(rng, 1) == 1
+    intervalos = [sorteia_intervalo(rng, 50) for _ in range(20000)]
+    assert min(intervalos) >= 1
+    assert abs(sum(intervalos) / len(intervalos) - 50) < 2
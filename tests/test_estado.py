@@ -0,0 +1,66 @@
+import pytest
+
+from bot import BotSimples
+from simulacao import Simulacao
+import estado
+
+"""
+Restaurar um estado salvo e seguir com as mesmas teclas dá a mesma partida.
+"""
+
+
+def joga(sim, bot, ticks):
+    for _ in range(ticks):
+        bot.joga(sim)
+        sim.passo()
+        sim.eventos.clear()
+
+
+def test_restaura_continua_igual_ao_original():
+    original = Simulacao(0)
+    original.inicia_partida()
+    joga(original, BotSimples(), 700)
+
+    copia = Simulacao(999)
+    dados = estado.salva(original)
+    estado.restaura(copia, dados)
+    assert estado.salva(copia) == dados
+
+    bot_original, bot_copia = BotSimples(), BotSimples()
+    for tick in range(1500):
+        joga(original, bot_original, 1)
+        joga(copia, bot_copia, 1)
+        assert estado.salva(copia) == estado.salva(original), f"divergiu {tick} ticks depois de restaurar"
+    assert (copia.placar, copia.fase, copia.vidas) == (original.placar, original.fase, original.vidas)
+
+
+def test_restaura_recusa_bytes_que_nao_sao_estado():
+    sim = Simulacao(0)
+    with pytest.raises(estado.EstadoInvalido):
+        estado.restaura(sim, b"IVXS")
+    dados = bytearray(estado.salva(sim))
+    dados[:4] = b"XXXX"
+    with pytest.raises(estado.EstadoInvalido):
+        estado.restaura(sim, bytes(dados))
+
+
+def test_restaura_recusa_estado_cortado_sem_mexer_na_simulacao():
+    origem = Simulacao(0)
+    origem.inicia_partida()
+    joga(origem, BotSimples(), 400)
+    dados = estado.salva(origem)
+
+    sim = Simulacao(7)
+    sim.grava_entradas()
+    sim.inicia_partida()
+    joga(sim, BotSimples(), 150)
+    antes = estado.salva(sim)
+    entradas = list(sim.entradas)
+    for tamanho in [*range(0, len(dados), 97), len(dados) - 1]:
+        with pytest.raises(estado.EstadoInvalido):
+            estado.restaura(sim, dados[:tamanho])
+        assert estado.salva(sim) == antes
+        assert sim.entradas == entradas
+    with pytest.raises(estado.EstadoInvalido):
+        estado.restaura(sim, dados + b"\0")
+    assert estado.salva(sim) == antes
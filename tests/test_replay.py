@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+from constantes import *
+from bot import BotSimples
+from simulacao import Simulacao
+import replay
+
+"""
+Um replay gravado pelo piloto automático reproduz o rodapé que gravou.
+"""
+
+
+def grava(caminho, semente, ticks):
+    sim = Simulacao(semente)
+    sim.grava_entradas()
+    bot = BotSimples()
+    for _ in range(ticks):
+        bot.joga(sim)
+        sim.passo()
+        sim.eventos.clear()
+    replay.salva(caminho, sim)
+    return sim
+
+
+@pytest.mark.parametrize("semente", [1, 42])
+def test_replay_reproduz_o_rodape(tmp_path, semente):
+    caminho = tmp_path / "partida.ivx"
+    gravada = grava(caminho, semente, 3000)
+
+    sim, (ticks, placar, fase) = replay.reproduz(caminho)
+    assert (ticks, placar, fase) == (gravada.tick, gravada.placar, gravada.fase)
+    assert (sim.tick, sim.placar, sim.fase) == (ticks, placar, fase)
+
+
+def test_replay_cortado_e_recusado(tmp_path):
+    caminho = tmp_path / "partida.ivx"
+    grava(caminho, 1, 200)
+    caminho.write_bytes(caminho.read_bytes()[:-1])
+    with pytest.raises(replay.ReplayInvalido):
+        replay.carrega(caminho)
+
+
+def test_replay_de_partida_iniciada_pelo_mouse(tmp_path):
+    pytest.importorskip("arcade")
+    from janela import MeuJogo
+
+    # Só o que os botões usam da janela
+    janela = SimpleNamespace(sim=Simulacao(5), processa_eventos=lambda: None)
+    janela.clica_espaco = lambda: MeuJogo.clica_espaco(janela)
+    sim = janela.sim
+    sim.grava_entradas()
+    bot = BotSimples()
+    cliques = 0
+    espera = 0   # ticks sem tecla depois do clique, a mão indo do mouse ao teclado
+    for _ in range(6000):
+        if sim.game_state == GAME_STATE_MENU:
+            MeuJogo.on_start_button_click(janela, None)
+            cliques, espera = cliques + 1, 40
+        elif sim.game_state == GAME_STATE_GAME_OVER:
+            MeuJogo.on_restart_button_click(janela, None)
+            cliques, espera = cliques + 1, 40
+        if espera:
+            espera -= 1
+        else:
+            bot.joga(sim)
+        sim.passo()
+        sim.eventos.clear()
+    assert cliques >= 2   # o início e ao menos um recomeço
+    caminho = tmp_path / "mouse.ivx"
+    replay.salva(caminho, sim)
+
+    reproduzida, final = replay.reproduz(caminho)
+    assert final == (sim.tick, sim.placar, sim.fase)
+    assert (reproduzida.placar, reproduzida.fase, reproduzida.vidas, reproduzida.game_state) == \
+        (sim.placar, sim.fase, sim.vidas, sim.game_state)
+    assert reproduzida.nave.center_x == sim.nave.center_x
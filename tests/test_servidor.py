@@ -0,0 +1,75 @@
+import asyncio
+
+import numpy as np
+
+from rede import (aplica_delta, bits_eventos, le_quadro, quadro, BIT_TIRO, BIT_DIREITA, BIT_ESQUERDA,
+                  ENTRADA, INSTANTANEO, MSG_ENTRADA, VAZIO)
+from servidor import ServidorCoop
+
+"""
+Um cliente em localhost contra o servidor, com os ticks dados pelo teste:
+cada instantâneo reconstruído (delta contra a base confirmada) é igual ao
+vetor do servidor, e cada evento vai em um instantâneo só.
+"""
+
+TICKS = 600
+
+
+class EventosRegistrados(list):
+    """Lista de eventos da simulação que lembra tudo o que entrou desde o último instantâneo."""
+
+    def __init__(self):
+        super().__init__()
+        self.novos = []
+
+    def append(self, evento):
+        super().append(evento)
+        self.novos.append(evento)
+
+    def extend(self, eventos):
+        eventos = list(eventos)
+        super().extend(eventos)
+        self.novos.extend(eventos)
+
+
+async def joga():
+    servidor = ServidorCoop(semente=3)
+    tcp = await servidor.inicia("127.0.0.1", 0)
+    reader, writer = await asyncio.open_connection("127.0.0.1", servidor.porta)
+    await le_quadro(reader)   # boas-vindas
+    sessao = next(iter(servidor.sessoes.values()))
+    registro = sessao.sim.eventos = EventosRegistrados()
+
+    recebidos = {}
+    ack = 0
+    com_eventos = 0
+    for i in range(TICKS):
+        # Confirma só de vez em quando, para os deltas partirem de bases antigas
+        if i % 7 == 0:
+            ack = max(recebidos, default=0)
+        bits = BIT_TIRO | (BIT_ESQUERDA if i // 50 % 2 else BIT_DIREITA)
+        writer.write(quadro(ENTRADA.pack(MSG_ENTRADA, i + 1, ack, bits, 0)))
+        await writer.drain()
+        await asyncio.sleep(0.001)   # o servidor lê a entrada antes do tick
+
+        sessao.passo()
+        esperados = bits_eventos(registro.novos)
+        com_eventos += bool(registro.novos)
+        registro.novos.clear()
+
+        mensagem = await le_quadro(reader)
+        _, tick, base, _, bits_recebidos = INSTANTANEO.unpack_from(mensagem)
+        vetor = aplica_delta(recebidos[base] if base else VAZIO, mensagem[INSTANTANEO.size:])
+        assert np.array_equal(vetor, sessao.historico[tick]), f"tick {tick}: delta contra {base} não confere"
+        assert bits_recebidos == esperados, f"tick {tick}: eventos {bits_recebidos:b}, esperados {esperados:b}"
+        recebidos[tick] = vetor
+
+    writer.close()
+    tcp.close()
+    await tcp.wait_closed()
+    return com_eventos
+
+
+def test_instantaneos_e_eventos_pelo_servidor():
+    com_eventos = asyncio.run(joga())
+    assert com_eventos > 20
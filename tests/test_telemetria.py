@@ -0,0 +1,59 @@
+from constantes import *
+from bot import BotSimples
+from estado import Rebobinador
+from simulacao import Simulacao
+from telemetria import ArquivoRolante, Telemetria, le
+
+"""
+Sessões da telemetria: uma por partida começada de verdade, mesmo quando
+o jogador rebobina para fora do fim de jogo.
+"""
+
+
+def test_rebobinar_fora_do_fim_de_jogo_continua_a_sessao(tmp_path):
+    telemetria = Telemetria(ArquivoRolante(str(tmp_path)))
+    sim = Simulacao(2)
+    bot = BotSimples()
+    rebobinador = Rebobinador()
+
+    def observa():
+        telemetria.observa(sim)
+        sim.eventos.clear()
+
+    def joga_ate_o_fim():
+        for _ in range(20000):
+            bot.joga(sim)
+            sim.passo()
+            observa()
+            if sim.game_state != GAME_STATE_PLAYING:
+                return
+            rebobinador.guarda(sim)
+        raise AssertionError("a partida não acabou")
+
+    sim.pressiona(TECLA_ESPACO)
+    observa()
+    joga_ate_o_fim()
+    for _ in range(60):
+        assert rebobinador.volta(sim)
+        observa()
+    assert sim.game_state == GAME_STATE_PLAYING
+    joga_ate_o_fim()
+
+    # Partida nova, fechada com a janela
+    sim.pressiona(TECLA_ESPACO)
+    observa()
+    for _ in range(30):
+        bot.joga(sim)
+        sim.passo()
+        observa()
+    telemetria.fecha(sim)
+
+    registros = list(le(str(tmp_path)))
+    inicios = [r["sessao"] for r in registros if r["evento"] == "inicio"]
+    assert len(inicios) == 2 and inicios[0] != inicios[1]
+    primeira = [r["evento"] for r in registros if r["sessao"] == inicios[0]]
+    assert primeira.count("retomada") == 1
+    assert [r["motivo"] for r in registros if r["sessao"] == inicios[0] and r["evento"] == "fim"] == \
+        ["fim_de_jogo", "fim_de_jogo"]
+    assert [r["motivo"] for r in registros if r["sessao"] == inicios[1] and r["evento"] == "fim"] == \
+        ["janela_fechada"]
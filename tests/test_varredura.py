@@ -0,0 +1,38 @@
+import os
+
+from varredura import BLOCO, varre
+
+"""
+Varreduras pequenas: cada bloco é jogado uma vez e a segunda varredura
+sai inteira do cache, mesmo com um ponto repetido na grade (1000 e 1000.0
+são o mesmo ponto).
+"""
+
+
+def test_varre_reaproveita_o_cache(tmp_path, capsys):
+    params = {"P_UFO": [500, 2000]}
+    resultados = varre(params, BLOCO, processos=1, cache=str(tmp_path), max_ticks=200)
+
+    assert [r["parametros"] for r in resultados] == [{"P_UFO": 500}, {"P_UFO": 2000}]
+    assert all(r["partidas"] == BLOCO for r in resultados)
+    assert len(os.listdir(tmp_path)) == 2
+    assert "2 a jogar" in capsys.readouterr().out
+
+    assert varre(params, BLOCO, processos=1, cache=str(tmp_path), max_ticks=200) == resultados
+    assert "0 a jogar" in capsys.readouterr().out
+
+
+def test_varre_com_ponto_repetido(tmp_path, capsys):
+    params = {"P_UFO": [1000, 1000.0]}
+    resultados = varre(params, BLOCO, processos=1, cache=str(tmp_path), max_ticks=200)
+
+    assert len(resultados) == 2
+    assert resultados[0] == resultados[1]
+    assert resultados[0]["parametros"] == {"P_UFO": 1000}
+    assert resultados[0]["partidas"] == BLOCO
+    assert len(os.listdir(tmp_path)) == 1   # o bloco foi jogado e gravado uma vez só
+    assert "1 a jogar" in capsys.readouterr().out
+
+    # Segunda vez, tudo vem do cache
+    assert varre(params, BLOCO, processos=1, cache=str(tmp_path), max_ticks=200) == resultados
+    assert "0 a jogar" in capsys.readouterr().out
@@ -0,0 +1,82 @@
+import io
+import os
+
+import arcade
+from PIL import Image
+
+from constantes import *
+from atlas import Atlas, AtlasInvalido, desatualizadas, monta
+import hitboxes
+
+"""
+Registro central de texturas
+============================
+Carrega cada textura de TEXTURAS uma única vez na inicialização: do atlas
+pré-montado (atlas.py), se existir, ou decodificando o PNG, com a hit box
+do cache de hitboxes.py quando o hash do arquivo confere. Durante o jogo
+os sprites são criados a partir das Texture já carregadas, pelo id
+simbólico, sem montar caminhos nem ler arquivos.
+"""
+
+
+class RegistroTexturas:
+    """Texturas pré-carregadas, indexadas pelo id simbólico de constantes.TEXTURAS."""
+
+    def __init__(self, base_path="."):
+        self.base_path = base_path
+        self._texturas = {}
+
+    def carrega(self):
+        """Carrega todas as texturas conhecidas; arquivos ausentes ficam de fora."""
+        atlas = self.abre_atlas()
+        poligonos = None
+        for textura, (arquivo, _, _) in TEXTURAS.items():
+            if atlas and textura in atlas:
+                imagem, hit_box = atlas.recorta(textura)
+                self._texturas[textura] = arcade.Texture(imagem, hit_box_points=hit_box,
+                                                         hash=f"atlas:{textura}")
+                continue
+            caminho = os.path.join(self.base_path, PATH_PNG, arquivo)
+            try:
+                with open(caminho, "rb") as arq:
+                    dados = arq.read()
+            except FileNotFoundError:
+                print(f"AVISO: textura '{arquivo}' não encontrada.")
+                continue
+            if poligonos is None:
+                poligonos = hitboxes.le(os.path.join(self.base_path, PATH_HITBOXES))
+            entrada = poligonos.get(textura)
+            if entrada is None or entrada["sha1"] != hitboxes.hash_arquivo(dados):
+                # PNG mudou desde o build: o arcade varre os pixels
+                self._texturas[textura] = arcade.load_texture(caminho)
+                continue
+            imagem = Image.open(io.BytesIO(dados)).convert("RGBA")
+            self._texturas[textura] = arcade.Texture(imagem, hit_box_points=[tuple(p) for p in entrada["poligono"]],
+                                                     hash=f"png:{entrada['sha1']}")
+        return self
+
+    def abre_atlas(self):
+        """Atlas pré-montado, refeito se algum PNG mudou; None se não foi gerado."""
+        caminho = os.path.join(self.base_path, PATH_ATLAS)
+        if not os.path.exists(caminho):
+            return None
+        try:
+            mudaram = desatualizadas(caminho, self.base_path)
+            if mudaram:
+                print(f"AVISO: PNGs mudaram desde o atlas ({', '.join(mudaram)}); refazendo {PATH_ATLAS}.")
+                monta(self.base_path)
+            return Atlas(caminho)
+        except AtlasInvalido as e:
+            print(f"AVISO: {e}; refaça com 'python atlas.py'. Carregando os PNGs.")
+        except ValueError as e:   # hit boxes velhas: o atlas não pode ser refeito
+            print(f"AVISO: {e}. Carregando os PNGs.")
+        return None
+
+    def __getitem__(self, textura):
+        return self._texturas[textura]
+
+    def __contains__(self, textura):
+        return textura in self._texturas
+
+    def get(self, textura, padrao=None):
+        return self._texturas.get(textura, padrao)
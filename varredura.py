@@ -0,0 +1,203 @@
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing as mp
+import os
+import statistics
+import time
+
+from constantes import *
+from simulacao import Simulacao
+from bot import BotSimples
+
+"""
+Varredura da curva de dificuldade
+=================================
+Joga milhares de partidas com o piloto automático em cada ponto de uma
+grade de parâmetros de dificuldade (DIFICULDADE_PADRAO) e resume o tempo
+de sobrevivência, a fase alcançada e o placar acumulado.
+
+As partidas são divididas em blocos de BLOCO partidas com sementes fixas.
+Cada bloco concluído é gravado no cache em disco, então uma varredura
+interrompida, com mais pontos ou com mais partidas reaproveita o que já foi
+jogado. A chave inclui o hash dos arquivos das regras (FONTES_REGRAS):
+mudou uma regra, os blocos antigos deixam de valer sozinhos.
+
+    python varredura.py --param P_UFO=500,1000,2000 --param PASSO_V_X_INIMIGO=0.2,0.4 \\
+                        --partidas 2000 --saida curva.json
+"""
+
+# Arquivos que decidem o resultado de uma partida do bot: qualquer mudança
+# neles muda a chave do cache, e blocos jogados com as regras antigas ficam de fora
+FONTES_REGRAS = ("simulacao.py", "formacao.py", "colisao.py", "agenda.py", "constantes.py", "bot.py",
+                 "hitboxes.py", PATH_HITBOXES)
+BLOCO = 50       # partidas por unidade de trabalho e de cache
+MAX_TICKS = 30_000   # partidas mais longas são encerradas (contam como sobrevivência máxima)
+CACHE = ".varredura"
+
+
+# ------------------------ PARTIDAS ------------------------
+def joga_partida(semente, dificuldade, max_ticks=MAX_TICKS):
+    """(ticks sobrevividos, fase alcançada, placar acumulado) de uma partida do bot."""
+    sim = Simulacao(semente, dificuldade)
+    bot = BotSimples()
+    sim.inicia_partida()
+    while sim.game_state == GAME_STATE_PLAYING and sim.tick < max_ticks:
+        bot.joga(sim)
+        sim.passo()
+        sim.eventos.clear()
+    # O placar volta a zero a cada fase; cada fase concluída valeu a formação inteira
+    placar = (sim.fase - 1) * LINS_INIMIGOS * COLS_INIMIGOS + sim.placar
+    return sim.tick, sim.fase, placar
+
+
+def joga_bloco(trabalho):
+    """Joga um bloco de partidas de um ponto da grade e grava o resultado no cache."""
+    caminho, dificuldade, bloco, max_ticks = trabalho
+    inicio = bloco * BLOCO
+    partidas = [joga_partida(semente, dificuldade, max_ticks) for semente in range(inicio, inicio + BLOCO)]
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w") as arq:
+        json.dump(partidas, arq)
+    os.replace(temporario, caminho)   # bloco interrompido no meio não vira cache
+    return caminho, partidas
+
+
+# ------------------------ GRADE E CACHE ------------------------
+def hash_regras():
+    """SHA-1 do conteúdo de FONTES_REGRAS."""
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    sha1 = hashlib.sha1()
+    for nome in FONTES_REGRAS:
+        with open(os.path.join(base_path, nome), "rb") as arq:
+            sha1.update(arq.read())
+    return sha1.hexdigest()
+
+
+REGRAS = hash_regras()
+
+
+def le_valor(texto):
+    try:
+        return int(texto)
+    except ValueError:
+        return float(texto)
+
+
+def normaliza(nome, valor):
+    """Valor no tipo do padrão: 1000 e 1000.0 jogam as mesmas partidas e dividem o cache."""
+    if isinstance(DIFICULDADE_PADRAO[nome], int) and float(valor).is_integer():
+        return int(valor)
+    return float(valor)
+
+
+def grade(params):
+    """Produto cartesiano dos valores; parâmetros ausentes ficam no padrão."""
+    nomes = list(params)
+    return [{nome: normaliza(nome, v) for nome, v in zip(nomes, valores)}
+            for valores in itertools.product(*params.values())]
+
+
+def caminho_bloco(cache, dificuldade, bloco, max_ticks):
+    completa = {nome: float(valor) for nome, valor in {**DIFICULDADE_PADRAO, **dificuldade}.items()}
+    chave = json.dumps([REGRAS, BLOCO, max_ticks, sorted(completa.items()), bloco])
+    return os.path.join(cache, hashlib.sha1(chave.encode()).hexdigest()[:20] + ".json")
+
+
+def _distribuicao(valores):
+    decis = statistics.quantiles(valores, n=10) if len(valores) > 1 else valores * 9
+    return {"media": statistics.fmean(valores), "p10": decis[0],
+            "p50": statistics.median(valores), "p90": decis[8]}
+
+
+def resume(partidas, max_ticks=MAX_TICKS):
+    ticks = [p[0] for p in partidas]
+    fases = [p[1] for p in partidas]
+    placares = [p[2] for p in partidas]
+    histograma = {}
+    for fase in fases:
+        histograma[fase] = histograma.get(fase, 0) + 1
+    return {
+        "partidas": len(partidas),
+        "sobrevivencia_ticks": _distribuicao(ticks),
+        "fase": {"media": statistics.fmean(fases), "max": max(fases),
+                 "histograma": dict(sorted(histograma.items()))},
+        "placar": _distribuicao(placares),
+        "limite_de_ticks": sum(t >= max_ticks for t in ticks),
+    }
+
+
+def varre(params, partidas, processos=None, cache=CACHE, max_ticks=MAX_TICKS):
+    """Resultados por ponto da grade, jogando só os blocos que não estão no cache."""
+    os.makedirs(cache, exist_ok=True)
+    pontos = grade(params)
+    blocos = -(-partidas // BLOCO)
+    resultados = {i: {} for i in range(len(pontos))}
+    # Caminho de cada bloco a jogar -> (trabalho, [(ponto, bloco)]); pontos repetidos
+    # da grade caem no mesmo caminho e o bloco é jogado uma vez só
+    pendentes = {}
+    for i, dificuldade in enumerate(pontos):
+        for bloco in range(blocos):
+            caminho = caminho_bloco(cache, dificuldade, bloco, max_ticks)
+            if caminho in pendentes:
+                pendentes[caminho][1].append((i, bloco))
+                continue
+            try:
+                with open(caminho) as arq:
+                    resultados[i][bloco] = json.load(arq)
+            except (FileNotFoundError, json.JSONDecodeError):
+                pendentes[caminho] = ((caminho, dificuldade, bloco, max_ticks), [(i, bloco)])
+
+    total = len(pontos) * blocos
+    a_jogar = sum(len(destinos) for _, destinos in pendentes.values())
+    print(f"{len(pontos)} pontos x {blocos} blocos de {BLOCO}: "
+          f"{total - a_jogar} no cache, {len(pendentes)} a jogar")
+    if pendentes:
+        inicio = time.perf_counter()
+        with mp.Pool(processos) as pool:
+            for feitos, (caminho, jogadas) in enumerate(
+                    pool.imap_unordered(joga_bloco, [trabalho for trabalho, _ in pendentes.values()]), 1):
+                for i, bloco in pendentes[caminho][1]:
+                    resultados[i][bloco] = jogadas
+                if feitos % max(1, len(pendentes) // 20) == 0 or feitos == len(pendentes):
+                    print(f"  {feitos}/{len(pendentes)} blocos em {time.perf_counter() - inicio:.1f}s")
+
+    saida = []
+    for i, dificuldade in enumerate(pontos):
+        jogadas = [p for bloco in range(blocos) for p in resultados[i][bloco]][:partidas]
+        saida.append({"parametros": dificuldade, **resume(jogadas, max_ticks)})
+    return saida
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Varredura de parâmetros de dificuldade do Invaxians")
+    parser.add_argument("--param", action="append", default=[], metavar="NOME=V1,V2,...",
+                        help=f"valores de um parâmetro; opções: {', '.join(DIFICULDADE_PADRAO)}")
+    parser.add_argument("--partidas", type=int, default=1000, help="partidas por ponto da grade")
+    parser.add_argument("--processos", type=int, default=None, help="processos (padrão: um por núcleo)")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS, help="duração máxima de uma partida")
+    parser.add_argument("--cache", default=CACHE, help="diretório dos blocos já jogados")
+    parser.add_argument("--saida", metavar="ARQUIVO", help="grava os resultados em JSON")
+    args = parser.parse_args()
+
+    params = {}
+    for item in args.param:
+        nome, _, valores = item.partition("=")
+        if nome not in DIFICULDADE_PADRAO or not valores:
+            parser.error(f"parâmetro inválido: {item!r}")
+        params[nome] = [le_valor(v) for v in valores.split(",")]
+
+    resultados = varre(params, args.partidas, args.processos, args.cache, args.max_ticks)
+    for r in resultados:
+        rotulo = " ".join(f"{k}={v}" for k, v in r["parametros"].items()) or "padrão"
+        print(f"{rotulo:<40} sobrevivência p50 {r['sobrevivencia_ticks']['p50']:>7.0f} ticks  "
+              f"fase média {r['fase']['media']:5.2f} (máx {r['fase']['max']})  "
+              f"placar p50 {r['placar']['p50']:6.1f}")
+    if args.saida:
+        with open(args.saida, "w") as arq:
+            json.dump(resultados, arq, indent=2)
+
+
+if __name__ == "__main__":
+    main()